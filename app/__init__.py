@@ -3,6 +3,7 @@ from . import commands
 from config import Config
 from .extensions import db, migrate, login_manager, babel
 from .models import User
+from .utils import flush_player_orders_after_request, pin_primary_after_write, route_reads_to_replica
 from flask_babel import _, lazy_gettext as _l
 from flask import Flask
 from datetime import datetime
@@ -50,6 +51,11 @@ def create_app():
     app.register_blueprint(betting_bp)
     app.register_blueprint(admin_bp)
 
+    # after_request 는 등록 역순으로 실행되므로 순위 재계산(쓰기) 뒤에 주 DB 고정 여부를 기록합니다.
+    app.before_request(route_reads_to_replica)
+    app.after_request(pin_primary_after_write)
+    app.after_request(flush_player_orders_after_request)
+
     commands.register_commands(app)
 
     return app
@@ -0,0 +1,257 @@
+"""토너먼트 대진표 엔진.
+
+대진표는 경기 id -> 노드 dict 로 저장하고, 노드마다 승자/패자가 올라갈 다음 노드(next, loser_next)와
+자기 자리를 채울 이전 노드(sources)를 둡니다. 결과 하나를 기록하면 그 경기에서 이어지는 경로만 갱신합니다.
+
+노드 id 는 승자조 R<라운드>M<번호>, 패자조 L<라운드>M<번호>, 더블 엘리미네이션 결승 GF 입니다.
+선수 id 는 그대로 저장만 하므로 정수(선수 id)가 아니어도 됩니다.
+"""
+
+SINGLE = 'single'
+DOUBLE = 'double'
+FORMATS = (SINGLE, DOUBLE)
+
+BYE_NAME = '부전승'
+_WINNER, _LOSER = 'winner', 'loser'
+
+
+def _new_node(node_id, section, round_num):
+    return {
+        'id': node_id, 'section': section, 'round': round_num,
+        'players': [None, None], 'names': [None, None], 'byes': [False, False], 'scores': [None, None],
+        'sources': [None, None], 'winner': None, 'done': False,
+        'next': None, 'next_slot': None, 'loser_next': None, 'loser_slot': None,
+    }
+
+
+def _link(nodes, source_id, target_id, slot, kind=_WINNER):
+    source, target = nodes[source_id], nodes[target_id]
+    if kind == _WINNER:
+        source['next'], source['next_slot'] = target_id, slot
+    else:
+        source['loser_next'], source['loser_slot'] = target_id, slot
+    target['sources'][slot] = [source_id, kind]
+
+
+def first_round_pairs(entrants):
+    """참가자(순서 그대로)를 1라운드 대진으로 나눕니다. 부전승은 앞 순서 참가자에게 줍니다. 빈 자리는 None 입니다."""
+    size = 2
+    while size < len(entrants):
+        size *= 2
+    num_byes = size - len(entrants)
+    pairs = [(entrant, None) for entrant in entrants[:num_byes]]
+    rest = entrants[num_byes:]
+    pairs += [(rest[i], rest[i + 1]) for i in range(0, len(rest), 2)]
+    return pairs
+
+
+def build_bracket(entrants, bracket_format=SINGLE):
+    """(선수 id, 이름) 목록으로 대진표를 만듭니다. 더블 엘리미네이션은 4명 이상일 때만 가능합니다."""
+    if len(entrants) < 2:
+        raise ValueError('토너먼트에는 최소 2명이 필요합니다.')
+    if bracket_format not in FORMATS:
+        raise ValueError(f'알 수 없는 대진 방식입니다: {bracket_format}')
+    return build_from_pairs(first_round_pairs(entrants), bracket_format)
+
+
+def build_from_pairs(pairs, bracket_format=SINGLE):
+    """1라운드 대진((선수 id, 이름) 또는 None 쌍, 2의 거듭제곱 개)으로 전체 대진표를 만들고 부전승을 처리합니다."""
+    size = len(pairs) * 2
+    rounds = size.bit_length() - 1
+    if bracket_format == DOUBLE and size < 4:
+        bracket_format = SINGLE
+
+    nodes = {}
+    for r in range(1, rounds + 1):
+        for i in range(1, (size >> r) + 1):
+            nodes[f'R{r}M{i}'] = _new_node(f'R{r}M{i}', 'W', r)
+            if r > 1:
+                _link(nodes, f'R{r - 1}M{2 * i - 1}', f'R{r}M{i}', 0)
+                _link(nodes, f'R{r - 1}M{2 * i}', f'R{r}M{i}', 1)
+    final_id = f'R{rounds}M1'
+
+    if bracket_format == DOUBLE:
+        # 패자조: 홀수 라운드는 패자조끼리, 짝수 라운드는 패자조 승자 vs 승자조 다음 라운드 패자
+        for i in range(1, (size >> 2) + 1):
+            nodes[f'L1M{i}'] = _new_node(f'L1M{i}', 'L', 1)
+            _link(nodes, f'R1M{2 * i - 1}', f'L1M{i}', 0, _LOSER)
+            _link(nodes, f'R1M{2 * i}', f'L1M{i}', 1, _LOSER)
+        for r in range(1, rounds):
+            even, odd = 2 * r, 2 * r - 1
+            for i in range(1, (size >> (r + 1)) + 1):
+                nodes[f'L{even}M{i}'] = _new_node(f'L{even}M{i}', 'L', even)
+                _link(nodes, f'L{odd}M{i}', f'L{even}M{i}', 0)
+                _link(nodes, f'R{r + 1}M{i}', f'L{even}M{i}', 1, _LOSER)
+            if r < rounds - 1:
+                for i in range(1, (size >> (r + 2)) + 1):
+                    nodes[f'L{even + 1}M{i}'] = _new_node(f'L{even + 1}M{i}', 'L', even + 1)
+                    _link(nodes, f'L{even}M{2 * i - 1}', f'L{even + 1}M{i}', 0)
+                    _link(nodes, f'L{even}M{2 * i}', f'L{even + 1}M{i}', 1)
+        nodes['GF'] = _new_node('GF', 'F', rounds + 1)
+        _link(nodes, final_id, 'GF', 0)
+        _link(nodes, f'L{2 * (rounds - 1)}M1', 'GF', 1)
+        final_id = 'GF'
+
+    bracket = {'format': bracket_format, 'size': size, 'rounds': rounds, 'final': final_id, 'champion': None, 'nodes': nodes}
+    changed = set()
+    for i, pair in enumerate(pairs, start=1):
+        for slot, entrant in enumerate(pair):
+            if entrant is None:
+                _place_bye(nodes, f'R1M{i}', slot, changed)
+            else:
+                _place(nodes, f'R1M{i}', slot, entrant[0], entrant[1], changed)
+    _update_champion(bracket)
+    return bracket
+
+
+def _slot_filled(node, slot):
+    return node['players'][slot] is not None or node['byes'][slot]
+
+
+def _place(nodes, node_id, slot, player_id, name, changed):
+    node = nodes[node_id]
+    node['players'][slot], node['names'][slot] = player_id, name
+    changed.add(node_id)
+    _resolve_byes(nodes, node_id, changed)
+
+
+def _place_bye(nodes, node_id, slot, changed):
+    nodes[node_id]['byes'][slot] = True
+    changed.add(node_id)
+    _resolve_byes(nodes, node_id, changed)
+
+
+def _resolve_byes(nodes, node_id, changed):
+    # 한쪽(또는 양쪽)이 부전승인 경기는 결과 입력 없이 바로 다음 경기로 넘깁니다.
+    node = nodes[node_id]
+    if node['done'] or not (_slot_filled(node, 0) and _slot_filled(node, 1)):
+        return
+    if node['byes'][0] and node['byes'][1]:
+        node['done'] = True
+        _advance(nodes, node, None, changed)
+    elif node['byes'][0] or node['byes'][1]:
+        winner_slot = 1 if node['byes'][0] else 0
+        node['winner'], node['done'] = node['players'][winner_slot], True
+        _advance(nodes, node, winner_slot, changed)
+
+
+def _advance(nodes, node, winner_slot, changed):
+    """승자를 next 로, 패자를 loser_next 로 보냅니다. 보낼 선수가 없으면 그 자리는 부전승입니다."""
+    loser_slot = None
+    if winner_slot is not None and not node['byes'][1 - winner_slot]:
+        loser_slot = 1 - winner_slot
+    for target_id, target_slot, slot in (
+        (node['next'], node['next_slot'], winner_slot),
+        (node['loser_next'], node['loser_slot'], loser_slot),
+    ):
+        if target_id is None:
+            continue
+        if slot is None:
+            _place_bye(nodes, target_id, target_slot, changed)
+        else:
+            _place(nodes, target_id, target_slot, node['players'][slot], node['names'][slot], changed)
+
+
+def _update_champion(bracket):
+    final = bracket['nodes'][bracket['final']]
+    bracket['champion'] = final['winner'] if final['done'] else None
+
+
+def record_result(bracket, node_id, winner_id, score_p1=None, score_p2=None):
+    """경기 결과를 기록하고 승자/패자를 다음 경기로 보냅니다. 바뀐 노드 id 집합을 반환합니다."""
+    nodes = bracket['nodes']
+    node = nodes.get(node_id)
+    if node is None:
+        raise ValueError(f'존재하지 않는 경기입니다: {node_id}')
+    if node['done']:
+        raise ValueError(f'이미 결과가 입력된 경기입니다: {node_id}')
+    if node['players'][0] is None or node['players'][1] is None:
+        raise ValueError(f'아직 두 선수가 정해지지 않은 경기입니다: {node_id}')
+    if winner_id not in node['players']:
+        raise ValueError(f'{node_id} 경기의 선수가 아닙니다.')
+
+    winner_slot = node['players'].index(winner_id)
+    node['winner'], node['scores'], node['done'] = winner_id, [score_p1, score_p2], True
+    changed = {node_id}
+    _advance(nodes, node, winner_slot, changed)
+    _update_champion(bracket)
+    return changed
+
+
+def is_ready(node):
+    """두 선수가 모두 정해졌고 아직 결과가 없는 경기인지 확인합니다."""
+    return not node['done'] and node['players'][0] is not None and node['players'][1] is not None
+
+
+def ready_matches(bracket):
+    return [node for node in ordered_nodes(bracket) if is_ready(node)]
+
+
+def ordered_nodes(bracket):
+    """승자조 → 패자조 → 결승, 라운드/번호 순으로 노드를 반환합니다."""
+    section_order = {'W': 0, 'L': 1, 'F': 2}
+    return sorted(bracket['nodes'].values(), key=lambda node: (
+        section_order[node['section']], node['round'], int(node['id'].rsplit('M', 1)[-1]) if 'M' in node['id'] else 0
+    ))
+
+
+def slot_label(bracket, node, slot):
+    """화면에 보일 자리 이름: 선수 이름, 부전승, 또는 '<경기> 승자/패자' 자리표시."""
+    if node['players'][slot] is not None:
+        return node['names'][slot]
+    if node['byes'][slot]:
+        return BYE_NAME
+    source = node['sources'][slot]
+    if source is None:
+        return '-'
+    return f"{source[0]} {'승자' if source[1] == _WINNER else '패자'}"
+
+
+def match_view(bracket, node):
+    return {
+        'id': node['id'],
+        'p1_id': node['players'][0], 'p1_name': slot_label(bracket, node, 0),
+        'p2_id': node['players'][1], 'p2_name': slot_label(bracket, node, 1),
+        'winner_id': node['winner'],
+        'score_p1': '' if node['scores'][0] is None else node['scores'][0],
+        'score_p2': '' if node['scores'][1] is None else node['scores'][1],
+    }
+
+
+def legacy_names(data):
+    """옛 형식({'rounds': [[{'id', 'p1', 'p2', 'winner'}]]})에 나오는 선수 이름 목록."""
+    names = set()
+    for round_matches in data.get('rounds', []):
+        for match in round_matches:
+            for key in ('p1', 'p2', 'winner'):
+                name = match.get(key)
+                if name and name != BYE_NAME and not name.endswith(' 승자'):
+                    names.add(name)
+    return names
+
+
+def from_legacy(data, player_ids):
+    """옛 형식 대진표를 새 형식으로 옮깁니다. player_ids 는 {이름: 선수 id}, 없는 이름은 이름을 id 로 씁니다."""
+    def entrant(name):
+        if not name or name == BYE_NAME:
+            return None
+        return (player_ids.get(name, name), name)
+
+    rounds = data.get('rounds') or [[]]
+    bracket = build_from_pairs([(entrant(m.get('p1')), entrant(m.get('p2'))) for m in rounds[0]], SINGLE)
+    for round_matches in rounds:
+        for match in round_matches:
+            node = bracket['nodes'].get(match.get('id'))
+            winner = entrant(match.get('winner'))
+            if node is not None and winner is not None and is_ready(node) and winner[0] in node['players']:
+                record_result(bracket, node['id'], winner[0])
+    return bracket
+
+
+def is_legacy(data):
+    return bool(data) and isinstance(data.get('rounds'), list)
+
+
+def header(bracket):
+    """노드를 뺀 대진표 요약(방식, 크기, 결승 경기, 우승자)."""
+    return {key: value for key, value in bracket.items() if key != 'nodes'}
@@ -1,7 +1,10 @@
 import click
 from flask.cli import with_appcontext
-from .models import User, Player, GenderEnum, FreshmanEnum
+from .models import User, Player, League, GenderEnum, FreshmanEnum
 from .extensions import db
+from .stats import rebuild_player_stats
+from .utils import expire_today_partners, mark_player_orders_dirty, rebuild_league_standings, reconcile_point_balances
+from .jobs import run_job_worker
 
 def register_commands(app):
     @app.cli.command("create-admin")
@@ -42,4 +45,68 @@ def register_commands(app):
     def init_db_command():
         """데이터베이스 테이블을 모두 생성합니다."""
         db.create_all()
-        print("Database tables created successfully.")
\ No newline at end of file
+        print("Database tables created successfully.")
+
+    @app.cli.command("rebuild-stats")
+    @click.option("--dry-run", is_flag=True, help="DB를 수정하지 않고 차이만 출력합니다.")
+    @with_appcontext
+    def rebuild_stats_command(dry_run):
+        """승인된 경기 기록으로 모든 선수의 전적/포인트 통계를 다시 계산합니다."""
+        differences = rebuild_player_stats(dry_run=dry_run)
+        for diff in differences:
+            changes = ", ".join(f"{field}: {old} -> {new}" for field, (old, new) in diff['changes'].items())
+            print(f"{diff['name']} ({diff['id']}): {changes}")
+
+        if dry_run:
+            print(f">>> {len(differences)}명의 통계가 다릅니다. (dry-run, 저장하지 않음)")
+            return
+
+        db.session.commit()
+        mark_player_orders_dirty('match', 'point')
+        print(f">>> 성공: {len(differences)}명의 통계를 재계산했습니다.")
+
+    @app.cli.command("rebuild-league-standings")
+    @with_appcontext
+    def rebuild_league_standings_command():
+        """모든 리그의 저장된 순위표를 경기 결과로 다시 계산합니다."""
+        league_ids = [league_id for (league_id,) in db.session.query(League.id).all()]
+        for league_id in league_ids:
+            rebuild_league_standings(league_id)
+        db.session.commit()
+        print(f">>> 성공: {len(league_ids)}개 리그의 순위표를 재계산했습니다.")
+
+    @app.cli.command("expire-partners")
+    @with_appcontext
+    def expire_partners_command():
+        """오늘 경기가 없는 오늘의 상대 '제출됨' 표시를 정리합니다. (매일 자정 이후 cron 등으로 실행)"""
+        expired = expire_today_partners()
+        db.session.commit()
+        print(f">>> {expired}개의 오늘의 상대를 미제출로 되돌렸습니다.")
+
+    @app.cli.command("reconcile-points")
+    @click.option("--repair", is_flag=True, help="잔액이 다른 선수를 원장 합계로 맞춥니다.")
+    @with_appcontext
+    def reconcile_points_command(repair):
+        """선수 포인트 잔액을 포인트 원장 합계와 비교합니다."""
+        drifted, unbalanced = reconcile_point_balances(repair=repair)
+        for row in drifted:
+            print(f"{row.name} ({row.id}): 업적 {row.achieve_count} / 원장 {row.ledger_achieve}, "
+                  f"베팅 {row.betting_count} / 원장 {row.ledger_betting}")
+        for entry_id, currency, total in unbalanced:
+            print(f">>> 경고: 원장 항목 {entry_id} 의 {currency} 합계가 0이 아닙니다. ({total})")
+
+        if not repair:
+            print(f">>> {len(drifted)}명의 잔액이 원장과 다릅니다. (--repair 로 수정)")
+            return
+
+        db.session.commit()
+        if drifted:
+            mark_player_orders_dirty('point')
+        print(f">>> 성공: {len(drifted)}명의 잔액을 원장 합계로 맞췄습니다.")
+
+    @app.cli.command("run-jobs")
+    @click.option("--once", is_flag=True, help="대기 중인 작업만 처리하고 종료합니다.")
+    @with_appcontext
+    def run_jobs_command(once):
+        """백그라운드 작업 워커를 포그라운드에서 실행합니다."""
+        run_job_worker(app, once=once)
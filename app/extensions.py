@@ -1,9 +1,37 @@
+from flask import g, has_app_context
 from flask_sqlalchemy import SQLAlchemy
+from flask_sqlalchemy.session import Session
 from flask_migrate import Migrate
 from flask_login import LoginManager
 from flask_babel import Babel
 
-db = SQLAlchemy()
+# SQLALCHEMY_BINDS 에서 읽기 전용 복제본 엔진의 키
+READ_BIND_KEY = 'read'
+
+
+class RoutingSession(Session):
+    """조회 전용으로 표시한 뷰(use_read_replica)의 SELECT 는 복제본(read 바인드)으로, 그 외에는 모두 주 DB 로 보냅니다.
+
+    요청 중 flush, INSERT/UPDATE/DELETE, FOR UPDATE 가 한 번이라도 나오면 세션을 주 DB 에 고정합니다.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and self._use_read_replica(clause):
+            return self._db.engines[READ_BIND_KEY]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+    def _use_read_replica(self, clause):
+        if self.info.get('pinned_primary'):
+            return False
+        if not has_app_context() or not g.get('use_read_replica') or READ_BIND_KEY not in self._db.engines:
+            return False
+        if self._flushing or getattr(clause, 'is_dml', False) or getattr(clause, '_for_update_arg', None) is not None:
+            self.info['pinned_primary'] = True
+            return False
+        return True
+
+
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 migrate = Migrate()
 login_manager = LoginManager()
-babel = Babel()
\ No newline at end of file
+babel = Babel()
@@ -0,0 +1,165 @@
+import threading
+import traceback
+from datetime import timedelta
+from flask import current_app, request
+from sqlalchemy import update
+from .extensions import db
+from .models import BackgroundJob, get_seoul_time
+
+# kind -> handler(params, report_progress) 함수
+_JOB_HANDLERS = {}
+
+_worker = None
+_worker_lock = threading.Lock()
+_wakeup = threading.Event()
+
+
+def job_handler(kind):
+    """백그라운드 작업 핸들러를 등록합니다. 핸들러는 결과(JSON 직렬화 가능)를 반환합니다."""
+    def decorator(func):
+        _JOB_HANDLERS[kind] = func
+        return func
+    return decorator
+
+
+def no_progress(progress, message=None):
+    """동기 실행 시 핸들러에 넘기는 빈 진행률 콜백"""
+
+
+def wants_async():
+    """요청이 백그라운드 실행(?async=1 또는 JSON의 "async": true)을 원하는지 확인합니다."""
+    if request.args.get('async', '').lower() in ('1', 'true'):
+        return True
+    data = request.get_json(silent=True)
+    return isinstance(data, dict) and data.get('async') is True
+
+
+def enqueue_job(kind, params=None):
+    """작업을 DB에 등록하고 워커를 깨웁니다."""
+    if kind not in _JOB_HANDLERS:
+        raise ValueError(f"등록되지 않은 작업입니다: {kind}")
+
+    job = BackgroundJob(kind=kind, params=params or {}, status='pending')
+    db.session.add(job)
+    db.session.commit()
+
+    ensure_job_worker(current_app._get_current_object())
+    _wakeup.set()
+    return job
+
+
+def ensure_job_worker(app):
+    """현재 프로세스에 워커 스레드가 없으면 시작합니다. (gunicorn fork 이후에도 안전하도록 지연 시작)"""
+    global _worker
+    if not app.config.get('JOB_WORKER_ENABLED', True):
+        return
+
+    with _worker_lock:
+        if _worker is not None and _worker.is_alive():
+            return
+        _worker = threading.Thread(target=run_job_worker, args=(app,), name='job-worker', daemon=True)
+        _worker.start()
+
+
+def run_job_worker(app, once=False):
+    """대기 중인 작업을 하나씩 가져와 실행합니다. once 이면 대기 작업이 없을 때 종료합니다."""
+    poll_seconds = app.config.get('JOB_POLL_SECONDS', 5)
+    while True:
+        with app.app_context():
+            job_id = _claim_next_job(app)
+            if job_id is not None:
+                _run_job(app, job_id)
+                continue
+
+        if once:
+            return
+        _wakeup.wait(poll_seconds)
+        _wakeup.clear()
+
+
+def _claim_next_job(app):
+    """pending 작업(또는 워커가 죽어 멈춘 running 작업)을 조건부 UPDATE로 선점합니다."""
+    now = get_seoul_time()
+    stale_before = now - timedelta(seconds=app.config.get('JOB_STALE_SECONDS', 600))
+
+    candidates = BackgroundJob.query.filter(
+        (BackgroundJob.status == 'pending') |
+        ((BackgroundJob.status == 'running') & (BackgroundJob.heartbeat_at < stale_before))
+    ).order_by(BackgroundJob.id).limit(5).all()
+
+    for job in candidates:
+        claimed = BackgroundJob.query.filter(
+            BackgroundJob.id == job.id,
+            BackgroundJob.status == job.status,
+            BackgroundJob.attempts == job.attempts
+        ).update({
+            'status': 'running', 'started_at': now, 'heartbeat_at': now,
+            'attempts': BackgroundJob.attempts + 1
+        }, synchronize_session=False)
+        db.session.commit()
+        if claimed:
+            return job.id
+
+    return None
+
+
+def _touch_job(job_id, values):
+    # 핸들러의 트랜잭션과 섞이지 않도록 별도 연결로 기록합니다. 실패해도 작업은 계속하되 로그를 남깁니다.
+    try:
+        with db.engine.begin() as connection:
+            connection.execute(update(BackgroundJob.__table__).where(BackgroundJob.__table__.c.id == job_id).values(values))
+    except Exception as e:
+        current_app.logger.warning(f"Background job {job_id} status update error : {e}")
+
+
+def _report_progress(job_id, progress, message=None):
+    values = {'progress': max(0, min(100, int(progress))), 'heartbeat_at': get_seoul_time()}
+    if message is not None:
+        values['message'] = message[:200]
+    _touch_job(job_id, values)
+
+
+def _keep_alive(app, job_id, stop):
+    """작업이 도는 동안 heartbeat_at 을 주기적으로 갱신합니다.
+
+    진행률을 보고하지 않는 핸들러도 JOB_STALE_SECONDS 를 넘겨 실행되면 다른 워커가 다시 가져가지 않도록 합니다.
+    """
+    interval = max(1, app.config.get('JOB_STALE_SECONDS', 600) // 4)
+    with app.app_context():
+        while not stop.wait(interval):
+            _touch_job(job_id, {'heartbeat_at': get_seoul_time()})
+
+
+def _run_job(app, job_id):
+    job = db.session.get(BackgroundJob, job_id)
+    handler = _JOB_HANDLERS.get(job.kind)
+    params = dict(job.params or {})
+
+    stop = threading.Event()
+    heartbeat = threading.Thread(target=_keep_alive, args=(app, job_id, stop), name=f'job-heartbeat-{job_id}', daemon=True)
+    heartbeat.start()
+    try:
+        if handler is None:
+            raise ValueError(f"등록되지 않은 작업입니다: {job.kind}")
+        result = handler(params, lambda progress, message=None: _report_progress(job_id, progress, message))
+        db.session.commit()
+
+        job = db.session.get(BackgroundJob, job_id)
+        job.status = 'done'
+        job.progress = 100
+        job.result = result
+        job.finished_at = get_seoul_time()
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        app.logger.error(f"Background job {job_id} error : {e}")
+        traceback.print_exc()
+
+        job = db.session.get(BackgroundJob, job_id)
+        job.status = 'failed'
+        job.error = str(e)
+        job.finished_at = get_seoul_time()
+        db.session.commit()
+    finally:
+        stop.set()
+        heartbeat.join()
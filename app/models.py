@@ -53,9 +53,69 @@ class Match(db.Model):
     timestamp = db.Column(db.DateTime(timezone=True), default=get_seoul_time)
     approved = db.Column(db.Boolean, default=False)
 
+    # 두 선수 간 최근 경기를 시간 역순으로 페이지 단위로 읽을 때 사용합니다.
+    __table_args__ = (db.Index('ix_match_winner_loser_timestamp', 'winner', 'loser', 'timestamp'),)
+
     def __repr__(self):
         return f"<Match {self.winner_name} vs {self.loser_name}>"
 
+# 승인된 경기 기준 (선수, 상대) 쌍별 경기 수. 양방향으로 한 행씩 저장합니다.
+class PlayerOpponent(db.Model):
+    player_id = db.Column(db.Integer, db.ForeignKey('player.id'), primary_key=True)
+    opponent_id = db.Column(db.Integer, db.ForeignKey('player.id'), primary_key=True)
+    match_count = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<PlayerOpponent {self.player_id} vs {self.opponent_id}: {self.match_count}>"
+
+# 승인된 경기 기준 두 선수의 상대 전적. 순서 없는 쌍이라 (작은 id, 큰 id) 로 한 행만 저장합니다.
+# last_match_* 는 그 쌍의 가장 최근 승인 경기이며, 경기 승인/삭제 시 함께 갱신합니다.
+class HeadToHead(db.Model):
+    player_low_id = db.Column(db.Integer, db.ForeignKey('player.id'), primary_key=True)
+    player_high_id = db.Column(db.Integer, db.ForeignKey('player.id'), primary_key=True)
+    low_wins = db.Column(db.Integer, nullable=False, default=0)
+    high_wins = db.Column(db.Integer, nullable=False, default=0)
+    last_match_id = db.Column(db.Integer, db.ForeignKey('match.id'), nullable=True)
+    last_match_at = db.Column(db.DateTime(timezone=True), nullable=True)
+
+    def __repr__(self):
+        return f"<HeadToHead {self.player_low_id} vs {self.player_high_id}: {self.low_wins}-{self.high_wins}>"
+
+# 경기 승인 시 선수별로 실제 적용된 변화량. 경기 삭제 시 이 값을 그대로 되돌립니다.
+# points 는 [사유, 업적 변화, 베팅 변화] 목록, rank_before 는 승인으로 부수가 바뀐 경우에만 기록합니다.
+class MatchJournal(db.Model):
+    match_id = db.Column(db.Integer, db.ForeignKey('match.id'), primary_key=True)
+    player_id = db.Column(db.Integer, db.ForeignKey('player.id'), primary_key=True)
+    opponent_id = db.Column(db.Integer, nullable=False)
+    match_count = db.Column(db.Integer, nullable=False, default=0)
+    win_count = db.Column(db.Integer, nullable=False, default=0)
+    loss_count = db.Column(db.Integer, nullable=False, default=0)
+    achieve_count = db.Column(db.Integer, nullable=False, default=0)
+    betting_count = db.Column(db.Integer, nullable=False, default=0)
+    rank_before = db.Column(db.Integer, nullable=True)
+    rank_after = db.Column(db.Integer, nullable=True)
+    points = db.Column(db.JSON, nullable=False, default=list)
+
+    def __repr__(self):
+        return f"<MatchJournal match={self.match_id} player={self.player_id}>"
+
+# 카테고리별 상위 선수 목록. 순위 재계산 때만 다시 만들어지며 화면은 이 값을 그대로 읽습니다.
+class Leaderboard(db.Model):
+    category = db.Column(db.String(20), primary_key=True)
+    entries = db.Column(db.JSON, nullable=False, default=list)
+    updated_at = db.Column(db.DateTime(timezone=True), default=get_seoul_time)
+
+    def __repr__(self):
+        return f"<Leaderboard {self.category}>"
+
+# 캐시 무효화용 버전 번호. key 는 'player:<id>', 'bettings', 'all' 등 캐시 범위입니다.
+class CacheVersion(db.Model):
+    key = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<CacheVersion {self.key}={self.version}>"
+
 class UpdateLog(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(100), nullable=False)
@@ -65,31 +125,45 @@ class UpdateLog(db.Model):
 class League(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(50), nullable=True)
-    p1 = db.Column(db.String(100), nullable=False)
-    p2 = db.Column(db.String(100), nullable=False)
-    p3 = db.Column(db.String(100), nullable=False)
-    p4 = db.Column(db.String(100), nullable=False)
-    p5 = db.Column(db.String(100), nullable=False)
-    p1p2 = db.Column(db.Integer, default=None)
-    p1p3 = db.Column(db.Integer, default=None)
-    p1p4 = db.Column(db.Integer, default=None)
-    p1p5 = db.Column(db.Integer, default=None)
-    p2p1 = db.Column(db.Integer, default=None)
-    p2p3 = db.Column(db.Integer, default=None)
-    p2p4 = db.Column(db.Integer, default=None)
-    p2p5 = db.Column(db.Integer, default=None)
-    p3p1 = db.Column(db.Integer, default=None)
-    p3p2 = db.Column(db.Integer, default=None)
-    p3p4 = db.Column(db.Integer, default=None)
-    p3p5 = db.Column(db.Integer, default=None)
-    p4p1 = db.Column(db.Integer, default=None)
-    p4p2 = db.Column(db.Integer, default=None)
-    p4p3 = db.Column(db.Integer, default=None)
-    p4p5 = db.Column(db.Integer, default=None)
-    p5p1 = db.Column(db.Integer, default=None)
-    p5p2 = db.Column(db.Integer, default=None)
-    p5p3 = db.Column(db.Integer, default=None)
-    p5p4 = db.Column(db.Integer, default=None)
+    created_at = db.Column(db.DateTime(timezone=True), default=get_seoul_time)
+    # 목록 화면용 요약값. 결과가 바뀔 때 함께 갱신합니다.
+    member_count = db.Column(db.Integer, nullable=False, default=0)
+    result_count = db.Column(db.Integer, nullable=False, default=0)
+    members = db.relationship('LeagueMember', backref='league', order_by='LeagueMember.position', cascade='all, delete-orphan')
+    results = db.relationship('LeagueResult', backref='league', cascade='all, delete-orphan')
+
+    @property
+    def status(self):
+        # 모든 선수 쌍의 결과가 들어오면 종료된 리그로 봅니다.
+        return 'ongoing' if self.result_count < self.member_count * (self.member_count - 1) // 2 else 'finished'
+
+    def __repr__(self):
+        return f"<League {self.name}>"
+
+# 리그 참가자. position 은 리그 안에서의 자리 순서(1부터)입니다.
+# wins/losses/score_diff/rank 는 결과가 바뀔 때마다 증분으로 갱신되는 순위표 값입니다.
+class LeagueMember(db.Model):
+    league_id = db.Column(db.Integer, db.ForeignKey('league.id'), primary_key=True)
+    player_id = db.Column(db.Integer, db.ForeignKey('player.id'), primary_key=True, index=True)
+    position = db.Column(db.Integer, nullable=False)
+    wins = db.Column(db.Integer, nullable=False, default=0)
+    losses = db.Column(db.Integer, nullable=False, default=0)
+    score_diff = db.Column(db.Integer, nullable=False, default=0)
+    rank = db.Column(db.Integer, nullable=False, default=1)
+    player = db.relationship('Player')
+
+# 리그 경기 결과. 두 선수 쌍마다 최대 한 행이며, 점수는 세트 스코어(없으면 NULL)입니다.
+class LeagueResult(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    league_id = db.Column(db.Integer, db.ForeignKey('league.id'), nullable=False, index=True)
+    winner_id = db.Column(db.Integer, db.ForeignKey('player.id'), nullable=False, index=True)
+    loser_id = db.Column(db.Integer, db.ForeignKey('player.id'), nullable=False, index=True)
+    winner_score = db.Column(db.Integer, nullable=True)
+    loser_score = db.Column(db.Integer, nullable=True)
+    timestamp = db.Column(db.DateTime(timezone=True), default=get_seoul_time)
+
+    def __repr__(self):
+        return f"<LeagueResult {self.winner_id} > {self.loser_id}>"
 
 class Betting(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -102,11 +176,33 @@ class Betting(db.Model):
     submitted = db.Column(db.Boolean, default=False)
     result = db.Column(db.Integer, db.ForeignKey('match.id'), nullable=True)
     is_closed = db.Column(db.Boolean, default=False, nullable=True)
+    # 베팅 현황 요약값(참가자 수, 선수별 예측 수). 참가자 행이 바뀔 때 adjust_betting_pool 로 함께 증감합니다.
+    participant_count = db.Column(db.Integer, nullable=False, default=0)
+    p1_bettors = db.Column(db.Integer, nullable=False, default=0)
+    p2_bettors = db.Column(db.Integer, nullable=False, default=0)
     participants = db.relationship('BettingParticipant', backref='betting', cascade='all, delete-orphan')
 
+    # 베팅 승인 화면의 (approved, id) 키셋 페이지네이션용
+    __table_args__ = (db.Index('ix_betting_submitted_approved_id', 'submitted', 'approved', 'id'),)
+
+    @property
+    def pot(self):
+        # 결과 제출 시 나누는 총 포인트: 두 선수와 참가자 모두의 몫
+        return self.point * (2 + self.participant_count)
+
+    def projected_share(self, winner_id):
+        # winner_id 가 이기면 승자와 맞힌 참가자가 나눠 받을 1인당 포인트
+        bettors = self.p1_bettors if winner_id == self.p1_id else self.p2_bettors if winner_id == self.p2_id else 0
+        return self.pot // (1 + bettors)
+
+    @property
+    def p1_percent(self):
+        total = self.p1_bettors + self.p2_bettors
+        return (self.p1_bettors / total) * 100 if total > 0 else 50
+
 class BettingParticipant(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    betting_id = db.Column(db.Integer, db.ForeignKey('betting.id'), nullable=False)
+    betting_id = db.Column(db.Integer, db.ForeignKey('betting.id'), nullable=False, index=True)
     participant_name = db.Column(db.String(100), nullable=False)
     participant_id = db.Column(db.Integer, db.ForeignKey('player.id'), nullable=True)
     winner_id = db.Column(db.Integer, db.ForeignKey('player.id'), nullable=True)
@@ -131,7 +227,22 @@ class PlayerPointLog(db.Model):
 
     def __repr__(self):
         return f"<PlayerPointLog {self.player.name} {self.reason}>"
-    
+
+# 복식부기 포인트 원장. 한 행은 계정 하나의 변동이고, 같은 entry_id 의 행들은 통화(currency)별 합이 0입니다.
+# player_id 가 없으면 시스템 계정(포인트 발행/소멸)입니다. Player.achieve_count/betting_count 는
+# 선수 계정 합계를 유지하는 값이며 flask reconcile-points 로 검증합니다. (선수 삭제 후에도 기록을 남기도록 FK 는 두지 않습니다)
+class PointLedger(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    entry_id = db.Column(db.String(32), nullable=False, index=True)
+    player_id = db.Column(db.Integer, nullable=True, index=True)
+    currency = db.Column(db.String(10), nullable=False) # achieve, betting
+    amount = db.Column(db.Integer, nullable=False)
+    reason = db.Column(db.String(100), nullable=False)
+    timestamp = db.Column(db.DateTime(timezone=True), default=get_seoul_time)
+
+    def __repr__(self):
+        return f"<PointLedger {self.entry_id} {self.player_id} {self.currency} {self.amount}>"
+
 class User(UserMixin, db.Model):
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(64), index=True, unique=True)
@@ -157,4 +268,38 @@ class Tournament(db.Model):
     title = db.Column(db.String(150), nullable=False)
     status = db.Column(db.String(20), default='대기중', nullable=False) # 대기중, 진행중, 완료
     created_at = db.Column(db.DateTime(timezone=True), default=get_seoul_time)
-    bracket_data = db.Column(db.JSON, nullable=True)
\ No newline at end of file
+    # 대진표 요약(방식, 크기, 결승 경기, 우승자). 경기 노드는 TournamentMatch 에 한 행씩 저장합니다.
+    bracket_data = db.Column(db.JSON, nullable=True)
+    matches = db.relationship('TournamentMatch', backref='tournament', cascade='all, delete-orphan')
+
+# 토너먼트 경기 노드(app/bracket.py 형식). 결과 하나는 그 경기에서 이어지는 몇 행만 갱신합니다.
+class TournamentMatch(db.Model):
+    tournament_id = db.Column(db.Integer, db.ForeignKey('tournament.id'), primary_key=True)
+    node_id = db.Column(db.String(10), primary_key=True)
+    node = db.Column(db.JSON, nullable=False)
+
+class BackgroundJob(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(50), nullable=False)
+    status = db.Column(db.String(20), default='pending', nullable=False, index=True) # pending, running, done, failed
+    params = db.Column(db.JSON, nullable=True)
+    progress = db.Column(db.Integer, default=0, nullable=False)
+    message = db.Column(db.String(200), nullable=True)
+    result = db.Column(db.JSON, nullable=True)
+    error = db.Column(db.Text, nullable=True)
+    attempts = db.Column(db.Integer, default=0, nullable=False)
+    created_at = db.Column(db.DateTime(timezone=True), default=get_seoul_time)
+    started_at = db.Column(db.DateTime(timezone=True), nullable=True)
+    heartbeat_at = db.Column(db.DateTime(timezone=True), nullable=True)
+    finished_at = db.Column(db.DateTime(timezone=True), nullable=True)
+
+    def to_dict(self):
+        return {
+            'id': self.id, 'kind': self.kind, 'status': self.status,
+            'progress': self.progress, 'message': self.message,
+            'result': self.result, 'error': self.error,
+            'created_at': self.created_at, 'started_at': self.started_at, 'finished_at': self.finished_at
+        }
+
+    def __repr__(self):
+        return f"<BackgroundJob {self.id} {self.kind} {self.status}>"
@@ -3,8 +3,13 @@ from flask_login import current_user, login_required
 from flask_babel import _, ngettext
 from sqlalchemy import case, func
 from ..extensions import db
-from ..models import Match, Player, User, UpdateLog, Betting, BettingParticipant, TodayPartner, PlayerPointLog
-from ..utils import add_point_log, update_player_orders_by_match, update_player_orders_by_point
+from ..models import Match, MatchJournal, Player, PlayerOpponent, User, UpdateLog, Betting, BettingParticipant, TodayPartner, PlayerPointLog, BackgroundJob, LeagueMember, LeagueResult
+from ..utils import (
+    add_points, close_point_accounts, delete_head_to_head, invalidate_dashboards, invalidate_player_names, mark_player_orders_dirty,
+    rebuild_league_standings, refresh_betting_pools, refresh_leaderboards, resolve_player_ids
+)
+from ..stats import rebuild_player_stats
+from ..jobs import enqueue_job, ensure_job_worker, job_handler, no_progress, wants_async
 from ..models import GenderEnum, FreshmanEnum
 from datetime import datetime
 from zoneinfo import ZoneInfo
@@ -78,14 +83,11 @@ def update_player_points():
     try:
         point_value = int(value)
         reason = "수동 조정"
+        # 절대값을 쓰지 않고 차이만큼 증감해 원장과 잔액이 같은 이동으로 바뀌게 합니다.
         if point_type == 'achieve':
-            change = point_value - player.achieve_count
-            player.achieve_count = point_value
-            add_point_log(player_id, achieve_change=change, reason=reason)
+            add_points(player.id, achieve_change=point_value - player.achieve_count, reason=reason)
         elif point_type == 'betting':
-            change = point_value - player.betting_count
-            player.betting_count = point_value
-            add_point_log(player_id, betting_change=change, reason=reason)
+            add_points(player.id, betting_change=point_value - player.betting_count, reason=reason)
         else:
             return jsonify({'success': False, 'error': '잘못된 포인트 타입입니다.'}), 400
         db.session.commit()
@@ -110,7 +112,8 @@ def update_player_rank():
         return jsonify({'success': False, 'error': '선수를 찾을 수 없습니다.'}), 404
     try:
         player.rank = int(new_rank_str) if new_rank_str else None
-        db.session.commit()
+        # 리더보드 항목에도 부수가 담기므로 함께 다시 만듭니다. (커밋 포함)
+        refresh_leaderboards()
         return jsonify({'success': True, 'message': '부수가 성공적으로 업데이트되었습니다.'})
     except (ValueError, TypeError):
         return jsonify({'success': False, 'error': '유효한 부수(숫자)를 입력해주세요.'}), 400
@@ -134,18 +137,15 @@ def save_all_assignment_changes():
                 player.rank = int(change['rank']) if change['rank'] else None
             if 'achieve_count' in change:
                 new_achieve = int(change['achieve_count'])
-                diff = new_achieve - player.achieve_count
-                if diff != 0:
-                    player.achieve_count = new_achieve
-                    add_point_log(player_id, achieve_change=diff, reason="관리자 수동 조정")
+                add_points(player.id, achieve_change=new_achieve - player.achieve_count, reason="관리자 수동 조정")
             if 'betting_count' in change:
                 new_betting = int(change['betting_count'])
-                diff = new_betting - player.betting_count
-                if diff != 0:
-                    player.betting_count = new_betting
-                    add_point_log(player_id, betting_change=diff, reason="관리자 수동 조정")
-        db.session.commit()
-        update_player_orders_by_point()
+                add_points(player.id, betting_change=new_betting - player.betting_count, reason="관리자 수동 조정")
+        if any('rank' in change for change in changes):
+            refresh_leaderboards()
+        else:
+            db.session.commit()
+        mark_player_orders_dirty('point')
         return jsonify({'success': True, 'message': '모든 변경사항이 저장되었습니다.'})
     except Exception as e:
         db.session.rollback()
@@ -160,93 +160,103 @@ def update_ranks():
     if not current_user.is_admin:
         return jsonify({'error': '권한이 없습니다.'}), 403
 
+    if wants_async():
+        job = enqueue_job('update_ranks')
+        return jsonify({'success': True, 'job_id': job.id, 'status_url': url_for('admin.job_status', job_id=job.id)}), 202
+
     try:
-        players = Player.query.filter(Player.match_count >= 5).order_by(
-            Player.rate_count.desc(), Player.match_count.desc()
-        ).all()
-
-        total_players = len(players)
-
-        for player in players:
-            player.previous_rank = player.rank
-
-        rank_boundaries = {
-            1: int(total_players * 0.03),
-            2: int(total_players * 0.13),
-            3: int(total_players * 0.30),
-            4: int(total_players * 0.55),
-            5: int(total_players * 0.75),
-            6: int(total_players * 0.90),
-        }
-
-        for i, player in enumerate(players):
-            if player.is_she_or_he_freshman == FreshmanEnum.YES and player.match_count < 16:
-                continue
-            position = i + 1
-            if position <= rank_boundaries.get(1, 0): new_rank = 1
-            elif position <= rank_boundaries.get(2, 0): new_rank = 2
-            elif position <= rank_boundaries.get(3, 0): new_rank = 3
-            elif position <= rank_boundaries.get(4, 0): new_rank = 4
-            elif position <= rank_boundaries.get(5, 0): new_rank = 5
-            elif position <= rank_boundaries.get(6, 0): new_rank = 6
-            else: new_rank = 7
-            player.rank = new_rank
-
-        for player in players:
-            if player.previous_rank is None or player.previous_rank == 0:
-                player.rank_change = "New"
-            elif player.rank < player.previous_rank:
-                player.rank_change = "Up"
-            elif player.rank > player.previous_rank:
-                player.rank_change = "Down"
-            else:
-                player.rank_change = None
-
-        table_rows = [
-            f"""
-            <tr>
-                <td class="border border-gray-300 p-2">{player.name}</td>
-                <td class="border border-gray-300 p-2">{player.previous_rank or '무'}</td>
-                <td class="border border-gray-300 p-2">{player.rank or '무'}</td>
-                <td class="border border-gray-300 p-2">{player.rate_count}%</td>
-                <td class="border border-gray-300 p-2">{player.rank_change or ''}</td>
-            </tr>
-            """
-            for player in players
-        ]
-
-        html_content = f"""
-        <div class="bg-gray-100">
-            <table class="w-full bg-white border-collapse border border-gray-300 text-center">
-                <thead class="bg-gray-100">
-                    <tr>
-                        <th class="border border-gray-300 p-2">{total_players}명</th>
-                        <th class="border border-gray-300 p-2">전</th>
-                        <th class="border border-gray-300 p-2">후</th>
-                        <th class="border border-gray-300 p-2">승률</th>
-                        <th class="border border-gray-300 p-2">변동</th>
-                    </tr>
-                </thead>
-                <tbody>
-                    {''.join(table_rows)}
-                </tbody>
-            </table>
-        </div>
-        """
+        result = _update_ranks_job({}, no_progress)
+        return jsonify({'success': True, 'message': result['message']})
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
+@job_handler('update_ranks')
+def _update_ranks_job(params, report_progress):
+    players = Player.query.filter(Player.match_count >= 5).order_by(
+        Player.rate_count.desc(), Player.match_count.desc()
+    ).all()
 
-        current_time = datetime.now(ZoneInfo("Asia/Seoul"))
-        new_log = UpdateLog(title=f"부수 업데이트 - {current_time.date()}", html_content=html_content, timestamp=current_time)
-        db.session.add(new_log)
+    total_players = len(players)
 
-        for player in players:
-            player.previous_rank = None
+    for player in players:
+        player.previous_rank = player.rank
+
+    rank_boundaries = {
+        1: int(total_players * 0.03),
+        2: int(total_players * 0.13),
+        3: int(total_players * 0.30),
+        4: int(total_players * 0.55),
+        5: int(total_players * 0.75),
+        6: int(total_players * 0.90),
+    }
+
+    for i, player in enumerate(players):
+        if player.is_she_or_he_freshman == FreshmanEnum.YES and player.match_count < 16:
+            continue
+        position = i + 1
+        if position <= rank_boundaries.get(1, 0): new_rank = 1
+        elif position <= rank_boundaries.get(2, 0): new_rank = 2
+        elif position <= rank_boundaries.get(3, 0): new_rank = 3
+        elif position <= rank_boundaries.get(4, 0): new_rank = 4
+        elif position <= rank_boundaries.get(5, 0): new_rank = 5
+        elif position <= rank_boundaries.get(6, 0): new_rank = 6
+        else: new_rank = 7
+        player.rank = new_rank
+
+    for player in players:
+        if player.previous_rank is None or player.previous_rank == 0:
+            player.rank_change = "New"
+        elif player.rank < player.previous_rank:
+            player.rank_change = "Up"
+        elif player.rank > player.previous_rank:
+            player.rank_change = "Down"
+        else:
             player.rank_change = None
 
-        db.session.commit()
-        return jsonify({'success': True, 'message': f'{total_players}명의 부수가 업데이트되었습니다.'})
-    except Exception as e:
-        db.session.rollback()
-        return jsonify({'success': False, 'error': str(e)}), 500
+    table_rows = [
+        f"""
+        <tr>
+            <td class="border border-gray-300 p-2">{player.name}</td>
+            <td class="border border-gray-300 p-2">{player.previous_rank or '무'}</td>
+            <td class="border border-gray-300 p-2">{player.rank or '무'}</td>
+            <td class="border border-gray-300 p-2">{player.rate_count}%</td>
+            <td class="border border-gray-300 p-2">{player.rank_change or ''}</td>
+        </tr>
+        """
+        for player in players
+    ]
+
+    html_content = f"""
+    <div class="bg-gray-100">
+        <table class="w-full bg-white border-collapse border border-gray-300 text-center">
+            <thead class="bg-gray-100">
+                <tr>
+                    <th class="border border-gray-300 p-2">{total_players}명</th>
+                    <th class="border border-gray-300 p-2">전</th>
+                    <th class="border border-gray-300 p-2">후</th>
+                    <th class="border border-gray-300 p-2">승률</th>
+                    <th class="border border-gray-300 p-2">변동</th>
+                </tr>
+            </thead>
+            <tbody>
+                {''.join(table_rows)}
+            </tbody>
+        </table>
+    </div>
+    """
+
+    current_time = datetime.now(ZoneInfo("Asia/Seoul"))
+    new_log = UpdateLog(title=f"부수 업데이트 - {current_time.date()}", html_content=html_content, timestamp=current_time)
+    db.session.add(new_log)
+
+    for player in players:
+        player.previous_rank = None
+        player.rank_change = None
+
+    refresh_leaderboards()
+    return {'total': total_players, 'message': f'{total_players}명의 부수가 업데이트되었습니다.'}
 
 
 # settings.js API
@@ -255,6 +265,7 @@ def update_ranks():
 def reset_partner():
     try:
         TodayPartner.query.delete()
+        invalidate_dashboards(everyone=True)
         db.session.commit()
         return "오늘의 상대 초기화 완료", 200
     except Exception as e:
@@ -283,12 +294,13 @@ def submit_partner():
     data = request.json
     pairs = data.get('pairs', [])
     try:
+        player_ids = resolve_player_ids([pair[key] for pair in pairs for key in ('p1_name', 'p2_name')])
         for pair in pairs:
-            p1 = Player.query.filter_by(name=pair['p1_name']).first()
-            p2 = Player.query.filter_by(name=pair['p2_name']).first()
-            if not p1 or not p2:
-                return jsonify({"error": f"{pair['p1_name'] if not p1 else pair['p2_name']}의 정보를 찾을 수 없습니다."}), 400
-            db.session.add(TodayPartner(p1_id=p1.id, p1_name=p1.name, p2_id=p2.id, p2_name=p2.name))
+            p1_id, p2_id = player_ids.get(pair['p1_name']), player_ids.get(pair['p2_name'])
+            if not p1_id or not p2_id:
+                return jsonify({"error": f"{pair['p1_name'] if not p1_id else pair['p2_name']}의 정보를 찾을 수 없습니다."}), 400
+            db.session.add(TodayPartner(p1_id=p1_id, p1_name=pair['p1_name'], p2_id=p2_id, p2_name=pair['p2_name']))
+            invalidate_dashboards([p1_id, p2_id])
         db.session.commit()
         return "오늘의 상대 저장 완료", 200
     except Exception as e:
@@ -301,12 +313,13 @@ def register_players():
     data = request.get_json()
     players_data = data.get('players', [])
     added_count = 0
+    existing = set(resolve_player_ids([player_info.get('name') for player_info in players_data]))
     for player_info in players_data:
         name = player_info.get('name')
         gender_str = player_info.get('gender')
         freshman_str = player_info.get('freshman')
         if not name or not gender_str or not freshman_str: continue
-        if not Player.query.filter_by(name=name).first():
+        if name not in existing:
             gender_enum = GenderEnum(gender_str)
             freshman_enum = FreshmanEnum(freshman_str)
             initial_rank = None
@@ -315,6 +328,7 @@ def register_players():
             elif gender_enum == GenderEnum.FEMALE:
                 initial_rank = 8 if freshman_enum == FreshmanEnum.YES else 6
             db.session.add(Player(name=name, gender=gender_enum, is_she_or_he_freshman=freshman_enum, rank=initial_rank))
+            existing.add(name)
             added_count += 1
     db.session.commit()
     return jsonify({'success': True, 'added_count': added_count})
@@ -327,18 +341,17 @@ def toggle_validity():
     for player in Player.query.filter(Player.id.in_(ids)).all():
         player.is_valid = not player.is_valid
     db.session.commit()
-    update_player_orders_by_match()
-    update_player_orders_by_point()
+    mark_player_orders_dirty('match', 'point')
     return jsonify({'success': True, 'message': '선수의 유효/무효 상태가 변경되었습니다.'})
 
 
 @admin_bp.route('/delete_players', methods=['POST'])
 def delete_players():
     ids = request.get_json().get('ids', [])
-    Player.query.filter(Player.id.in_(ids)).delete(synchronize_session=False)
+    for player_id in ids:
+        _delete_player(int(player_id))
     db.session.commit()
-    update_player_orders_by_match()
-    update_player_orders_by_point()
+    mark_player_orders_dirty('match', 'point')
     return jsonify({'success': True, 'message': '선택한 선수가 삭제되었습니다.'})
 
 
@@ -346,9 +359,9 @@ def delete_players():
 def get_player_ids():
     names = request.get_json().get('names', [])
     if not names: return jsonify({'success': False, 'error': 'No names provided'}), 400
-    players = Player.query.filter(Player.name.in_(names)).all()
-    if not players: return jsonify({'success': False, 'error': 'No players found'}), 404
-    return jsonify({'success': True, 'player_ids': [p.id for p in players]})
+    player_ids = resolve_player_ids(names)
+    if not player_ids: return jsonify({'success': False, 'error': 'No players found'}), 404
+    return jsonify({'success': True, 'player_ids': list(player_ids.values())})
 
 
 @admin_bp.route('/update_achievement', methods=['POST'])
@@ -363,13 +376,11 @@ def update_achievement():
     if not players: return jsonify({'success': False, 'error': 'No players found'}), 404
     for player in players:
         if additional_achieve != 0:
-            player.achieve_count += additional_achieve
-            add_point_log(player.id, achieve_change=additional_achieve, reason='수동 입력')
+            add_points(player.id, achieve_change=additional_achieve, reason='수동 입력')
         if additional_betting != 0:
-            player.betting_count += additional_betting
-            add_point_log(player.id, betting_change=additional_betting, reason='수동 입력')
+            add_points(player.id, betting_change=additional_betting, reason='수동 입력')
     db.session.commit()
-    update_player_orders_by_point()
+    mark_player_orders_dirty('point')
     return jsonify({'success': True})
 
 
@@ -381,31 +392,15 @@ def admin_delete_players():
     player_ids_to_delete = request.json.get('player_ids', [])
     if not player_ids_to_delete:
         return jsonify({'success': False, 'error': '삭제할 선수가 선택되지 않았습니다.'}), 400
+
+    if wants_async():
+        job = enqueue_job('delete_players', {'player_ids': player_ids_to_delete, 'rebuild_stats': True})
+        return jsonify({'success': True, 'job_id': job.id, 'status_url': url_for('admin.job_status', job_id=job.id),
+                        'message': f'{len(player_ids_to_delete)}명의 선수 삭제 및 통계 재계산을 시작했습니다.'}), 202
+
     try:
-        for player_id_str in player_ids_to_delete:
-            player_id = int(player_id_str)
-            BettingParticipant.query.filter(
-                (BettingParticipant.participant_id == player_id) | (BettingParticipant.winner_id == player_id)
-            ).delete(synchronize_session=False)
-            bettings_to_delete = Betting.query.filter((Betting.p1_id == player_id) | (Betting.p2_id == player_id)).all()
-            for b in bettings_to_delete:
-                BettingParticipant.query.filter_by(betting_id=b.id).delete(synchronize_session=False)
-                db.session.delete(b)
-            matches_to_delete = Match.query.filter((Match.winner == player_id) | (Match.loser == player_id)).all()
-            if matches_to_delete:
-                match_ids = [m.id for m in matches_to_delete]
-                Betting.query.filter(Betting.result.in_(match_ids)).update({"result": None}, synchronize_session=False)
-                for m in matches_to_delete:
-                    db.session.delete(m)
-            PlayerPointLog.query.filter_by(player_id=player_id).delete(synchronize_session=False)
-            TodayPartner.query.filter((TodayPartner.p1_id == player_id) | (TodayPartner.p2_id == player_id)).delete(synchronize_session=False)
-            user = User.query.filter_by(player_id=player_id).first()
-            if user: db.session.delete(user)
-            player = Player.query.get(player_id)
-            if player: db.session.delete(player)
-        db.session.commit()
-        recalculate_url = url_for('admin.recalculate_all_stats')
-        return jsonify({'success': True, 'message': f'{len(player_ids_to_delete)}명의 선수가 삭제되었습니다. 전체 통계를 재계산합니다.', 'redirect_url': recalculate_url})
+        result = _delete_players_job({'player_ids': player_ids_to_delete, 'rebuild_stats': True}, no_progress)
+        return jsonify({'success': True, 'message': result['message']})
     except Exception as e:
         db.session.rollback()
         current_app.logger.error(f"Error deleting players: {e}")
@@ -414,32 +409,114 @@ def admin_delete_players():
         return jsonify({'success': False, 'error': f'삭제 중 오류 발생: {str(e)}'}), 500
 
 
-@admin_bp.route('/admin/recalculate-stats')
+def _delete_player(player_id):
+    """선수와 그 선수를 참조하는 베팅/경기/로그/리그 기록을 지우고, 영향받은 베팅 현황과 리그 순위표를 다시 맞춥니다.
+
+    선수 삭제 경로(설정 화면, 관리자 작업)는 모두 이 함수를 거칩니다. 커밋은 호출한 쪽에서 합니다.
+    """
+    affected_participants = BettingParticipant.query.filter(
+        (BettingParticipant.participant_id == player_id) | (BettingParticipant.winner_id == player_id)
+    )
+    affected_bettings = [betting_id for betting_id, in affected_participants.with_entities(BettingParticipant.betting_id).distinct()]
+    affected_participants.delete(synchronize_session=False)
+    refresh_betting_pools(affected_bettings)
+    bettings_to_delete = Betting.query.filter((Betting.p1_id == player_id) | (Betting.p2_id == player_id)).all()
+    for b in bettings_to_delete:
+        BettingParticipant.query.filter_by(betting_id=b.id).delete(synchronize_session=False)
+        db.session.delete(b)
+    delete_head_to_head([player_id])
+    matches_to_delete = Match.query.filter((Match.winner == player_id) | (Match.loser == player_id)).all()
+    if matches_to_delete:
+        match_ids = [m.id for m in matches_to_delete]
+        Betting.query.filter(Betting.result.in_(match_ids)).update({"result": None}, synchronize_session=False)
+        MatchJournal.query.filter(MatchJournal.match_id.in_(match_ids)).delete(synchronize_session=False)
+        for m in matches_to_delete:
+            db.session.delete(m)
+    PlayerPointLog.query.filter_by(player_id=player_id).delete(synchronize_session=False)
+    opponent_ids = [pair.player_id for pair in PlayerOpponent.query.filter_by(opponent_id=player_id).all()]
+    if opponent_ids:
+        Player.query.filter(Player.id.in_(opponent_ids)).update(
+            {Player.opponent_count: Player.opponent_count - 1}, synchronize_session=False)
+    PlayerOpponent.query.filter(
+        (PlayerOpponent.player_id == player_id) | (PlayerOpponent.opponent_id == player_id)
+    ).delete(synchronize_session=False)
+    TodayPartner.query.filter((TodayPartner.p1_id == player_id) | (TodayPartner.p2_id == player_id)).delete(synchronize_session=False)
+    league_results = LeagueResult.query.filter((LeagueResult.winner_id == player_id) | (LeagueResult.loser_id == player_id))
+    affected_leagues = {league_id for league_id, in league_results.with_entities(LeagueResult.league_id).distinct()}
+    affected_leagues.update(
+        league_id for league_id, in LeagueMember.query.filter_by(player_id=player_id).with_entities(LeagueMember.league_id)
+    )
+    league_results.delete(synchronize_session=False)
+    LeagueMember.query.filter_by(player_id=player_id).delete(synchronize_session=False)
+    for league_id in sorted(affected_leagues):
+        rebuild_league_standings(league_id)
+    user = User.query.filter_by(player_id=player_id).first()
+    if user: db.session.delete(user)
+    player = Player.query.get(player_id)
+    if player:
+        close_point_accounts([player_id])
+        db.session.delete(player)
+    invalidate_dashboards(everyone=True)
+    invalidate_player_names()
+
+
+@job_handler('delete_players')
+def _delete_players_job(params, report_progress):
+    """선수와 관련된 경기/베팅/로그를 선수 단위로 삭제합니다. rebuild_stats 이면 이어서 전체 통계를 재계산합니다."""
+    player_ids = params.get('player_ids', [])
+    for index, player_id_str in enumerate(player_ids, start=1):
+        _delete_player(int(player_id_str))
+        db.session.commit()
+        report_progress(index * 90 // len(player_ids), f'{index}/{len(player_ids)}명 삭제')
+
+    result = {'deleted': len(player_ids), 'message': f'{len(player_ids)}명의 선수가 삭제되었습니다.'}
+    if params.get('rebuild_stats'):
+        rebuilt = _rebuild_stats_job({}, no_progress)
+        result['message'] += ' ' + rebuilt['message']
+    return result
+
+
+@admin_bp.route('/admin/recalculate-stats', methods=['GET', 'POST'])
 @login_required
 def recalculate_all_stats():
     if not current_user.is_admin:
         flash(_('권한이 없습니다.', 'error'))
         return redirect(url_for('main.index'))
+    # GET 은 바뀔 내용만 보여 주고(dry run), 실제 재계산은 POST 로만 합니다.
+    if request.method == 'GET' or request.args.get('dry_run', 'false').lower() in ('1', 'true'):
+        differences = rebuild_player_stats(dry_run=True)
+        return jsonify({'success': True, 'count': len(differences), 'differences': differences})
+    if wants_async():
+        job = enqueue_job('rebuild_stats')
+        return jsonify({'success': True, 'job_id': job.id, 'status_url': url_for('admin.job_status', job_id=job.id)}), 202
     try:
-        all_players = Player.query.filter_by(is_valid=True).all()
-        for player in all_players:
-            win_count = Match.query.filter_by(winner=player.id, approved=True).count()
-            loss_count = Match.query.filter_by(loser=player.id, approved=True).count()
-            match_count = win_count + loss_count
-            rate_count = round((win_count / match_count) * 100, 2) if match_count > 0 else 0
-            player.win_count = win_count
-            player.loss_count = loss_count
-            player.match_count = match_count
-            player.rate_count = rate_count
-        db.session.commit()
-        update_player_orders_by_match()
-        flash('모든 선수의 전적 통계를 성공적으로 재계산했습니다.', 'success')
+        result = _rebuild_stats_job({}, no_progress)
+        flash(result['message'], 'success')
     except Exception as e:
         db.session.rollback()
         flash(f'재계산 중 오류가 발생했습니다: {e}', 'error')
     return redirect(url_for('admin.assignment'))
 
 
+@job_handler('rebuild_stats')
+def _rebuild_stats_job(params, report_progress):
+    differences = rebuild_player_stats()
+    db.session.commit()
+    mark_player_orders_dirty('match', 'point')
+    return {'count': len(differences), 'message': f'모든 선수의 전적 통계를 성공적으로 재계산했습니다. ({len(differences)}명 수정)'}
+
+
+@admin_bp.route('/admin/jobs/<int:job_id>')
+@login_required
+def job_status(job_id):
+    if not current_user.is_admin:
+        return jsonify({'success': False, 'error': '권한이 없습니다.'}), 403
+    job = BackgroundJob.query.get_or_404(job_id)
+    if job.status in ('pending', 'running'):
+        ensure_job_worker(current_app._get_current_object())
+    return jsonify({'success': True, 'job': job.to_dict()})
+
+
 @admin_bp.route('/admin/reset_password', methods=['GET', 'POST'])
 @login_required
 def admin_reset_password():
@@ -1,25 +1,35 @@
 from flask import Blueprint, render_template, jsonify, request, flash, redirect, url_for, current_app
 from flask_login import current_user, login_required
 from flask_babel import _
-from sqlalchemy import func
+from sqlalchemy import and_, case, func, or_
+from sqlalchemy.orm import load_only, selectinload
 from ..extensions import db
-from ..models import Match, Player, Betting, BettingParticipant, PlayerPointLog
-from ..utils import add_point_log, update_player_orders_by_point
-from datetime import datetime
-from zoneinfo import ZoneInfo
+from ..models import Match, Player, Betting, BettingParticipant
+from ..utils import (
+    adjust_betting_pool, claim_pending_rows, get_head_to_head, head_to_head_matches, invalidate_dashboards, load_players, mark_player_orders_dirty,
+    refund_bettings, resolve_player_ids, settle_bettings, use_read_replica
+)
 
 betting_bp = Blueprint('betting', __name__)
 
+# 베팅 상세 화면에서 한 번에 보여 줄 상대 전적 경기 수
+HEAD_TO_HEAD_PAGE_SIZE = 5
+
+# 집계한 참가자 이름을 한 문자열로 묶을 때 쓰는 구분자 (이름에 나오지 않는 문자)
+_NAME_SEPARATOR = '\x1f'
+
 
 @betting_bp.route('/betting')
+@use_read_replica
 @login_required
 def betting_page():
     bettings = Betting.query.filter_by(submitted=False).order_by(Betting.is_closed, Betting.id.desc()).all()
+    players = load_players([bet.p1_id for bet in bettings] + [bet.p2_id for bet in bettings], load_only(Player.id, Player.rank))
 
     betting_data = []
     for bet in bettings:
-        p1 = Player.query.get(bet.p1_id)
-        p2 = Player.query.get(bet.p2_id)
+        p1 = players.get(bet.p1_id)
+        p2 = players.get(bet.p2_id)
         is_player = current_user.player_id in [bet.p1_id, bet.p2_id]
         betting_data.append({
             'betting': bet, 'p1_rank': p1.rank if p1 else None,
@@ -38,6 +48,7 @@ def toggle_betting_status(betting_id):
 
     betting = Betting.query.get_or_404(betting_id)
     betting.is_closed = not betting.is_closed
+    invalidate_dashboards(bettings=True)
     db.session.commit()
 
     status = "마감" if betting.is_closed else "진행중"
@@ -55,25 +66,52 @@ def betting_approval():
 
 
 @betting_bp.route('/get_bettings', methods=['GET'])
+@use_read_replica
 def get_bettings():
-    offset = int(request.args.get('offset', 0))
     limit = int(request.args.get('limit', 30))
     tab = request.args.get('tab', 'all')
-    query = Betting.query.filter(Betting.submitted == True).order_by(Betting.approved, Betting.id.desc())
+    # 결과 경기가 아직 없는(result 가 NULL 인) 베팅도 목록에 보이도록 외부 조인합니다.
+    query = db.session.query(Betting, Match).outerjoin(Match, Match.id == Betting.result).options(
+        selectinload(Betting.participants)
+    ).filter(Betting.submitted == True).order_by(Betting.approved, Betting.id.desc())
     if tab == 'pending': query = query.filter(Betting.approved == False)
     elif tab == 'approved': query = query.filter(Betting.approved == True)
-    bettings = query.offset(offset).limit(limit).all()
-    match_ids = [b.result for b in bettings]
-    matches = Match.query.filter(Match.id.in_(match_ids)).all()
-    match_response = {m.id: {'id': m.id, 'winner_name': m.winner_name, 'winner_id': m.winner, 'loser_name': m.loser_name, 'score': m.score} for m in matches}
+
+    # (approved, id) 키셋 페이지네이션: 앞 페이지 마지막 베팅 다음부터 읽습니다. 커서가 없으면 offset 을 씁니다.
+    after_id = request.args.get('after_id', type=int)
+    if after_id is not None:
+        after_approved = request.args.get('after_approved', 'false').lower() in ('1', 'true')
+        after = and_(Betting.approved == after_approved, Betting.id < after_id)
+        query = query.filter(after if after_approved else or_(Betting.approved == True, after))
+    else:
+        query = query.offset(int(request.args.get('offset', 0)))
+    rows = query.limit(limit).all()
+
+    # 이 페이지 베팅들의 승리/패배 참가자 이름과 수는 SQL 에서 한 번에 집계합니다. (결과 경기가 없으면 집계하지 않습니다)
+    won = case((BettingParticipant.winner_id == Match.winner, 1), else_=0)
+    tally = {
+        betting_id: (win_count, lose_count, win_names, lose_names)
+        for betting_id, win_count, lose_count, win_names, lose_names in db.session.query(
+            BettingParticipant.betting_id, func.sum(won), func.sum(1 - won),
+            func.aggregate_strings(case((won == 1, BettingParticipant.participant_name)), _NAME_SEPARATOR),
+            func.aggregate_strings(case((won == 0, BettingParticipant.participant_name)), _NAME_SEPARATOR),
+        ).join(Betting, Betting.id == BettingParticipant.betting_id).join(Match, Match.id == Betting.result).filter(
+            BettingParticipant.betting_id.in_([betting.id for betting, _match in rows])
+        ).group_by(BettingParticipant.betting_id)
+    } if rows else {}
+
     response = []
-    for betting in bettings:
-        match_info = match_response.get(betting.result)
-        if match_info:
-            participants = [{'id': p.id, 'participant_name': p.participant_name, 'winner_id': p.winner_id, 'betting_id': p.betting_id} for p in betting.participants]
-            win_participants = [p['participant_name'] for p in participants if p['winner_id'] == match_info['winner_id']]
-            lose_participants = [p['participant_name'] for p in participants if p['winner_id'] != match_info['winner_id']]
-            response.append({'id': betting.id, 'match_id': betting.result, 'participants': participants, 'point': betting.point, 'approved': betting.approved, 'match': match_info, 'win_participants': win_participants, 'lose_participants': lose_participants})
+    for betting, match in rows:
+        win_count, lose_count, win_names, lose_names = tally.get(betting.id, (0, 0, None, None))
+        response.append({
+            'id': betting.id, 'match_id': betting.result, 'point': betting.point, 'approved': betting.approved,
+            'participants': [{'id': p.id, 'participant_name': p.participant_name, 'winner_id': p.winner_id, 'betting_id': p.betting_id} for p in betting.participants],
+            'match': {'id': match.id, 'winner_name': match.winner_name, 'winner_id': match.winner, 'loser_name': match.loser_name, 'score': match.score} if match else None,
+            # 문자열 집계는 순서를 보장하지 않으므로 이름순으로 정렬해 요청/페이지마다 같은 순서로 보냅니다.
+            'win_participants': sorted(win_names.split(_NAME_SEPARATOR)) if win_names else [],
+            'lose_participants': sorted(lose_names.split(_NAME_SEPARATOR)) if lose_names else [],
+            'win_count': win_count or 0, 'lose_count': lose_count or 0,
+        })
     return jsonify(response)
 
 
@@ -82,38 +120,15 @@ def delete_bettings():
     ids = request.json.get('ids', [])
     if not ids: return jsonify({'error': '삭제할 베팅이 선택되지 않았습니다.'}), 400
     bettings_to_delete = Betting.query.filter(Betting.id.in_(ids)).all()
-    approved_count = pending_count = 0
-    for betting in bettings_to_delete:
-        if not betting.approved:
-            pending_count += 1; continue
-        approved_count += 1
-        match = Match.query.get(betting.result)
-        if not match: continue
-        winner = Player.query.get(match.winner)
-        loser = Player.query.get(match.loser)
-        if not winner or not loser: continue
-        participants = betting.participants
-        correct_bettors = [p for p in participants if p.winner_id == winner.id]
-        total_sharers = 1 + len(correct_bettors)
-        total_pot = betting.point * (2 + len(participants))
-        share = total_pot // total_sharers
-        winner.betting_count -= share
-        add_point_log(winner.id, betting_change=-share, reason=f"베팅({betting.id}) 삭제 (상금 회수)")
-        for p in correct_bettors:
-            bp = Player.query.get(p.participant_id)
-            if bp: bp.betting_count -= share; add_point_log(bp.id, betting_change=-share, reason=f"베팅({betting.id}) 삭제 (상금 회수)")
-        winner.betting_count += betting.point
-        add_point_log(winner.id, betting_change=betting.point, reason=f"베팅({betting.id}) 삭제 (참가비 환불)")
-        loser.betting_count += betting.point
-        add_point_log(loser.id, betting_change=betting.point, reason=f"베팅({betting.id}) 삭제 (참가비 환불)")
-        for p in participants:
-            pp = Player.query.get(p.participant_id)
-            if pp: pp.betting_count += betting.point; add_point_log(pp.id, betting_change=betting.point, reason=f"베팅({betting.id}) 삭제 (참가비 환불)")
+    approved = [betting for betting in bettings_to_delete if betting.approved]
+    approved_count, pending_count = len(approved), len(bettings_to_delete) - len(approved)
+    refund_bettings(approved)
     if bettings_to_delete:
         BettingParticipant.query.filter(BettingParticipant.betting_id.in_(ids)).delete(synchronize_session=False)
         Betting.query.filter(Betting.id.in_(ids)).delete(synchronize_session=False)
+        invalidate_dashboards(bettings=True)
     db.session.commit()
-    update_player_orders_by_point()
+    mark_player_orders_dirty('point')
     return jsonify({'success': True, 'message': f'{approved_count}개의 승인된 베팅과 {pending_count}개의 미승인된 베팅이 삭제되었습니다.'})
 
 
@@ -127,8 +142,9 @@ def select_all_bettings():
 def get_players_ranks():
     data = request.get_json()
     players = data.get('players', [])
-    p1 = Player.query.filter_by(name=players[0]).first()
-    p2 = Player.query.filter_by(name=players[1]).first()
+    player_ids = resolve_player_ids(players[:2])
+    found = load_players(player_ids.values(), load_only(Player.id, Player.rank))
+    p1, p2 = found.get(player_ids.get(players[0])), found.get(player_ids.get(players[1]))
     if not p1 or not p2: return jsonify({'error': '선수를 찾을 수 없습니다.'}), 400
     rank_gap = abs(p1.rank - p2.rank) if p1.rank is not None and p2.rank is not None else None
     return jsonify({'p1_rank': p1.rank, 'p2_rank': p2.rank, 'rank_gap': rank_gap})
@@ -139,12 +155,13 @@ def get_betting_counts():
     data = request.get_json()
     players = data.get('players', [])
     participants = data.get('participants', [])
-    p1 = Player.query.filter_by(name=players[0]).first()
-    p2 = Player.query.filter_by(name=players[1]).first()
+    player_ids = resolve_player_ids(players[:2] + [pn.strip() for pn in participants])
+    found = load_players(player_ids.values(), load_only(Player.id, Player.name, Player.betting_count))
+    p1, p2 = found.get(player_ids.get(players[0])), found.get(player_ids.get(players[1]))
     if not p1 or not p2: return jsonify({'success': False, 'error': '선수를 찾을 수 없습니다.'}), 400
     participant_data = []
     for pn in participants:
-        p = Player.query.filter_by(name=pn.strip()).first()
+        p = found.get(player_ids.get(pn.strip()))
         if p:
             if p.name == p1.name or p.name == p2.name: continue
             participant_data.append({'name': p.name, 'betting_count': p.betting_count})
@@ -161,20 +178,33 @@ def create_betting():
     point = data.get('point')
     if len(players) != 2: return jsonify({'error': '정확히 2명의 선수를 입력해야 합니다.'}), 400
     if not isinstance(point, int) or point <= 0: return jsonify({'error': '유효한 점수를 입력하세요.'}), 400
-    p1 = Player.query.filter_by(name=players[0]).first()
-    p2 = Player.query.filter_by(name=players[1]).first()
-    if not p1 or not p2: return jsonify({'error': '선수를 찾을 수 없습니다.'}), 400
-    new_betting = Betting(p1_id=p1.id, p1_name=p1.name, p2_id=p2.id, p2_name=p2.name, point=point)
+    player_ids = resolve_player_ids(players + [pn.strip() for pn in participants])
+    p1_id, p2_id = player_ids.get(players[0]), player_ids.get(players[1])
+    if not p1_id or not p2_id: return jsonify({'error': '선수를 찾을 수 없습니다.'}), 400
+    new_betting = Betting(p1_id=p1_id, p1_name=players[0], p2_id=p2_id, p2_name=players[1], point=point)
     db.session.add(new_betting)
     db.session.flush()
+    added = 0
     for pn in participants:
-        p = Player.query.filter_by(name=pn.strip()).first()
-        if p and p.name != p1.name and p.name != p2.name:
-            db.session.add(BettingParticipant(betting_id=new_betting.id, participant_name=pn.strip(), participant_id=p.id))
+        participant_id = player_ids.get(pn.strip())
+        if participant_id and pn.strip() not in players:
+            db.session.add(BettingParticipant(betting_id=new_betting.id, participant_name=pn.strip(), participant_id=participant_id))
+            added += 1
+    adjust_betting_pool(new_betting, added=[None] * added)
+    invalidate_dashboards(bettings=True)
     db.session.commit()
     return jsonify({'success': True, 'message': '베팅이 생성되었습니다.', 'betting_id': new_betting.id})
 
 
+def _head_to_head_view(p1_id, p2_id):
+    """상대 전적(승수, 더 볼 경기가 있는지)과 최근 경기 첫 페이지. 나머지는 recent_matches 엔드포인트로 읽습니다."""
+    head_to_head = get_head_to_head(p1_id, p2_id)
+    recent_matches = head_to_head_matches(p1_id, p2_id, limit=HEAD_TO_HEAD_PAGE_SIZE)
+    total = head_to_head['p1_wins'] + head_to_head['p2_wins']
+    win_rate = {'p1_wins': head_to_head['p1_wins'], 'p2_wins': head_to_head['p2_wins'], 'has_more': total > len(recent_matches)}
+    return win_rate, recent_matches
+
+
 @betting_bp.route('/betting/<int:betting_id>/admin')
 @login_required
 def betting_detail(betting_id):
@@ -184,45 +214,49 @@ def betting_detail(betting_id):
     betting = Betting.query.get_or_404(betting_id)
     p1 = Player.query.get_or_404(betting.p1_id)
     p2 = Player.query.get_or_404(betting.p2_id)
-    all_matches = Match.query.filter(
-        ((Match.winner == p1.id) & (Match.loser == p2.id)) |
-        ((Match.winner == p2.id) & (Match.loser == p1.id)),
-        Match.approved == True
-    ).order_by(Match.timestamp.desc()).all()
-    p1_wins = sum(1 for m in all_matches if m.winner == p1.id)
-    p2_wins = len(all_matches) - p1_wins
+    win_rate, recent_matches = _head_to_head_view(p1.id, p2.id)
     all_players_data = [{'id': p.id, 'name': p.name} for p in Player.query.filter_by(is_valid=True).order_by(Player.name).all()]
     return render_template('betting_detail_admin.html', betting=betting, participants=betting.participants,
-                          win_rate={'p1_wins': p1_wins, 'p2_wins': p2_wins}, recent_matches=all_matches, all_players=all_players_data)
+                          win_rate=win_rate, recent_matches=recent_matches, all_players=all_players_data)
 
 
 @betting_bp.route('/betting/<int:betting_id>/view')
+@use_read_replica
 @login_required
 def betting_detail_for_user(betting_id):
     betting = Betting.query.get_or_404(betting_id)
     p1 = Player.query.get_or_404(betting.p1_id)
     p2 = Player.query.get_or_404(betting.p2_id)
-    all_matches = Match.query.filter(
-        ((Match.winner == p1.id) & (Match.loser == p2.id)) |
-        ((Match.winner == p2.id) & (Match.loser == p1.id)),
-        Match.approved == True
-    ).order_by(Match.timestamp.desc()).all()
-    p1_wins = sum(1 for m in all_matches if m.winner == p1.id)
-    p2_wins = len(all_matches) - p1_wins
-    participants = betting.participants
+    win_rate, recent_matches = _head_to_head_view(p1.id, p2.id)
     is_player = current_user.player_id in [betting.p1_id, betting.p2_id]
     my_choice = BettingParticipant.query.filter_by(betting_id=betting_id, participant_id=current_user.player_id).first()
-    p1_bettors = sum(1 for p in participants if p.winner_id == betting.p1_id)
-    p2_bettors = sum(1 for p in participants if p.winner_id == betting.p2_id)
-    total = p1_bettors + p2_bettors
-    p1_pct = (p1_bettors / total) * 100 if total > 0 else 50
-    betting_stats = {'p1_bettors': p1_bettors, 'p2_bettors': p2_bettors, 'p1_percent': p1_pct, 'p2_percent': 100 - p1_pct}
-    return render_template('betting_detail_for_user.html', betting=betting, participants=participants,
-                          win_rate={'p1_wins': p1_wins, 'p2_wins': p2_wins}, recent_matches=all_matches,
+    # 베팅 현황은 참가자 행 대신 베팅에 저장된 요약값으로 보여 줍니다.
+    betting_stats = {
+        'p1_bettors': betting.p1_bettors, 'p2_bettors': betting.p2_bettors,
+        'p1_percent': betting.p1_percent, 'p2_percent': 100 - betting.p1_percent,
+        'pot': betting.pot, 'p1_share': betting.projected_share(betting.p1_id), 'p2_share': betting.projected_share(betting.p2_id),
+    }
+    return render_template('betting_detail_for_user.html', betting=betting,
+                          win_rate=win_rate, recent_matches=recent_matches,
                           my_choice=my_choice, ranks={'p1_rank': p1.rank, 'p2_rank': p2.rank},
                           is_player=is_player, betting_stats=betting_stats)
 
 
+@betting_bp.route('/betting/<int:betting_id>/recent_matches')
+@use_read_replica
+@login_required
+def betting_recent_matches(betting_id):
+    """두 선수의 상대 전적 경기를 before_id 다음부터 한 페이지씩 반환합니다."""
+    betting = Betting.query.get_or_404(betting_id)
+    matches = head_to_head_matches(
+        betting.p1_id, betting.p2_id, limit=HEAD_TO_HEAD_PAGE_SIZE + 1, before_id=request.args.get('before_id', type=int)
+    )
+    return jsonify({
+        'matches': [{'id': m.id, 'winner_id': m.winner, 'score': m.score} for m in matches[:HEAD_TO_HEAD_PAGE_SIZE]],
+        'has_more': len(matches) > HEAD_TO_HEAD_PAGE_SIZE,
+    })
+
+
 @betting_bp.route('/bet/place', methods=['POST'])
 @login_required
 def place_bet():
@@ -240,10 +274,12 @@ def place_bet():
         return redirect(url_for('betting.betting_detail_for_user', betting_id=betting_id))
     record = BettingParticipant.query.filter_by(betting_id=betting_id, participant_id=current_user.player_id).first()
     if record:
+        adjust_betting_pool(betting, removed=[record.winner_id], added=[winner_id])
         record.winner_id = winner_id
         flash(_('베팅을 성공적으로 변경했습니다.'), 'success')
     else:
         db.session.add(BettingParticipant(betting_id=betting_id, participant_id=current_user.player_id, participant_name=current_user.player.name, winner_id=winner_id))
+        adjust_betting_pool(betting, added=[winner_id])
         flash(_('베팅에 성공적으로 참여했습니다.'), 'success')
     db.session.commit()
     return redirect(url_for('betting.betting_detail_for_user', betting_id=betting_id))
@@ -274,68 +310,38 @@ def submit_betting_result():
     if betting.submitted:
         return jsonify({"error": "이미 결과가 제출된 베팅입니다."}), 400
     loser_name = betting.p2_name if winner_name == betting.p1_name else betting.p1_name
-    winner = Player.query.filter_by(name=winner_name).first()
-    loser = Player.query.filter_by(name=loser_name).first()
-    if not winner or not loser:
+    player_ids = resolve_player_ids([winner_name, loser_name])
+    winner_id, loser_id = player_ids.get(winner_name), player_ids.get(loser_name)
+    if not winner_id or not loser_id:
         return jsonify({"error": "선수 정보를 찾을 수 없습니다."}), 400
-    new_match = Match(winner=winner.id, winner_name=winner.name, loser=loser.id, loser_name=loser.name, score=score, approved=False)
+    new_match = Match(winner=winner_id, winner_name=winner_name, loser=loser_id, loser_name=loser_name, score=score, approved=False)
     db.session.add(new_match)
     db.session.flush()
     betting.result = new_match.id
     betting.submitted = True
     betting.is_closed = True
     participants = betting.participants
-    win_names = [p.participant_name for p in participants if p.winner_id == winner.id]
-    lose_names = [p.participant_name for p in participants if p.winner_id is not None and p.winner_id != winner.id]
+    win_names = [p.participant_name for p in participants if p.winner_id == winner_id]
+    lose_names = [p.participant_name for p in participants if p.winner_id is not None and p.winner_id != winner_id]
     total_sharers = 1 + len(win_names)
     total_pot = betting.point * (2 + len(participants))
     share = total_pot // total_sharers if total_sharers > 0 else 0
+    invalidate_dashboards([winner_id, loser_id], bettings=True)
     db.session.commit()
     return jsonify({"success": True, "message": "베팅 결과가 성공적으로 처리되었습니다!",
-                   "results": {"winnerName": winner.name, "loserName": loser.name, "winParticipants": win_names, "loseParticipants": lose_names, "distributedPoints": share}}), 200
+                   "results": {"winnerName": winner_name, "loserName": loser_name, "winParticipants": win_names, "loseParticipants": lose_names, "distributedPoints": share}}), 200
 
 
 @betting_bp.route('/approve_bettings', methods=['POST'])
 def approve_bettings():
     ids = request.json.get('ids', [])
     if not ids: return jsonify({'success': False, 'message': '승인할 베팅이 선택되지 않았습니다.'}), 400
-    bettings = Betting.query.filter(Betting.id.in_(ids), Betting.approved == False).all()
-    today = datetime.now(ZoneInfo("Asia/Seoul")).date()
-    for betting in bettings:
-        match = Match.query.get(betting.result)
-        if not match: continue
-        actual_winner_id = match.winner
-        winner_player = Player.query.get(actual_winner_id)
-        loser_player = Player.query.get(match.loser)
-        if not winner_player or not loser_player: continue
-        betting_reason = f"{winner_player.name} vs {loser_player.name} 베팅"
-        winner_player.betting_count -= betting.point
-        add_point_log(winner_player.id, betting_change=-1 * betting.point, reason=f"{betting_reason} 주최")
-        loser_player.betting_count -= betting.point
-        add_point_log(loser_player.id, betting_change=-1 * betting.point, reason=f"{betting_reason} 주최")
-        participants = betting.participants
-        for p in participants:
-            pp = Player.query.get(p.participant_id)
-            if pp: pp.betting_count -= betting.point; add_point_log(pp.id, betting_change=-1 * betting.point, reason=f"{betting_reason} 참여")
-        correct_bettors = [p for p in participants if p.winner_id == actual_winner_id]
-        total_pot = betting.point * (2 + len(participants))
-        total_sharers = 1 + len(correct_bettors)
-        share = total_pot // total_sharers if total_sharers > 0 else 0
-        for p in correct_bettors:
-            bp = Player.query.get(p.participant_id)
-            if bp: bp.betting_count += share; add_point_log(bp.id, betting_change=share, reason=f"{betting_reason} 성공")
-        winner_player.betting_count += share
-        add_point_log(winner_player.id, betting_change=share, reason=f"{betting_reason} 경기 승리")
-        betting.approved = True
-        if today.weekday() == 4:
-            all_involved = [winner_player, loser_player] + [Player.query.get(p.participant_id) for p in participants]
-            for player in all_involved:
-                if not player: continue
-                bonus = PlayerPointLog.query.filter(PlayerPointLog.player_id == player.id, PlayerPointLog.reason == "베팅 데이", func.date(PlayerPointLog.timestamp) == today).first()
-                if not bonus: player.betting_count += 10; add_point_log(player.id, betting_change=10, reason="베팅 데이")
+    # 다른 승인 요청이 처리 중인 베팅은 건너뜁니다.
+    bettings = claim_pending_rows(Betting, ids, Betting.approved)
+    settle_bettings(bettings)
     db.session.commit()
-    update_player_orders_by_point()
-    return jsonify({"success": True, "message": "선택한 베팅이 승인되었습니다."})
+    mark_player_orders_dirty('point')
+    return jsonify({"success": True, "message": "선택한 베팅이 승인되었습니다.", "claimed": len(bettings)})
 
 
 @betting_bp.route('/add_participants', methods=['POST'])
@@ -356,6 +362,7 @@ def add_participants():
         if not existing and pi:
             db.session.add(BettingParticipant(betting_id=betting_id, participant_name=pi.name, participant_id=pid))
             added += 1
+    adjust_betting_pool(betting, added=[None] * added)
     db.session.commit()
     return jsonify({'success': True, 'message': f'{added}명의 참가자가 추가되었습니다.'})
 
@@ -371,7 +378,9 @@ def remove_participants():
     betting = Betting.query.get(betting_id)
     if not betting: return jsonify({'success': False, 'error': '해당 베팅을 찾을 수 없습니다.'}), 404
     if betting.submitted: return jsonify({'success': False, 'error': '이미 결과가 제출된 베팅입니다.'}), 400
-    n = BettingParticipant.query.filter(BettingParticipant.betting_id == betting_id, BettingParticipant.participant_id.in_(player_ids)).delete(synchronize_session=False)
+    removed = BettingParticipant.query.filter(BettingParticipant.betting_id == betting_id, BettingParticipant.participant_id.in_(player_ids))
+    adjust_betting_pool(betting, removed=[winner_id for winner_id, in removed.with_entities(BettingParticipant.winner_id)])
+    n = removed.delete(synchronize_session=False)
     db.session.commit()
     return jsonify({'success': True, 'message': f'{n}명의 참가자가 삭제되었습니다.'}) if n > 0 else jsonify({'success': False, 'error': '삭제할 참가자를 찾지 못했습니다.'})
 
@@ -385,6 +394,7 @@ def delete_betting(betting_id):
     betting = Betting.query.get_or_404(betting_id)
     try:
         db.session.delete(betting)
+        invalidate_dashboards(bettings=True)
         db.session.commit()
         return jsonify({'success': True, 'message': '베팅이 성공적으로 삭제되었습니다.'})
     except Exception as e:
@@ -403,7 +413,9 @@ def update_betting(betting_id):
         existing_ids = {p.participant_id for p in betting.participants}
         new_ids = {pd.get('id') for pd in new_participants_data}
         to_delete = existing_ids - new_ids
+        removed, added = [], []
         if to_delete:
+            removed += [p.winner_id for p in betting.participants if p.participant_id in to_delete]
             BettingParticipant.query.filter(BettingParticipant.betting_id == betting_id, BettingParticipant.participant_id.in_(to_delete)).delete(synchronize_session=False)
         existing_map = {p.participant_id: p.winner_id for p in betting.participants}
         for pd in new_participants_data:
@@ -415,10 +427,16 @@ def update_betting(betting_id):
                     return jsonify({'error': f'이미 저장된 베팅은 수정할 수 없습니다. ({Player.query.get(pid).name}님의 예측)'}), 400
                 else:
                     rec = BettingParticipant.query.filter_by(betting_id=betting.id, participant_id=pid).first()
-                    if rec and rec.winner_id is None: rec.winner_id = new_winner
+                    if rec and rec.winner_id is None:
+                        removed.append(None)
+                        added.append(new_winner)
+                        rec.winner_id = new_winner
             else:
                 player = Player.query.get(pid)
-                if player: db.session.add(BettingParticipant(betting_id=betting.id, participant_name=player.name, participant_id=player.id, winner_id=new_winner))
+                if player:
+                    db.session.add(BettingParticipant(betting_id=betting.id, participant_name=player.name, participant_id=player.id, winner_id=new_winner))
+                    added.append(new_winner)
+        adjust_betting_pool(betting, removed=removed, added=added)
         db.session.commit()
         return jsonify({'success': True, 'message': '베팅 참가자가 업데이트되었습니다!'})
     except Exception as e:
@@ -1,15 +1,25 @@
 from flask import Blueprint, render_template, jsonify, request, flash, redirect, url_for, current_app
 from flask_login import current_user, login_required
 from flask_babel import _
-from sqlalchemy.orm.attributes import flag_modified
 from ..extensions import db
-from ..models import Match, Player, User, League, Tournament
+from .. import bracket as bracket_engine
+from ..models import Match, Player, User, League, LeagueMember, LeagueResult, Tournament
+from ..utils import (
+    apply_league_result, get_league_standings, invalidate_dashboards, load_players, load_tournament_bracket, rerank_league,
+    resolve_player_ids, save_tournament_bracket, use_read_replica
+)
 from datetime import datetime
 from zoneinfo import ZoneInfo
 import random
+import re
 
 league_bp = Blueprint('league', __name__)
 
+LEAGUE_MIN_PLAYERS = 2
+# save_league 점수표 키 (p<자리>p<자리>)와 경기 제출 스코어 형식
+_SCORE_KEY = re.compile(r'^p(\d+)p(\d+)$')
+_SET_SCORE = re.compile(r'^\d+:\d+$')
+
 
 @league_bp.route('/league_or_tournament')
 @login_required
@@ -18,105 +28,70 @@ def league_or_tournament():
 
 
 @league_bp.route('/league')
+@use_read_replica
 @login_required
 def league():
-    leagues = League.query.order_by(League.id.desc()).all()
-
-    league_data = []
-    for l in leagues:
-        player_names = [l.p1, l.p2, l.p3, l.p4, l.p5]
-        is_participant = current_user.player.name in player_names
-        league_data.append({
-            'league': l,
-            'is_participant': is_participant
-        })
-
-    return render_template('league.html', league_data=league_data)
+    pagination = db.paginate(
+        League.query.order_by(League.id.desc()),
+        page=request.args.get('page', 1, type=int), per_page=current_app.config.get('LEAGUE_PAGE_SIZE', 12), error_out=False
+    )
+    # 페이지에 보이는 리그들의 1위와 내 순위를 저장된 순위표에서 한 번에 읽습니다.
+    league_ids = [l.id for l in pagination.items]
+    leaders, my_ranks = {}, {}
+    if league_ids:
+        for league_id, player_id, name, rank in db.session.query(
+            LeagueMember.league_id, LeagueMember.player_id, Player.name, LeagueMember.rank
+        ).join(Player, Player.id == LeagueMember.player_id).filter(
+            LeagueMember.league_id.in_(league_ids),
+            (LeagueMember.rank == 1) | (LeagueMember.player_id == current_user.player_id)
+        ).order_by(LeagueMember.position).all():
+            if rank == 1:
+                leaders.setdefault(league_id, []).append(name)
+            if player_id == current_user.player_id:
+                my_ranks[league_id] = rank
+
+    return render_template('league.html', leagues=pagination.items, pagination=pagination, leaders=leaders, my_ranks=my_ranks)
+
+
+def _league_schedule(league_id, standings):
+    """참가자 자리 순서대로 모든 쌍의 경기 일정과 결과를 만듭니다."""
+    members = sorted(standings, key=lambda row: row['position'])
+    results = {
+        frozenset((r.winner_id, r.loser_id)): r
+        for r in LeagueResult.query.filter_by(league_id=league_id).all()
+    }
+
+    matches = []
+    for i, p1 in enumerate(members):
+        for p2 in members[i + 1:]:
+            result = results.get(frozenset((p1['player_id'], p2['player_id'])))
+            match = {
+                'id': None, 'status': 'scheduled', 'winner_id': None, 'score_p1': '-', 'score_p2': '-',
+                'p1_id': p1['player_id'], 'p1_name': p1['name'], 'p2_id': p2['player_id'], 'p2_name': p2['name']
+            }
+            if result:
+                p1_won = result.winner_id == p1['player_id']
+                score_p1 = result.winner_score if p1_won else result.loser_score
+                score_p2 = result.loser_score if p1_won else result.winner_score
+                match.update({
+                    'id': result.id, 'status': 'completed', 'winner_id': result.winner_id,
+                    'score_p1': '-' if score_p1 is None else score_p1, 'score_p2': '-' if score_p2 is None else score_p2
+                })
+            matches.append(match)
+    return matches
 
 
 @league_bp.route('/league/<int:league_id>', methods=['GET'])
+@use_read_replica
 @login_required
 def league_detail(league_id):
     league = League.query.get_or_404(league_id)
-    player_names = [league.p1, league.p2, league.p3, league.p4, league.p5]
-
-    players_info = []
-    player_objects = Player.query.filter(Player.name.in_(player_names)).all()
-    player_map = {p.name: p for p in player_objects}
-    for name in player_names:
-        p = player_map.get(name)
-        if p:
-            players_info.append({
-                'name': p.name, 'rank': p.rank,
-                'win_count': p.win_count, 'rate_count': p.rate_count
-            })
-
-    standings_data = []
-    for i, name in enumerate(player_names):
-        wins, losses = 0, 0
-        for j in range(5):
-            if i == j: continue
-            if getattr(league, f'p{i+1}p{j+1}') is not None: wins += 1
-            if getattr(league, f'p{j+1}p{i+1}') is not None: losses += 1
-
-        total_games = wins + losses
-        win_rate = (wins / total_games) * 100 if total_games > 0 else 0.0
-
-        standings_data.append({'name': name, 'wins': wins, 'losses': losses, 'win_rate': win_rate})
-
-    sorted_standings = sorted(standings_data, key=lambda x: (x['wins'], x['win_rate'], -x['losses']), reverse=True)
-
-    ranked_standings = []
-    current_rank = 0
-    last_criteria = (-1, -1, -1)
-
-    for i, player_stats in enumerate(sorted_standings):
-        current_criteria = (player_stats['wins'], player_stats['win_rate'], player_stats['losses'])
-        if current_criteria != last_criteria:
-            current_rank = i + 1
-
-        player_stats['rank'] = current_rank
-        ranked_standings.append(player_stats)
-
-        last_criteria = current_criteria
-
-    is_participant = current_user.player.name in player_names
-
-    my_matches = []
-    if is_participant:
-        my_name = current_user.player.name
-        my_idx = player_names.index(my_name)
-        for opponent_idx, opponent_name in enumerate(player_names):
-            if my_idx == opponent_idx: continue
-
-            my_score = getattr(league, f'p{my_idx+1}p{opponent_idx+1}')
-            opponent_score = getattr(league, f'p{opponent_idx+1}p{my_idx+1}')
-
-            status = 'Submitted' if my_score is not None or opponent_score is not None else 'Not Submitted'
-            opponent_player = player_map.get(opponent_name)
-            if opponent_player:
-                my_matches.append({
-                    'opponent_name': opponent_name,
-                    'status': status,
-                    'opponent_id': opponent_player.id
-                })
-    match_history = []
-    if current_user.is_admin:
-        for i in range(5):
-            for j in range(5):
-                if i == j: continue
-                if getattr(league, f'p{i+1}p{j+1}') is not None:
-                    winner_name = player_names[i]
-                    loser_name = player_names[j]
-                    match_history.append({'winner': winner_name, 'loser': loser_name})
+    standings = get_league_standings(league.id)
 
     return render_template('league_detail.html',
                         league=league,
-                        players_info=players_info,
-                        standings=ranked_standings,
-                        is_participant=is_participant,
-                        my_matches=my_matches,
-                        match_history=match_history)
+                        participants=standings,
+                        matches=_league_schedule(league.id, standings))
 
 
 @league_bp.route('/league/<int:league_id>/revert', methods=['POST'])
@@ -126,21 +101,17 @@ def revert_league_match(league_id):
         flash(_('권한이 없습니다.'), 'error')
         return redirect(url_for('league.league_detail', league_id=league_id))
 
-    league = League.query.get_or_404(league_id)
-    winner_name = request.form.get('winner')
-    loser_name = request.form.get('loser')
-
-    player_names = [league.p1, league.p2, league.p3, league.p4, league.p5]
+    result = LeagueResult.query.filter_by(id=request.form.get('match_id', type=int), league_id=league_id).first()
+    if not result:
+        flash('경기 결과를 찾을 수 없습니다.', 'error')
+        return redirect(url_for('league.league_detail', league_id=league_id))
 
     try:
-        winner_idx = player_names.index(winner_name) + 1
-        loser_idx = player_names.index(loser_name) + 1
-
-        setattr(league, f'p{winner_idx}p{loser_idx}', None)
+        _remove_league_result(result)
+        rerank_league(league_id)
+        invalidate_dashboards(_league_member_ids(league_id))
         db.session.commit()
-        flash(f"'{winner_name} vs {loser_name}' 경기가 제출 이전 상태로 되돌아갔습니다.", 'success')
-    except ValueError:
-        flash('선수 이름을 찾을 수 없습니다.', 'error')
+        flash('경기가 제출 이전 상태로 되돌아갔습니다.', 'success')
     except Exception as e:
         db.session.rollback()
         flash(f'오류 발생: {str(e)}', 'error')
@@ -149,6 +120,7 @@ def revert_league_match(league_id):
 
 
 @league_bp.route('/tournament')
+@use_read_replica
 @login_required
 def tournament():
     tournaments = Tournament.query.order_by(Tournament.created_at.desc()).all()
@@ -170,63 +142,61 @@ def generate_tournament():
     if not current_user.is_admin:
         return redirect(url_for('league.tournament'))
 
-    title = request.form.get('title')
-    player_names_str = request.form.get('players')
-    player_names = [name.strip() for name in player_names_str.splitlines() if name.strip()]
+    title = request.form.get('name') or request.form.get('title')
+    player_names_str = request.form.get('participants') or request.form.get('players') or ''
+    player_names = list(dict.fromkeys(name.strip() for name in player_names_str.splitlines() if name.strip()))
+    bracket_format = request.form.get('format', bracket_engine.SINGLE)
+
+    # 등록되지 않은 이름은 이름 그대로 대진에만 올라갑니다.
+    player_ids = resolve_player_ids(player_names)
 
     random.shuffle(player_names)
-    num_players = len(player_names)
-
-    # 1라운드 생성
-    next_power_of_2 = 1
-    while next_power_of_2 < num_players: next_power_of_2 *= 2
-    num_byes = next_power_of_2 - num_players
-
-    round1_matches = []
-    bye_players = player_names[:num_byes]
-    match_players = player_names[num_byes:]
-
-    match_counter = 1
-    for player in bye_players:
-        round1_matches.append({'id': f'R1M{match_counter}', 'p1': player, 'p2': '부전승', 'winner': player})
-        match_counter += 1
-
-    for i in range(0, len(match_players), 2):
-        round1_matches.append({'id': f'R1M{match_counter}', 'p1': match_players[i], 'p2': match_players[i+1], 'winner': None})
-        match_counter += 1
-
-    # 이후 라운드 자동 생성
-    rounds = [round1_matches]
-    num_round = 2
-    last_round_matches = round1_matches
-
-    while len(last_round_matches) > 1:
-        next_round_matches = []
-        match_counter = 1
-        for i in range(0, len(last_round_matches), 2):
-            p1_placeholder = f"{last_round_matches[i]['id']} 승자"
-            p2_placeholder = f"{last_round_matches[i+1]['id']} 승자"
-            next_round_matches.append({'id': f'R{num_round}M{match_counter}', 'p1': p1_placeholder, 'p2': p2_placeholder, 'winner': None})
-            match_counter += 1
-        rounds.append(next_round_matches)
-        last_round_matches = next_round_matches
-        num_round += 1
-
-    bracket_data = {'rounds': rounds}
-
-    new_tournament = Tournament(title=title, bracket_data=bracket_data, status='진행중')
+    try:
+        bracket_data = bracket_engine.build_bracket([(player_ids.get(name, name), name) for name in player_names], bracket_format)
+    except ValueError as e:
+        flash(str(e), 'error')
+        return redirect(url_for('league.create_tournament_page'))
+
+    new_tournament = Tournament(title=title, status='진행중')
     db.session.add(new_tournament)
+    db.session.flush()
+    save_tournament_bracket(new_tournament, bracket_data)
     db.session.commit()
 
     flash(f"'{title}' 토너먼트가 생성되었습니다!", 'success')
     return redirect(url_for('league.tournament_detail', tournament_id=new_tournament.id))
 
 
+def _bracket_sections(bracket):
+    """화면용 구역(승자조/패자조) -> 라운드 -> 경기 목록을 만듭니다."""
+    rounds = {}
+    for node in bracket_engine.ordered_nodes(bracket):
+        rounds.setdefault((node['section'], node['round']), []).append(bracket_engine.match_view(bracket, node))
+
+    last_round = bracket['rounds']
+    if bracket['format'] == bracket_engine.SINGLE:
+        def title(round_num):
+            if round_num == last_round: return _('결승')
+            if round_num == last_round - 1: return _('4강')
+            return f"{_('Round')} {round_num}"
+        return [{'title': None, 'rounds': [
+            {'title': title(r), 'matches': rounds[('W', r)]} for r in range(1, last_round + 1)
+        ]}]
+
+    winners = [{'title': _('승자조 결승') if r == last_round else f"{_('Round')} {r}", 'matches': rounds[('W', r)]}
+               for r in range(1, last_round + 1)]
+    winners.append({'title': _('결승'), 'matches': rounds[('F', last_round + 1)]})
+    losers = [{'title': f"{_('Round')} {r}", 'matches': matches}
+              for (section, r), matches in sorted(rounds.items()) if section == 'L']
+    return [{'title': _('승자조'), 'rounds': winners}, {'title': _('패자조'), 'rounds': losers}]
+
+
 @league_bp.route('/tournament/<int:tournament_id>')
+@use_read_replica
 @login_required
 def tournament_detail(tournament_id):
     tournament = Tournament.query.get_or_404(tournament_id)
-    return render_template('tournament_detail.html', tournament=tournament)
+    return render_template('tournament_detail.html', tournament=tournament, sections=_bracket_sections(load_tournament_bracket(tournament)))
 
 
 @league_bp.route('/tournament/<int:tournament_id>/submit_results')
@@ -237,7 +207,9 @@ def submit_tournament_results_page(tournament_id):
         return redirect(url_for('league.tournament_detail', tournament_id=tournament_id))
 
     tournament = Tournament.query.get_or_404(tournament_id)
-    return render_template('submit_tournament_results.html', tournament=tournament)
+    bracket = load_tournament_bracket(tournament)
+    matches = [bracket_engine.match_view(bracket, node) for node in bracket_engine.ready_matches(bracket)]
+    return render_template('submit_tournament_results.html', tournament=tournament, matches=matches)
 
 
 @league_bp.route('/tournament/<int:tournament_id>/submit_results', methods=['POST'])
@@ -247,57 +219,43 @@ def submit_tournament_results(tournament_id):
         return redirect(url_for('main.index'))
 
     tournament = Tournament.query.get_or_404(tournament_id)
-    bracket = tournament.bracket_data
-
+    bracket = load_tournament_bracket(tournament)
+
+    recorded, changed = [], set()
+    for node_id in request.form.getlist('match_ids[]'):
+        node = bracket['nodes'].get(node_id)
+        winner_value = request.form.get(f'winner_{node_id}')
+        if node is None or not winner_value or not bracket_engine.is_ready(node):
+            continue
+        winner_id = next((p for p in node['players'] if str(p) == winner_value), None)
+        if winner_id is None:
+            continue
+        scores = [request.form.get(f'score_p1_{node_id}', type=int), request.form.get(f'score_p2_{node_id}', type=int)]
+        changed |= bracket_engine.record_result(bracket, node_id, winner_id, *scores)
+
+        winner_slot = node['players'].index(winner_id)
+        recorded.append((winner_id, node['players'][1 - winner_slot], scores[winner_slot], scores[1 - winner_slot]))
+
+    # 경기 기록에 필요한 선수는 한 번에 조회합니다. (옛 대진표의 미등록 이름은 경기 기록 없이 진행만 합니다)
+    players = load_players([player_id for result in recorded for player_id in result[:2] if isinstance(player_id, int)])
     submitted_matches = 0
-    for key, winner_name in request.form.items():
-        if '_winner' in key and winner_name:
-            match_id = key.replace('_winner', '')
-            score = request.form.get(f"{match_id}_score", "2:0")
-
-            for round_matches in bracket['rounds']:
-                for match in round_matches:
-                    if match.get('id') == match_id and not match.get('winner'):
-                        p1 = match.get('p1')
-                        p2 = match.get('p2')
-                        loser_name = p2 if winner_name == p1 else p1
-
-                        winner_player = Player.query.filter_by(name=winner_name).first()
-                        loser_player = Player.query.filter_by(name=loser_name).first()
-
-                        if winner_player and loser_player:
-                            new_match = Match(
-                                winner=winner_player.id, winner_name=winner_name,
-                                loser=loser_player.id, loser_name=loser_name,
-                                score=score, approved=False
-                            )
-                            db.session.add(new_match)
-                            submitted_matches += 1
-
-                        match['winner'] = winner_name
-
-    # 다음 라운드의 플레이스홀더를 실제 승자 이름으로 교체
-    for i in range(len(bracket['rounds']) - 1):
-        current_round = bracket['rounds'][i]
-        next_round = bracket['rounds'][i+1]
-        for next_match in next_round:
-            if '승자' in next_match['p1']:
-                p1_match_id = next_match['p1'].replace(' 승자', '')
-                p1_source_match = next((m for m in current_round if m.get('id') == p1_match_id), None)
-                if p1_source_match and p1_source_match.get('winner'):
-                    next_match['p1'] = p1_source_match['winner']
-
-            if '승자' in next_match['p2']:
-                p2_match_id = next_match['p2'].replace(' 승자', '')
-                p2_source_match = next((m for m in current_round if m.get('id') == p2_match_id), None)
-                if p2_source_match and p2_source_match.get('winner'):
-                    next_match['p2'] = p2_source_match['winner']
-
-    final_round = bracket['rounds'][-1]
-    if len(final_round) == 1 and final_round[0].get('winner'):
+    for winner_id, loser_id, winner_score, loser_score in recorded:
+        winner_player, loser_player = players.get(winner_id), players.get(loser_id)
+        if winner_player and loser_player:
+            score = f"{winner_score}:{loser_score}" if winner_score is not None and loser_score is not None and winner_score > loser_score else "2:0"
+            db.session.add(Match(
+                winner=winner_player.id, winner_name=winner_player.name,
+                loser=loser_player.id, loser_name=loser_player.name,
+                score=score, approved=False
+            ))
+            invalidate_dashboards([winner_player.id, loser_player.id])
+            submitted_matches += 1
+
+    if bracket['champion'] is not None:
         tournament.status = '완료'
 
-    flag_modified(tournament, "bracket_data")
+    # 결과가 들어간 경기와 승자/패자가 올라간 경기 행만 갱신합니다.
+    save_tournament_bracket(tournament, bracket, changed)
 
     db.session.commit()
 
@@ -325,6 +283,33 @@ def delete_tournament(tournament_id):
     return jsonify({'success': True, 'message': '토너먼트가 삭제되었습니다.'})
 
 
+def _league_member_ids(league_id):
+    return [player_id for (player_id,) in db.session.query(LeagueMember.player_id).filter_by(league_id=league_id).all()]
+
+
+def _set_league_result(league_id, winner_id, loser_id, winner_score=None, loser_score=None):
+    """두 선수의 리그 결과를 새 결과로 바꾸고 순위표에 반영합니다. (쌍마다 한 행, 순위는 rerank_league 로 맞춥니다)"""
+    _clear_league_result(league_id, winner_id, loser_id)
+    db.session.add(LeagueResult(league_id=league_id, winner_id=winner_id, loser_id=loser_id,
+                                winner_score=winner_score, loser_score=loser_score))
+    apply_league_result(league_id, winner_id, loser_id, winner_score, loser_score)
+
+
+def _clear_league_result(league_id, p1_id, p2_id):
+    results = LeagueResult.query.filter(
+        LeagueResult.league_id == league_id,
+        ((LeagueResult.winner_id == p1_id) & (LeagueResult.loser_id == p2_id)) |
+        ((LeagueResult.winner_id == p2_id) & (LeagueResult.loser_id == p1_id))
+    ).all()
+    for result in results:
+        _remove_league_result(result)
+
+
+def _remove_league_result(result):
+    apply_league_result(result.league_id, result.winner_id, result.loser_id, result.winner_score, result.loser_score, sign=-1)
+    db.session.delete(result)
+
+
 # league.js API
 
 @league_bp.route('/create_league', methods=['POST'])
@@ -334,23 +319,25 @@ def create_league():
         return jsonify({'success': False, 'error': '관리자만 리그를 생성할 수 있습니다.'}), 403
 
     data = request.get_json()
-    players = data.get('players', [])
-    if len(players) != 5:
-        return jsonify({'error': '정확히 5명의 선수를 입력해야 합니다.'}), 400
+    players = [name.strip() for name in data.get('players', []) if name and name.strip()]
+    if len(players) < LEAGUE_MIN_PLAYERS:
+        return jsonify({'error': f'리그에는 최소 {LEAGUE_MIN_PLAYERS}명의 선수가 필요합니다.'}), 400
+    if len(set(players)) != len(players):
+        return jsonify({'error': '같은 선수를 두 번 입력할 수 없습니다.'}), 400
 
+    found = resolve_player_ids(players, valid_only=True)
     for name in players:
-        player = Player.query.filter_by(name=name, is_valid=True).first()
-        if not player:
+        if name not in found:
             return jsonify({'success': False, 'error': f'선수 "{name}"를 찾을 수 없습니다.'}), 400
 
     league_count = League.query.count()
     new_league_name = f"League {chr(ord('A') + league_count)}"
 
-    new_league = League(
-        name=new_league_name,
-        p1=players[0], p2=players[1], p3=players[2], p4=players[3], p5=players[4]
-    )
+    new_league = League(name=new_league_name, member_count=len(players), result_count=0, members=[
+        LeagueMember(player_id=found[name], position=position) for position, name in enumerate(players, start=1)
+    ])
     db.session.add(new_league)
+    invalidate_dashboards(found.values())
     db.session.commit()
 
     return jsonify({'success': True, 'message': f'{new_league_name}가 생성되었습니다.', 'league_id': new_league.id})
@@ -360,14 +347,30 @@ def create_league():
 
 @league_bp.route('/save_league/<int:league_id>', methods=['POST'])
 def save_league(league_id):
+    """{'pNpM': 세트 수} 형식(N, M 은 자리 순서)의 점수표를 결과 행으로 저장합니다."""
     data = request.get_json()
     league = League.query.get_or_404(league_id)
-
-    scores = data.get('scores', {})
-    for key, value in scores.items():
-        if hasattr(league, key):
-            setattr(league, key, value)
-
+    seats = {member.position: member.player_id for member in league.members}
+
+    scores = {}
+    for key, value in data.get('scores', {}).items():
+        match = _SCORE_KEY.match(key)
+        if match and int(match.group(1)) in seats and int(match.group(2)) in seats:
+            scores[(int(match.group(1)), int(match.group(2)))] = value
+
+    for i, j in {tuple(sorted(pair)) for pair in scores if pair[0] != pair[1]}:
+        score_ij, score_ji = scores.get((i, j)), scores.get((j, i))
+        if score_ij is None and score_ji is None:
+            _clear_league_result(league_id, seats[i], seats[j])
+        elif score_ij is None or score_ji is None:
+            winner, loser = (i, j) if score_ij is not None else (j, i)
+            _set_league_result(league_id, seats[winner], seats[loser])
+        elif score_ij != score_ji:
+            winner, loser = (i, j) if score_ij > score_ji else (j, i)
+            _set_league_result(league_id, seats[winner], seats[loser], scores[(winner, loser)], scores[(loser, winner)])
+
+    rerank_league(league_id)
+    invalidate_dashboards(list(seats.values()))
     db.session.commit()
     return jsonify({'success': True, 'message': '리그전이 저장되었습니다.'})
 
@@ -380,6 +383,7 @@ def delete_league(league_id):
         return jsonify({'success': False, 'error': '리그를 찾을 수 없습니다.'}), 404
 
     try:
+        invalidate_dashboards(_league_member_ids(league_id))
         db.session.delete(league)
         db.session.commit()
         return jsonify({'success': True, 'message': '리그가 성공적으로 삭제되었습니다.'})
@@ -388,18 +392,25 @@ def delete_league(league_id):
         return jsonify({'success': False, 'error': f'리그 삭제 중 오류 발생: {str(e)}'})
 
 
+def _are_league_members(league_id, *player_ids):
+    if len(set(player_ids)) != len(player_ids):
+        return False
+    return LeagueMember.query.filter(
+        LeagueMember.league_id == league_id, LeagueMember.player_id.in_(player_ids)
+    ).count() == len(player_ids)
+
+
 @league_bp.route('/league/<int:league_id>/submit/<int:opponent_id>')
 @login_required
 def league_submit_match_page(league_id, opponent_id):
     league = League.query.get_or_404(league_id)
     opponent = Player.query.get_or_404(opponent_id)
 
-    player_names = [league.p1, league.p2, league.p3, league.p4, league.p5]
-    if current_user.player.name not in player_names or opponent.name not in player_names:
+    if not _are_league_members(league_id, current_user.player_id, opponent.id):
         flash(_('잘못된 접근입니다.'), 'error')
         return redirect(url_for('league.league_detail', league_id=league_id))
 
-    return render_template('league_submit_match.html', league=league, opponent=opponent)
+    return render_template('league_submit_match.html', league=league, me=current_user.player, opponent=opponent)
 
 
 @league_bp.route('/league/<int:league_id>/submit', methods=['POST'])
@@ -414,6 +425,10 @@ def submit_league_match(league_id):
     me = current_user.player
     opponent = Player.query.get_or_404(opponent_id)
 
+    if not _are_league_members(league.id, me.id, opponent.id):
+        flash(_('잘못된 접근입니다.'), 'error')
+        return redirect(url_for('league.league_detail', league_id=league_id))
+
     winner = me if winner_id == me.id else opponent
     loser = opponent if winner_id == me.id else me
 
@@ -424,11 +439,10 @@ def submit_league_match(league_id):
     )
     db.session.add(new_match)
 
-    player_names = [league.p1, league.p2, league.p3, league.p4, league.p5]
-    winner_idx = player_names.index(winner.name) + 1
-    loser_idx = player_names.index(loser.name) + 1
-
-    setattr(league, f'p{winner_idx}p{loser_idx}', 1)
+    set_scores = sorted((int(s) for s in score.split(':')), reverse=True) if _SET_SCORE.match(score or '') else (None, None)
+    _set_league_result(league.id, winner.id, loser.id, *set_scores)
+    rerank_league(league.id)
+    invalidate_dashboards(_league_member_ids(league.id))
 
     db.session.commit()
 
@@ -1,110 +1,126 @@
 from flask import Blueprint, render_template, redirect, url_for, session, current_app
 from flask_login import current_user, login_required
 from flask_babel import _
+from sqlalchemy.orm import load_only
 from ..extensions import db
-from ..models import Match, Player, User, TodayPartner, Betting, League, PlayerPointLog
-from ..utils import _get_summary_rankings_data
+from ..models import Match, Player, User, TodayPartner, Betting, League, LeagueMember, PlayerPointLog
+from ..utils import (
+    LEADERBOARD_OVERALL, _get_summary_rankings_data, get_dashboard_snapshot, get_head_to_head, get_leaderboard, load_players,
+    use_read_replica
+)
 from datetime import datetime
 from zoneinfo import ZoneInfo
 
 main_bp = Blueprint('main', __name__)
 
 
-@main_bp.route('/')
-@login_required
-def index():
-    # --- 1. 기본 정보 조회 (랭킹, 최근 경기, 오늘의 상대) ---
-    categories = [
-        ('승리', 'win_order', 'win_count'), ('승률', 'rate_order', 'rate_count'),
-        ('경기', 'match_order', 'match_count'), ('베팅', 'betting_order', 'betting_count'),
+# 홈 화면 내 순위 카드: (제목, 리더보드 카테고리, 순위 컬럼, 기준 컬럼)
+_INDEX_RANKING_CATEGORIES = [
+    ('승리', 'win', 'win_order', 'win_count'), ('승률', 'rate', 'rate_order', 'rate_count'),
+    ('경기', 'match', 'match_order', 'match_count'), ('베팅', 'betting', 'betting_order', 'betting_count'),
+]
+
+
+def _build_dashboard_snapshot(player_id):
+    """홈 화면에서 선수별로 달라지는 데이터를 모읍니다. 결과는 get_dashboard_snapshot 이 버전 키와 함께 캐시합니다."""
+    player = Player.query.get(player_id)
+
+    my_ranks = {
+        title: {'rank': getattr(player, order_field), 'value': getattr(player, value_field)}
+        for title, _category, order_field, value_field in _INDEX_RANKING_CATEGORIES
+    }
+
+    my_recent_matches = [
+        {'id': m.id, 'timestamp': m.timestamp, 'winner_name': m.winner_name, 'loser_name': m.loser_name,
+         'score': m.score, 'approved': m.approved}
+        for m in Match.query.filter((Match.winner == player_id) | (Match.loser == player_id)).order_by(Match.timestamp.desc()).limit(5).all()
     ]
-    rankings_data = {}
-    for title, order_field, value_field in categories:
-        top_players = Player.query.join(Player.user).filter(Player.is_valid == True, User.is_admin == False).order_by(getattr(Player, order_field).asc(), Player.name.asc()).limit(3).all()
-        top_ranks = sorted(list(set(getattr(p, order_field) for p in top_players if getattr(p, order_field) is not None)))
-        current_player = current_user.player
-        my_rank_info = {'rank': getattr(current_player, order_field), 'value': getattr(current_player, value_field)}
-        rankings_data[title] = {
-            'players': [{'name': p.name, 'rank': p.rank, 'value': getattr(p, value_field), 'actual_rank': getattr(p, order_field)} for p in top_players],
-            'my_rank': my_rank_info,
-            'top_ranks': top_ranks
-        }
-    my_recent_matches = Match.query.filter((Match.winner == current_user.player_id) | (Match.loser == current_user.player_id)).order_by(Match.timestamp.desc()).limit(5).all()
-    today_partner_info = None
-    today_match = TodayPartner.query.filter((TodayPartner.p1_id == current_user.player_id) | (TodayPartner.p2_id == current_user.player_id)).order_by(TodayPartner.id.desc()).first()
+
+    today_partner = None
+    today_match = TodayPartner.query.filter((TodayPartner.p1_id == player_id) | (TodayPartner.p2_id == player_id)).order_by(TodayPartner.id.desc()).first()
     if today_match:
-        opponent_id = today_match.p2_id if today_match.p1_id == current_user.player_id else today_match.p1_id
-        opponent_name = today_match.p2_name if today_match.p1_id == current_user.player_id else today_match.p1_name
-        approval_status = None
+        opponent_id = today_match.p2_id if today_match.p1_id == player_id else today_match.p1_id
+        opponent_name = today_match.p2_name if today_match.p1_id == player_id else today_match.p1_name
+        recent_match = None
         if today_match.submitted:
-            most_recent_match = Match.query.filter(((Match.winner == current_user.player_id) & (Match.loser == opponent_id)) | ((Match.winner == opponent_id) & (Match.loser == current_user.player_id))).order_by(Match.timestamp.desc()).first()
+            # 가장 최근 승인 경기는 상대 전적 행에서 바로 읽고, 그보다 늦게 제출된 미승인 경기가 있는지만 확인합니다.
+            last_approved_at = get_head_to_head(player_id, opponent_id)['last_match_at']
+            pending = Match.query.with_entities(Match.timestamp).filter(
+                ((Match.winner == player_id) & (Match.loser == opponent_id)) | ((Match.winner == opponent_id) & (Match.loser == player_id)),
+                Match.approved == False
+            )
+            if last_approved_at is not None:
+                pending = pending.filter(Match.timestamp >= last_approved_at)
+            pending_at = pending.order_by(Match.timestamp.desc()).limit(1).scalar()
+            most_recent = (pending_at, False) if pending_at is not None else (last_approved_at, True)
             seoul_tz = ZoneInfo("Asia/Seoul")
             today = datetime.now(seoul_tz).date()
-            if most_recent_match and most_recent_match.timestamp.astimezone(seoul_tz).date() == today:
-                approval_status = 'approved' if most_recent_match.approved else 'pending'
-            else:
-                today_match.submitted = False
-                db.session.commit()
-        today_partner_info = {'date': datetime.now(ZoneInfo("Asia/Seoul")).strftime('%m.%d'), 'opponent_name': opponent_name, 'submitted': today_match.submitted, 'approval_status': approval_status}
-
-    # --- 2. 베팅 정보 조회 ---
-    ongoing_bettings = Betting.query.filter_by(is_closed=False).order_by(Betting.id.desc()).all()
-    betting_data = []
-    for bet in ongoing_bettings:
-        if current_user.player_id not in [bet.p1_id, bet.p2_id]:
-            betting_data.append(bet)
-
-    # --- 3. 나의 리그 정보 조회 ---
-    my_league_info = None
-    my_name = current_user.player.name
-    my_league = League.query.filter(
-        (League.p1 == my_name) | (League.p2 == my_name) | (League.p3 == my_name) |
-        (League.p4 == my_name) | (League.p5 == my_name)
-    ).order_by(League.id.desc()).first()
+            if most_recent[0] is not None and most_recent[0].astimezone(seoul_tz).date() == today:
+                recent_match = {'date': today, 'approved': most_recent[1]}
+        # 오늘 경기가 없는 '제출됨' 기록은 화면에서 미제출로 보고, DB 정리는 expire-partners 명령이 맡습니다.
+        today_partner = {'opponent_name': opponent_name, 'submitted': today_match.submitted, 'recent_match': recent_match}
+
+    ongoing_bettings = [
+        {'id': bet.id, 'p1_name': bet.p1_name, 'p2_name': bet.p2_name, 'point': bet.point}
+        for bet in Betting.query.filter_by(is_closed=False).order_by(Betting.id.desc()).all()
+        if player_id not in [bet.p1_id, bet.p2_id]
+    ]
 
+    my_league_info = None
+    my_league = db.session.query(
+        League.id, League.name, League.member_count, LeagueMember.wins, LeagueMember.losses, LeagueMember.rank
+    ).join(LeagueMember).filter(LeagueMember.player_id == player_id).order_by(League.id.desc()).first()
     if my_league:
-        player_names = [my_league.p1, my_league.p2, my_league.p3, my_league.p4, my_league.p5]
-        standings_data = []
-        for i, name in enumerate(player_names):
-            wins, losses = 0, 0
-            for j in range(5):
-                if i == j: continue
-                if getattr(my_league, f'p{i+1}p{j+1}') is not None: wins += 1
-                if getattr(my_league, f'p{j+1}p{i+1}') is not None: losses += 1
-            total_games = wins + losses
-            win_rate = (wins / total_games) * 100 if total_games > 0 else 0.0
-            standings_data.append({'name': name, 'wins': wins, 'losses': losses, 'win_rate': win_rate})
-
-        sorted_standings = sorted(standings_data, key=lambda x: (x['wins'], x['win_rate'], -x['losses']), reverse=True)
-
-        my_rank, my_wins, my_losses = 0, 0, 0
-        last_criteria, current_rank = (-1, -1, -1), 0
-        for i, stats in enumerate(sorted_standings):
-            current_criteria = (stats['wins'], stats['win_rate'], stats['losses'])
-            if current_criteria != last_criteria:
-                current_rank = i + 1
-            last_criteria = current_criteria
-
-            if stats['name'] == my_name:
-                my_rank = current_rank
-                my_wins = stats['wins']
-                my_losses = stats['losses']
-                break
-
         my_league_info = {
-            'league': my_league, 'wins': my_wins,
-            'losses': my_losses, 'rank': my_rank
+            'league': {'id': my_league.id, 'name': my_league.name}, 'wins': my_league.wins,
+            'losses': my_league.losses, 'rank': my_league.rank, 'size': my_league.member_count
+        }
+
+    return {
+        'my_ranks': my_ranks,
+        'my_recent_matches': my_recent_matches,
+        'today_partner': today_partner,
+        'ongoing_bettings': ongoing_bettings,
+        'my_league_info': my_league_info,
+    }
+
+
+@main_bp.route('/')
+@use_read_replica
+@login_required
+def index():
+    # 선수별 데이터는 버전 키로 캐시된 스냅샷을, 순위는 리더보드 캐시를 사용합니다.
+    player_id = current_user.player_id
+    snapshot = get_dashboard_snapshot(player_id, lambda: _build_dashboard_snapshot(player_id))
+
+    rankings_data = {}
+    for title, category, _order_field, _value_field in _INDEX_RANKING_CATEGORIES:
+        top_players = get_leaderboard(category)[:3]
+        top_ranks = sorted(set(p['actual_rank'] for p in top_players if p['actual_rank'] is not None))
+        rankings_data[title] = {
+            'players': top_players,
+            'my_rank': snapshot['my_ranks'][title],
+            'top_ranks': top_ranks
         }
 
-    # --- 4. 최종 렌더링 ---
+    # 오늘의 상대 제출 여부는 날짜가 바뀌면 만료되므로 렌더링할 때 판단합니다.
+    today_partner_info = None
+    today_partner = snapshot['today_partner']
+    if today_partner:
+        today = datetime.now(ZoneInfo("Asia/Seoul")).date()
+        recent_match = today_partner['recent_match']
+        submitted = today_partner['submitted'] and recent_match is not None and recent_match['date'] == today
+        approval_status = ('approved' if recent_match['approved'] else 'pending') if submitted else None
+        today_partner_info = {'date': datetime.now(ZoneInfo("Asia/Seoul")).strftime('%m.%d'), 'opponent_name': today_partner['opponent_name'], 'submitted': submitted, 'approval_status': approval_status}
+
     return render_template(
         'index.html',
         global_texts=current_app.config['GLOBAL_TEXTS'],
         rankings=rankings_data,
-        my_recent_matches=my_recent_matches,
+        my_recent_matches=snapshot['my_recent_matches'],
         today_partner_info=today_partner_info,
-        ongoing_bettings=betting_data,
-        my_league_info=my_league_info
+        ongoing_bettings=snapshot['ongoing_bettings'],
+        my_league_info=snapshot['my_league_info']
     )
 
 
@@ -246,27 +262,21 @@ def intro():
     season_rankings = {}
     if is_ended:
         categories = [
-            (_('🏆 다승왕'), Player.win_count.desc(), 'win_count', _('승')),
-            (_('🔥 승률왕'), Player.rate_count.desc(), 'rate_count', '%'),
-            (_('🏓 최다 경기'), Player.match_count.desc(), 'match_count', _('전')),
-            (_('🤝 마당발'), Player.opponent_count.desc(), 'opponent_count', _('명')),
-            (_('🏅 업적왕'), Player.achieve_count.desc(), 'achieve_count', 'pt'),
-            (_('💸 베팅왕'), Player.betting_count.desc(), 'betting_count', 'pt'),
-            (_('💀 최다 패배'), Player.loss_count.desc(), 'loss_count', _('패'))
+            (_('🏆 다승왕'), 'win', _('승')),
+            (_('🔥 승률왕'), 'rate', '%'),
+            (_('🏓 최다 경기'), 'match', _('전')),
+            (_('🤝 마당발'), 'opponent', _('명')),
+            (_('🏅 업적왕'), 'achieve', 'pt'),
+            (_('💸 베팅왕'), 'betting', 'pt'),
+            (_('💀 최다 패배'), 'loss', _('패'))
         ]
 
-        for title, criteria, attr, unit in categories:
-            top5 = Player.query.join(User).filter(
-                Player.is_valid == True, User.is_admin == False
-            ).order_by(criteria, Player.name).limit(5).all()
-
-            season_rankings[title] = {'players': top5, 'unit': unit, 'attr': attr}
+        for title, category, unit in categories:
+            season_rankings[title] = {'players': get_leaderboard(category)[:5], 'unit': unit}
 
     top_players = []
     if is_ended:
-        top_players = Player.query.join(User).filter(
-            Player.is_valid == True, User.is_admin == False
-        ).order_by(Player.win_count.desc(), Player.rate_count.desc(), Player.match_count.desc()).limit(5).all()
+        top_players = get_leaderboard(LEADERBOARD_OVERALL)[:5]
 
     # [중요] index.html의 '방문 도장' 찍기
     session['visited_intro'] = True
@@ -278,11 +288,11 @@ def intro():
                             top_players=top_players,
                             special_awards=special_awards,
                             timeline=timeline,
-                            season_rankings=season_rankings,
-                            getattr=getattr)
+                            season_rankings=season_rankings)
 
 
 @main_bp.route('/rankings_page')
+@use_read_replica
 @login_required
 def rankings_page():
     current_player = current_user.player if current_user.is_authenticated else None
@@ -303,6 +313,7 @@ def rankings_page():
 
 
 @main_bp.route('/mypage')
+@use_read_replica
 @login_required
 def mypage():
     player_info = current_user.player
@@ -318,6 +329,7 @@ def mypage():
 
 
 @main_bp.route('/point_history')
+@use_read_replica
 @login_required
 def point_history():
     logs = PlayerPointLog.query.filter_by(player_id=current_user.player_id)\
@@ -328,6 +340,7 @@ def point_history():
 
 
 @main_bp.route('/player/<int:player_id>', methods=['GET'])
+@use_read_replica
 @login_required
 def player_detail(player_id):
     if current_user.player_id == player_id:
@@ -369,16 +382,18 @@ def favicon():
 
 
 @main_bp.route('/partner')
+@use_read_replica
 @login_required
 def partner():
     partners = TodayPartner.query.order_by(TodayPartner.id).all()
+    players = load_players([p.p1_id for p in partners] + [p.p2_id for p in partners], load_only(Player.id, Player.rank))
 
     p1_ranks = []
     p2_ranks = []
     for p in partners:
-        p1 = Player.query.filter_by(id=p.p1_id).first()
+        p1 = players.get(p.p1_id)
         p1_ranks.append(p1.rank if p1 else None)
-        p2 = Player.query.filter_by(id=p.p2_id).first()
+        p2 = players.get(p.p2_id)
         p2_ranks.append(p2.rank if p2 else None)
 
     indexed_partners = [{'index': idx, 'partner': pr, 'p1_rank': p1_rank, 'p2_rank': p2_rank} for idx, (pr, p1_rank, p2_rank) in enumerate(zip(partners, p1_ranks, p2_ranks))]
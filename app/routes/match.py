@@ -2,8 +2,14 @@ from flask import Blueprint, render_template, jsonify, request, flash, redirect,
 from flask_login import current_user, login_required
 from flask_babel import _
 from ..extensions import db
-from ..models import Match, Player, User, TodayPartner, UpdateLog, Betting
-from ..utils import add_point_log, calculate_opponent_count, update_player_orders_by_match, update_player_orders_by_point
+from sqlalchemy import bindparam, func, insert, select, update
+from ..models import Match, MatchJournal, Player, PlayerOpponent, User, TodayPartner, UpdateLog, Betting
+from ..utils import (
+    add_opponent_counts, add_point_log, add_points, claim_pending_rows, invalidate_dashboards, mark_player_orders_dirty,
+    record_head_to_head, refresh_leaderboards, resolve_player_ids, retract_head_to_head, use_read_replica
+)
+from ..stats import JOURNAL_FIELDS, cancel_reason, estimate_match_journal, record_match_result
+from ..jobs import enqueue_job, job_handler, no_progress, wants_async
 from datetime import datetime
 from zoneinfo import ZoneInfo
 from ..models import GenderEnum, FreshmanEnum
@@ -32,13 +38,13 @@ def submit_match_direct():
         flash(_('승리자와 패배자는 다른 사람이어야 합니다.'), 'error')
         return redirect(url_for('main.index'))
 
-    winner = Player.query.filter_by(name=winner_name, is_valid=True).first()
-    loser = Player.query.filter_by(name=loser_name, is_valid=True).first()
+    player_ids = resolve_player_ids([winner_name, loser_name], valid_only=True)
+    winner_id, loser_id = player_ids.get(winner_name), player_ids.get(loser_name)
 
-    if not winner or not loser:
+    if not winner_id or not loser_id:
         unknown = []
-        if not winner: unknown.append(winner_name)
-        if not loser: unknown.append(loser_name)
+        if not winner_id: unknown.append(winner_name)
+        if not loser_id: unknown.append(loser_name)
         names_str = ", ".join(unknown)
         flash(_('등록되지 않은 선수 이름이 있습니다: %(names)s') % {'names': names_str}, 'error')
         return redirect(url_for('main.index'))
@@ -46,9 +52,9 @@ def submit_match_direct():
     # 1. index 함수와 동일하게, 가장 최신(id가 가장 높은) 파트너 기록을 찾습니다.
     today_partner = TodayPartner.query.filter(
         (
-            (TodayPartner.p1_id == winner.id) & (TodayPartner.p2_id == loser.id)
+            (TodayPartner.p1_id == winner_id) & (TodayPartner.p2_id == loser_id)
         ) | (
-            (TodayPartner.p1_id == loser.id) & (TodayPartner.p2_id == winner.id)
+            (TodayPartner.p1_id == loser_id) & (TodayPartner.p2_id == winner_id)
         )
     ).order_by(TodayPartner.id.desc()).first()
 
@@ -59,14 +65,15 @@ def submit_match_direct():
 
     # Match 객체 생성
     new_match = Match(
-        winner=winner.id,
-        winner_name=winner.name,
-        loser=loser.id,
-        loser_name=loser.name,
+        winner=winner_id,
+        winner_name=winner_name,
+        loser=loser_id,
+        loser_name=loser_name,
         score=score,
         approved=False
     )
     db.session.add(new_match)
+    invalidate_dashboards([winner_id, loser_id])
 
     # 3. 모든 변경사항(파트너 상태, 새 경기)을 한번에 저장합니다.
     db.session.commit()
@@ -113,8 +120,7 @@ def check_players():
         player_names.add(match['winner'])
         player_names.add(match['loser'])
 
-    existing_players = {player.name for player in Player.query.filter(Player.name.in_(player_names), Player.is_valid == True).all()}
-    unknown_players = list(player_names - existing_players)
+    unknown_players = list(player_names - resolve_player_ids(player_names, valid_only=True).keys())
 
     return jsonify({'unknownPlayers': unknown_players})
 
@@ -128,9 +134,12 @@ def submit_matches():
         if not matches or not isinstance(matches, list):
             return jsonify({"error": "올바른 데이터를 제출해주세요."}), 400
 
+        if not all(isinstance(match, dict) for match in matches):
+            return jsonify({"error": "각 경기 데이터는 객체 형식이어야 합니다."}), 400
+
+        # 제출된 모든 경기의 선수 이름을 한 번에 조회합니다.
+        player_ids = resolve_player_ids([match.get(key) for match in matches for key in ('winner', 'loser')])
         for match in matches:
-            if not isinstance(match, dict):
-                return jsonify({"error": "각 경기 데이터는 객체 형식이어야 합니다."}), 400
 
             winner_name = match.get('winner')
             loser_name = match.get('loser')
@@ -140,20 +149,19 @@ def submit_matches():
             if not winner_name or not loser_name or not score_value:
                 continue
 
-            winner = Player.query.filter_by(name=winner_name).first()
-            loser = Player.query.filter_by(name=loser_name).first()
+            winner_id, loser_id = player_ids.get(winner_name), player_ids.get(loser_name)
 
-            if not winner or not loser:
+            if not winner_id or not loser_id:
                 print(f"Player not found, skipping match: Winner={winner_name}, Loser={loser_name}")
                 continue
 
             current_time = datetime.now(ZoneInfo("Asia/Seoul"))
 
             new_match = Match(
-                winner=winner.id,
-                winner_name=winner.name,
-                loser=loser.id,
-                loser_name=loser.name,
+                winner=winner_id,
+                winner_name=winner_name,
+                loser=loser_id,
+                loser_name=loser_name,
                 score=score_value,
                 timestamp=current_time,
                 approved=False
@@ -166,11 +174,11 @@ def submit_matches():
 
             if today_partner:
                 today_partner.submitted = True
+            invalidate_dashboards([winner_id, loser_id])
 
             if league_tf:
-                winner.betting_count += 3
-                add_point_log(winner.id, betting_change=3, reason=f"{loser.name} 상대 경기 승리")
-                update_player_orders_by_point()
+                add_points(winner_id, betting_change=3, reason=f"{loser_name} 상대 경기 승리")
+                mark_player_orders_dirty('point')
 
         db.session.commit()
         return jsonify({'success': True, 'message': f"{len(matches)}개의 경기 결과가 제출되었습니다!"}), 200
@@ -184,6 +192,7 @@ def submit_matches():
 
 
 @match_bp.route('/get_matches', methods=['GET'])
+@use_read_replica
 def get_matches():
     offset = int(request.args.get('offset', 0))
     limit = int(request.args.get('limit', 30))
@@ -222,355 +231,291 @@ def get_matches():
     return jsonify(response)
 
 
+# 승인 엔진이 읽고 쓰는 Player 컬럼
+_APPROVAL_READ_COLUMNS = (
+    Player.id, Player.match_count, Player.win_count, Player.loss_count, Player.rate_count,
+    Player.opponent_count, Player.achieve_count, Player.betting_count, Player.rank,
+    Player.gender, Player.is_she_or_he_freshman,
+)
+# 업적/베팅 포인트는 절대값 대신 증감량(add_points)으로 반영합니다.
+_APPROVAL_WRITE_FIELDS = (
+    'id', 'match_count', 'win_count', 'loss_count', 'rate_count',
+    'opponent_count', 'rank',
+)
+
+
 def _approve_single_match(match):
-    winner = Player.query.get(match.winner)
-    loser = Player.query.get(match.loser)
-    if not winner or not loser:
-        return
+    _approve_matches_bulk([match])
+
+
+def _approve_matches_bulk(matches):
+    """여러 경기를 한 번에 승인하고 승인된 경기 수를 반환합니다.
+
+    관련 선수, 오늘의 상대, 상대 인덱스(PlayerOpponent)를 한 번씩만 읽은 뒤 경기 시간 순서대로
+    메모리에서 스탯/업적/보너스를 적용하고, 결과(상대 전적 HeadToHead 포함)를 몇 개의 일괄 쿼리로 저장합니다.
+    경기별로 실제 적용한 변화량은 MatchJournal 에 기록해 삭제 시 그대로 되돌립니다.
+    포인트 로그는 add_point_log 버퍼를 통해 커밋 시 한 번에 저장됩니다.
+    """
+    if not matches:
+        return 0
+
+    matches = sorted(matches, key=lambda m: (m.timestamp, m.id))
+    player_ids = {m.winner for m in matches} | {m.loser for m in matches}
+
+    # 선수 카운터는 읽은 값에 더해 절대값으로 쓰므로, 동시에 같은 선수를 승인하는 요청이 끝날 때까지
+    # 관련 선수 행을 잠급니다. (id 순서로 잠가 교착을 피합니다. 행 잠금이 없는 SQLite 는 claim_pending_rows 의 쓰기 잠금으로 직렬화됩니다)
+    states = {
+        row.id: dict(row._mapping)
+        for row in db.session.query(*_APPROVAL_READ_COLUMNS).filter(
+            Player.id.in_(player_ids)
+        ).order_by(Player.id).with_for_update().all()
+    }
+
+    state_ids = list(states)
+    initial_points = {player_id: (state['achieve_count'], state['betting_count']) for player_id, state in states.items()}
+    pair_counts = {
+        (player_id, opponent_id): match_count
+        for player_id, opponent_id, match_count in db.session.query(
+            PlayerOpponent.player_id, PlayerOpponent.opponent_id, PlayerOpponent.match_count
+        ).filter(
+            PlayerOpponent.player_id.in_(state_ids),
+            PlayerOpponent.opponent_id.in_(state_ids)
+        ).all()
+    }
+    initial_pair_counts = dict(pair_counts)
+    changed_pairs = set()
+
+    # 오늘의 상대 보너스는 경기를 제출한 날 붙은 '제출됨' 표시로 판단합니다. (승인한 날짜와 무관)
+    partner_pairs = {
+        frozenset((p1_id, p2_id))
+        for p1_id, p2_id in db.session.query(TodayPartner.p1_id, TodayPartner.p2_id).filter(
+            TodayPartner.submitted == True,
+            TodayPartner.p1_id.in_(state_ids),
+            TodayPartner.p2_id.in_(state_ids)
+        ).all()
+    }
 
-    match.approved = True
-
-    winner.match_count += 1
-    winner.win_count += 1
-    winner.rate_count = round((winner.win_count / winner.match_count) * 100, 2)
-    winner_previous_opponent = winner.opponent_count
-    winner.opponent_count = calculate_opponent_count(winner.id)
-
-    winner.betting_count += 1
-    add_point_log(winner.id, betting_change=1, reason='경기 결과 제출')
-
-    loser.match_count += 1
-    loser.loss_count += 1
-    loser.rate_count = round((loser.win_count / loser.match_count) * 100, 2)
-    loser_previous_opponent = loser.opponent_count
-    loser.opponent_count = calculate_opponent_count(loser.id)
-
-    loser.betting_count += 1
-    add_point_log(loser.id, betting_change=1, reason='경기 결과 제출')
-
-    if winner.match_count == 30:
-        winner.betting_count += 10
-        winner.achieve_count += 5
-        add_point_log(winner.id, betting_change=10, reason='30경기 달성!')
-        add_point_log(winner.id, achieve_change=5, reason='30경기 달성!')
-    if winner.match_count == 50:
-        winner.betting_count += 20
-        winner.achieve_count += 10
-        add_point_log(winner.id, betting_change=20, reason='50경기 달성!')
-        add_point_log(winner.id, achieve_change=10, reason='50경기 달성!')
-    if winner.match_count == 70:
-        winner.betting_count += 40
-        winner.achieve_count += 20
-        add_point_log(winner.id, betting_change=40, reason='70경기 달성!')
-        add_point_log(winner.id, achieve_change=20, reason='70경기 달성!')
-
-    if winner.match_count == 100:
-        winner.betting_count += 60
-        winner.achieve_count += 30
-        add_point_log(winner.id, betting_change=60, reason='100경기 달성!')
-        add_point_log(winner.id, achieve_change=30, reason='100경기 달성!')
-
-    if winner.win_count == 20:
-        winner.betting_count += 20
-        winner.achieve_count += 10
-        add_point_log(winner.id, betting_change=20, reason='누적 20승 달성!')
-        add_point_log(winner.id, achieve_change=10, reason='누적 20승 달성!')
-
-    if winner.win_count == 35:
-        winner.betting_count += 40
-        winner.achieve_count += 20
-        add_point_log(winner.id, betting_change=40, reason='누적 35승 달성!')
-        add_point_log(winner.id, achieve_change=20, reason='누적 35승 달성!')
-
-    if winner.win_count == 50:
-        winner.betting_count += 60
-        winner.achieve_count += 30
-        add_point_log(winner.id, betting_change=60, reason='누적 50승 달성!')
-        add_point_log(winner.id, achieve_change=30, reason='누적 50승 달성!')
-
-    if winner_previous_opponent == 9 and winner.opponent_count == 10:
-        winner.betting_count += 10
-        winner.achieve_count += 5
-        add_point_log(winner.id, betting_change=10, reason='누적 상대 수 10명 달성!')
-        add_point_log(winner.id, achieve_change=5, reason='누적 상대 수 10명 달성!')
-
-    if winner_previous_opponent == 24 and winner.opponent_count == 25:
-        winner.betting_count += 40
-        winner.achieve_count += 20
-        add_point_log(winner.id, betting_change=40, reason='누적 상대 수 25명 달성!')
-        add_point_log(winner.id, achieve_change=20, reason='누적 상대 수 25명 달성!')
-
-    if winner_previous_opponent == 39 and winner.opponent_count == 40:
-        winner.betting_count += 60
-        winner.achieve_count += 30
-        add_point_log(winner.id, betting_change=60, reason='누적 상대 수 40명 달성!')
-        add_point_log(winner.id, achieve_change=30, reason='누적 상대 수 40명 달성!')
-
-    if loser.match_count == 30:
-        loser.betting_count += 10
-        loser.achieve_count += 5
-        add_point_log(loser.id, betting_change=10, reason='30경기 달성!')
-        add_point_log(loser.id, achieve_change=5, reason='30경기 달성!')
-
-    if loser.match_count == 50:
-        loser.betting_count += 20
-        loser.achieve_count += 10
-        add_point_log(loser.id, betting_change=20, reason='50경기 달성!')
-        add_point_log(loser.id, achieve_change=10, reason='50경기 달성!')
-
-    if loser.match_count == 70:
-        loser.betting_count += 40
-        loser.achieve_count += 20
-        add_point_log(loser.id, betting_change=40, reason='70경기 달성!')
-        add_point_log(loser.id, achieve_change=20, reason='70경기 달성!')
-
-    if loser.match_count == 100:
-        loser.betting_count += 60
-        loser.achieve_count += 30
-        add_point_log(loser.id, betting_change=60, reason='100경기 달성!')
-        add_point_log(loser.id, achieve_change=30, reason='100경기 달성!')
-
-    if loser.loss_count == 20:
-        loser.betting_count += 10
-        loser.achieve_count += 10
-        add_point_log(loser.id, betting_change=10, reason='누적 20패 달성!')
-        add_point_log(loser.id, achieve_change=10, reason='누적 20패 달성!')
-
-    if loser.loss_count == 35:
-        loser.betting_count += 20
-        loser.achieve_count += 20
-        add_point_log(loser.id, betting_change=20, reason='누적 35패 달성!')
-        add_point_log(loser.id, achieve_change=20, reason='누적 35패 달성!')
-
-    if loser.loss_count == 50:
-        loser.betting_count += 30
-        loser.achieve_count += 30
-        add_point_log(loser.id, betting_change=30, reason='누적 50패 달성!')
-        add_point_log(loser.id, achieve_change=30, reason='누적 50패 달성!')
-
-    if loser_previous_opponent == 9 and loser.opponent_count == 10:
-        loser.betting_count += 10
-        loser.achieve_count += 5
-        add_point_log(loser.id, betting_change=10, reason='누적 상대 수 10명 달성!')
-        add_point_log(loser.id, achieve_change=5, reason='누적 상대 수 10명 달성!')
-
-    if loser_previous_opponent == 24 and loser.opponent_count == 25:
-        loser.betting_count += 40
-        loser.achieve_count += 20
-        add_point_log(loser.id, betting_change=40, reason='누적 상대 수 25명 달성!')
-        add_point_log(loser.id, achieve_change=20, reason='누적 상대 수 25명 달성!')
-
-    if loser_previous_opponent == 39 and loser.opponent_count == 40:
-        loser.betting_count += 60
-        loser.achieve_count += 30
-        add_point_log(loser.id, betting_change=60, reason='누적 상대 수 40명 달성!')
-        add_point_log(loser.id, achieve_change=30, reason='누적 상대 수 40명 달성!')
-
-    today_partner = TodayPartner.query.filter_by(p1_id=match.winner, p2_id=match.loser, submitted=True).first()
-    if not today_partner:
-        today_partner = TodayPartner.query.filter_by(p1_id=match.loser, p2_id=match.winner, submitted=True).first()
+    touched_ids = set()
+    approved_ids = []
+    journal_rows = []
 
-    if today_partner:
-        winner.betting_count += 5
-        winner.achieve_count += 1
-        add_point_log(winner.id, betting_change=5, reason='오늘의 상대 경기 결과 제출!')
-        add_point_log(winner.id, achieve_change=1, reason='오늘의 상대 경기 결과 제출!')
-        loser.betting_count += 5
-        loser.achieve_count += 1
-        add_point_log(loser.id, betting_change=5, reason='오늘의 상대 경기 결과 제출!')
-        add_point_log(loser.id, achieve_change=1, reason='오늘의 상대 경기 결과 제출!')
-
-    if match.timestamp.weekday() == 6:
-        winner.achieve_count += 1; winner.betting_count += 3
-        loser.achieve_count += 1; loser.betting_count += 3
-        add_point_log(winner.id, betting_change=3, reason='안 쉬세요??')
-        add_point_log(winner.id, achieve_change=1, reason='안 쉬세요??')
-        add_point_log(loser.id, betting_change=3, reason='안 쉬세요??')
-        add_point_log(loser.id, achieve_change=1, reason='안 쉬세요??')
-
-    if winner.is_she_or_he_freshman == FreshmanEnum.YES and winner.match_count == 16:
-        if winner.gender == GenderEnum.MALE:
-            winner.rank = 5
-        elif winner.gender == GenderEnum.FEMALE:
-            winner.rank = 7
-
-
-    if loser.is_she_or_he_freshman == FreshmanEnum.YES and loser.match_count == 16:
-        if loser.gender == GenderEnum.MALE:
-            loser.rank = 5
-        elif loser.gender == GenderEnum.FEMALE:
-            loser.rank = 7
+    for match in matches:
+        winner = states.get(match.winner)
+        loser = states.get(match.loser)
+        if not winner or not loser:
+            continue
+
+        approved_ids.append(match.id)
+        touched_ids.update((winner['id'], loser['id']))
+        changed_pairs.update(((winner['id'], loser['id']), (loser['id'], winner['id'])))
+
+        entries = record_match_result(
+            winner, loser, pair_counts, match.timestamp,
+            is_partner_match=frozenset((match.winner, match.loser)) in partner_pairs,
+            log=add_point_log
+        )
+        journal_rows.extend({'match_id': match.id, **entry} for entry in entries)
+
+    if not approved_ids:
+        return 0
+
+    db.session.execute(
+        update(Player),
+        [{field: states[player_id][field] for field in _APPROVAL_WRITE_FIELDS} for player_id in touched_ids]
+    )
+    for player_id in touched_ids:
+        achieve_before, betting_before = initial_points[player_id]
+        add_points(player_id, achieve_change=states[player_id]['achieve_count'] - achieve_before,
+                   betting_change=states[player_id]['betting_count'] - betting_before)
+    Match.query.filter(Match.id.in_(approved_ids)).update({'approved': True}, synchronize_session='evaluate')
+    approved_set = set(approved_ids)
+    record_head_to_head([match for match in matches if match.id in approved_set])
+    invalidate_dashboards(touched_ids)
+    db.session.execute(insert(MatchJournal), journal_rows)
+    add_opponent_counts({pair: pair_counts[pair] - initial_pair_counts.get(pair, 0) for pair in changed_pairs})
+
+    return len(approved_ids)
 
 
 def _delete_single_match(match):
-    was_approved = match.approved
-    if match.approved:
-        winner = Player.query.get(match.winner)
-        loser = Player.query.get(match.loser)
+    approved_count, _ = _delete_matches_bulk([match])
+    return 'approved' if approved_count else 'pending'
+
+
+def _delete_matches_bulk(matches):
+    """여러 경기를 한 번에 삭제하고 (승인된 경기 수, 미승인 경기 수)를 반환합니다.
+
+    승인된 경기는 승인 시 기록한 저널(MatchJournal)과 상대 전적을 되돌리고,
+    미승인 경기는 제출 시 표시한 오늘의 상대 제출 여부만 되돌립니다.
+    """
+    if not matches:
+        return 0, 0
+
+    approved_ids = [m.id for m in matches if m.approved]
+    pending_matches = [m for m in matches if not m.approved]
+
+    if approved_ids:
+        _reverse_match_journal(approved_ids)
+        retract_head_to_head([m for m in matches if m.approved])
+    if pending_matches:
+        _unsubmit_today_partners(pending_matches)
+
+    match_ids = [m.id for m in matches]
+    invalidate_dashboards({m.winner for m in matches} | {m.loser for m in matches})
+    MatchJournal.query.filter(MatchJournal.match_id.in_(match_ids)).delete(synchronize_session=False)
+    Match.query.filter(Match.id.in_(match_ids)).delete(synchronize_session='evaluate')
+    return len(approved_ids), len(pending_matches)
+
+
+def _reverse_match_journal(match_ids):
+    """승인된 경기들의 저널 변화량을 선수별로 합산해 한 번의 UPDATE로 되돌립니다."""
+    journaled_ids = {
+        match_id for match_id, in db.session.query(MatchJournal.match_id).filter(
+            MatchJournal.match_id.in_(match_ids)
+        ).distinct()
+    }
+    unjournaled_ids = set(match_ids) - journaled_ids
+    if unjournaled_ids:
+        _estimate_unjournaled_matches(unjournaled_ids, journaled_ids)
+
+    journal = MatchJournal.query.filter(MatchJournal.match_id.in_(match_ids)).all()
+    if not journal:
+        return
 
-        if not winner or not loser:
-            db.session.delete(match)
-            return 'approved'
-
-        # --- 승인된 경기의 모든 스탯 되돌리기 ---
-        winner.match_count -= 1
-        winner.win_count -= 1
-        winner.rate_count = round((winner.win_count / winner.match_count) * 100, 2) if winner.match_count > 0 else 0
-        winner_previous_opponent = winner.opponent_count
-        winner.opponent_count = calculate_opponent_count(winner.id)
-
-        winner.betting_count -= 1
-        add_point_log(winner.id, betting_change=-1, reason='경기 결과 제출 취소')
-
-        loser.match_count -= 1
-        loser.loss_count -= 1
-        loser.rate_count = round((loser.win_count / loser.match_count) * 100, 2) if loser.match_count > 0 else 0
-        loser_previous_opponent = loser.opponent_count
-        loser.opponent_count = calculate_opponent_count(loser.id)
-
-        loser.betting_count -= 1
-        add_point_log(loser.id, betting_change=-1, reason='경기 결과 제출 취소')
-
-        if winner.match_count == 29:
-            winner.betting_count -= 10
-            winner.achieve_count -= 5
-            add_point_log(winner.id, betting_change=-10, reason='누적 30경기 달성 취소')
-            add_point_log(winner.id, achieve_change=-5, reason='누적 30경기 달성 취소')
-        if winner.match_count == 49:
-            winner.betting_count -= 20
-            winner.achieve_count -= 10
-            add_point_log(winner.id, betting_change=-20, reason='누적 50경기 달성 취소')
-            add_point_log(winner.id, achieve_change=-10, reason='누적 50경기 달성 취소')
-        if winner.match_count == 69:
-            winner.betting_count -= 40
-            winner.achieve_count -= 20
-            add_point_log(winner.id, betting_change=-40, reason='누적 70경기 달성 취소')
-            add_point_log(winner.id, achieve_change=-20, reason='누적 70경기 달성 취소')
-        if winner.match_count == 99:
-            winner.betting_count -= 60
-            winner.achieve_count -= 30
-            add_point_log(winner.id, betting_change=-60, reason='누적 100경기 달성 취소')
-            add_point_log(winner.id, achieve_change=-30, reason='누적 100경기 달성 취소')
-        if winner.win_count == 19:
-            winner.betting_count -= 20
-            winner.achieve_count -= 10
-            add_point_log(winner.id, betting_change=-20, reason='누적 20승 달성 취소')
-            add_point_log(winner.id, achieve_change=-10, reason='누적 20승 달성 취소')
-        if winner.win_count == 34:
-            winner.betting_count -= 40
-            winner.achieve_count -= 20
-            add_point_log(winner.id, betting_change=-40, reason='누적 35승 달성 취소')
-            add_point_log(winner.id, achieve_change=-20, reason='누적 35승 달성 취소')
-        if winner.win_count == 49:
-            winner.betting_count -= 60
-            winner.achieve_count -= 30
-            add_point_log(winner.id, betting_change=-60, reason='누적 50승 달성 취소')
-            add_point_log(winner.id, achieve_change=-30, reason='누적 50승 달성 취소')
-        if winner_previous_opponent == 10 and winner.opponent_count == 9:
-            winner.betting_count -= 10
-            winner.achieve_count -= 5
-            add_point_log(winner.id, betting_change=-10, reason='누적 상대 10명 달성 취소')
-            add_point_log(winner.id, achieve_change=-5, reason='누적 상대 10명 달성 취소')
-        if winner_previous_opponent == 25 and winner.opponent_count == 24:
-            winner.betting_count -= 40
-            winner.achieve_count -= 20
-            add_point_log(winner.id, betting_change=-40, reason='누적 상대 25명 달성 취소')
-            add_point_log(winner.id, achieve_change=-20, reason='누적 상대 25명 달성 취소')
-        if winner_previous_opponent == 40 and winner.opponent_count == 39:
-            winner.betting_count -= 60
-            winner.achieve_count -= 30
-            add_point_log(winner.id, betting_change=-60, reason='누적 상대 40명 달성 취소')
-            add_point_log(winner.id, achieve_change=-30, reason='누적 상대 40명 달성 취소')
-        if loser.match_count == 29:
-            loser.betting_count -= 10
-            loser.achieve_count -= 5
-            add_point_log(loser.id, betting_change=-10, reason='누적 30경기 달성 취소')
-            add_point_log(loser.id, achieve_change=-5, reason='누적 30경기 달성 취소')
-        if loser.match_count == 49:
-            loser.betting_count -= 20
-            loser.achieve_count -= 10
-            add_point_log(loser.id, betting_change=-10, reason='누적 50경기 달성 취소')
-            add_point_log(loser.id, achieve_change=-5, reason='누적 50경기 달성 취소')
-        if loser.match_count == 69:
-            loser.betting_count -= 40
-            loser.achieve_count -= 20
-            add_point_log(loser.id, betting_change=-40, reason='누적 70경기 달성 취소')
-            add_point_log(loser.id, achieve_change=-20, reason='누적 70경기 달성 취소')
-        if loser.match_count == 99:
-            loser.betting_count -= 60
-            loser.achieve_count -= 30
-            add_point_log(loser.id, betting_change=-60, reason='누적 100경기 달성 취소')
-            add_point_log(loser.id, achieve_change=-30, reason='누적 100경기 달성 취소')
-        if loser.loss_count == 19:
-            loser.betting_count -= 10
-            loser.achieve_count -= 10
-            add_point_log(loser.id, betting_change=-10, reason='누적 20패 달성 취소')
-            add_point_log(loser.id, achieve_change=-10, reason='누적 20패 달성 취소')
-        if loser.loss_count == 34:
-            loser.betting_count -= 20
-            loser.achieve_count -= 20
-            add_point_log(loser.id, betting_change=-20, reason='누적 35패 달성 취소')
-            add_point_log(loser.id, achieve_change=-20, reason='누적 35패 달성 취소')
-        if loser.loss_count == 49:
-            loser.betting_count -= 30
-            loser.achieve_count -= 30
-            add_point_log(loser.id, betting_change=-30, reason='누적 50패 달성 취소')
-            add_point_log(loser.id, achieve_change=-30, reason='누적 50패 달성 취소')
-        if loser_previous_opponent == 10 and loser.opponent_count == 9:
-            loser.betting_count -= 10
-            loser.achieve_count -= 5
-            add_point_log(loser.id, betting_change=-10, reason='누적 상대수 10명 달성 취소')
-            add_point_log(loser.id, achieve_change=-5, reason='누적 상대수 10명 달성 취소')
-        if loser_previous_opponent == 25 and loser.opponent_count == 24:
-            loser.betting_count -= 40
-            loser.achieve_count -= 20
-            add_point_log(loser.id, betting_change=-40, reason='누적 상대수 25명 달성 취소')
-            add_point_log(loser.id, achieve_change=-20, reason='누적 상대수 25명 달성 취소')
-        if loser_previous_opponent == 40 and loser.opponent_count == 39:
-            loser.betting_count -= 60
-            loser.achieve_count -= 30
-            add_point_log(loser.id, betting_change=-60, reason='누적 상대수 40명 달성 취소')
-            add_point_log(loser.id, achieve_change=-30, reason='누적 상대수 40명 달성 취소')
-
-        today_partner = TodayPartner.query.filter_by(p1_id=match.winner, p2_id=match.loser, submitted=True).first()
-        if not today_partner:
-            today_partner = TodayPartner.query.filter_by(p1_id=match.loser, p2_id=match.winner, submitted=True).first()
-
-        if today_partner:
-            winner.betting_count -= 5
-            loser.betting_count -= 5
-            add_point_log(winner.id, betting_change=-5, reason='오늘의 상대 제출 취소')
-            add_point_log(loser.id, betting_change=-5, reason='오늘의 상대 제출 취소')
-
-        if match.timestamp.weekday() == 6:
-            winner.achieve_count -= 1; winner.betting_count -= 3
-            loser.achieve_count -= 1; loser.betting_count -= 3
-            add_point_log(winner.id, betting_change=-3, reason='안 쉬세요?? 취소')
-            add_point_log(winner.id, achieve_change=-1, reason='안 쉬세요?? 취소')
-            add_point_log(loser.id, achieve_change=-1, reason='안 쉬세요?? 취소')
-            add_point_log(loser.id, betting_change=-3, reason='안 쉬세요?? 취소')
-
-        if winner.is_she_or_he_freshman == FreshmanEnum.YES and winner.match_count == 15:
-            if winner.gender == GenderEnum.MALE or winner.gender == GenderEnum.FEMALE:
-                winner.rank = 8
-        if loser.is_she_or_he_freshman == FreshmanEnum.YES and loser.match_count == 15:
-            if loser.gender == GenderEnum.MALE or loser.gender == GenderEnum.FEMALE:
-                loser.rank = 8
-    else:
-        today_partner = TodayPartner.query.filter(
-            (
-                (TodayPartner.p1_id == match.winner) & (TodayPartner.p2_id == match.loser)
-            ) | (
-                (TodayPartner.p1_id == match.loser) & (TodayPartner.p2_id == match.winner)
-            ),
-            TodayPartner.submitted == True
-        ).order_by(TodayPartner.id.desc()).first()
+    player_ids = list({entry.player_id for entry in journal})
+    pair_decrements = {}
+    for entry in journal:
+        pair = (entry.player_id, entry.opponent_id)
+        pair_decrements[pair] = pair_decrements.get(pair, 0) + entry.match_count
+        for reason, achieve_change, betting_change in entry.points:
+            add_point_log(entry.player_id, achieve_change=-achieve_change, betting_change=-betting_change,
+                          reason=cancel_reason(reason))
+
+    def journal_sum(field):
+        return select(func.coalesce(func.sum(getattr(MatchJournal, field)), 0)).where(
+            MatchJournal.match_id.in_(match_ids), MatchJournal.player_id == Player.id
+        ).scalar_subquery()
+
+    Player.query.filter(Player.id.in_(player_ids)).update(
+        {getattr(Player, field): getattr(Player, field) - journal_sum(field) for field in JOURNAL_FIELDS},
+        synchronize_session='fetch'
+    )
 
-        if today_partner:
-            today_partner.submitted = False
+    # 승인으로 바뀐 부수는 그 뒤 관리자가 바꾸지 않은 경우에만 되돌립니다.
+    for entry in journal:
+        if entry.rank_before is not None:
+            Player.query.filter(Player.id == entry.player_id, Player.rank == entry.rank_after).update(
+                {'rank': entry.rank_before}, synchronize_session='fetch'
+            )
 
-    db.session.delete(match)
-    return 'approved' if was_approved else 'pending'
+    opponent_table = PlayerOpponent.__table__
+    db.session.execute(
+        update(opponent_table).where(
+            opponent_table.c.player_id == bindparam('pair_player_id'),
+            opponent_table.c.opponent_id == bindparam('pair_opponent_id')
+        ).values(match_count=opponent_table.c.match_count - bindparam('decrement')),
+        [
+            {'pair_player_id': player_id, 'pair_opponent_id': opponent_id, 'decrement': decrement}
+            for (player_id, opponent_id), decrement in pair_decrements.items()
+        ]
+    )
+    PlayerOpponent.query.filter(
+        PlayerOpponent.player_id.in_(player_ids), PlayerOpponent.match_count <= 0
+    ).delete(synchronize_session=False)
+
+    opponent_count = select(func.count()).select_from(PlayerOpponent).where(
+        PlayerOpponent.player_id == Player.id
+    ).scalar_subquery()
+    Player.query.filter(Player.id.in_(player_ids)).update(
+        {Player.opponent_count: opponent_count}, synchronize_session='fetch'
+    )
+
+    db.session.execute(update(Player), [
+        {'id': player_id, 'rate_count': round((win_count / match_count) * 100, 2) if match_count > 0 else 0}
+        for player_id, win_count, match_count in db.session.query(
+            Player.id, Player.win_count, Player.match_count
+        ).filter(Player.id.in_(player_ids)).all()
+    ])
+
+
+def _estimate_unjournaled_matches(match_ids, journaled_ids):
+    """저널 없이 승인된 경기(저널 도입 이전 승인분)의 변화량을 기존 삭제 규칙으로 추정해 저널 행으로 넣습니다.
+
+    최근 경기부터 선수의 현재 값에서 거꾸로 되돌려 가며 추정하며, 경기 기록 전체를 재생하지 않습니다.
+    넣은 행은 경기와 함께 지워집니다. (저널 전체 채우기는 rebuild-stats 가 맡습니다)
+    """
+    matches = Match.query.filter(Match.id.in_(match_ids)).order_by(Match.timestamp.desc(), Match.id.desc()).all()
+    player_ids = {m.winner for m in matches} | {m.loser for m in matches}
+    states = {
+        row.id: dict(row._mapping)
+        for row in db.session.query(*_APPROVAL_READ_COLUMNS).filter(
+            Player.id.in_(player_ids)
+        ).order_by(Player.id).with_for_update().all()
+    }
+    state_ids = list(states)
+    pair_counts = {
+        (player_id, opponent_id): match_count
+        for player_id, opponent_id, match_count in db.session.query(
+            PlayerOpponent.player_id, PlayerOpponent.opponent_id, PlayerOpponent.match_count
+        ).filter(PlayerOpponent.player_id.in_(state_ids)).all()
+    }
+
+    # 함께 지우는 (저널이 있는) 경기의 몫을 먼저 빼서 그 경기들이 없는 상태에서 추정합니다.
+    for entry in MatchJournal.query.filter(MatchJournal.match_id.in_(journaled_ids), MatchJournal.player_id.in_(state_ids)):
+        state = states[entry.player_id]
+        for field in JOURNAL_FIELDS:
+            state[field] -= getattr(entry, field)
+        pair = (entry.player_id, entry.opponent_id)
+        before = pair_counts.get(pair, 0)
+        pair_counts[pair] = before - entry.match_count
+        if before > 0 >= pair_counts[pair]:
+            state['opponent_count'] -= 1
+
+    partner_pairs = {
+        frozenset((p1_id, p2_id))
+        for p1_id, p2_id in db.session.query(TodayPartner.p1_id, TodayPartner.p2_id).filter(
+            TodayPartner.submitted == True,
+            TodayPartner.p1_id.in_(state_ids),
+            TodayPartner.p2_id.in_(state_ids)
+        ).all()
+    }
+
+    journal_rows = []
+    for match in matches:
+        winner = states.get(match.winner)
+        loser = states.get(match.loser)
+        if not winner or not loser:
+            continue
+        entries = estimate_match_journal(
+            winner, loser, pair_counts, match.timestamp,
+            is_partner_match=frozenset((match.winner, match.loser)) in partner_pairs
+        )
+        journal_rows.extend({'match_id': match.id, **entry} for entry in entries)
+    if journal_rows:
+        db.session.execute(insert(MatchJournal), journal_rows)
+
+
+def _unsubmit_today_partners(pending_matches):
+    """미승인 경기마다 같은 두 선수의 가장 최근 '제출됨' 오늘의 상대를 되돌립니다."""
+    player_ids = list({m.winner for m in pending_matches} | {m.loser for m in pending_matches})
+    submitted = {}
+    for partner_id, p1_id, p2_id in db.session.query(TodayPartner.id, TodayPartner.p1_id, TodayPartner.p2_id).filter(
+        TodayPartner.submitted == True,
+        TodayPartner.p1_id.in_(player_ids),
+        TodayPartner.p2_id.in_(player_ids)
+    ).order_by(TodayPartner.id.desc()).all():
+        submitted.setdefault(frozenset((p1_id, p2_id)), []).append(partner_id)
+
+    partner_ids = []
+    for match in pending_matches:
+        candidates = submitted.get(frozenset((match.winner, match.loser)))
+        if candidates:
+            partner_ids.append(candidates.pop(0))
+
+    if partner_ids:
+        TodayPartner.query.filter(TodayPartner.id.in_(partner_ids)).update(
+            {'submitted': False}, synchronize_session='evaluate'
+        )
 
 
 @match_bp.route('/approve_matches', methods=['POST'])
@@ -579,15 +524,44 @@ def approve_matches():
     if not ids:
         return jsonify({'error': '승인할 경기가 선택되지 않았습니다.'}), 400
 
-    matches = Match.query.filter(Match.id.in_(ids), Match.approved == False).all()
+    if wants_async():
+        job = enqueue_job('approve_matches', {'ids': ids})
+        return jsonify({'success': True, 'job_id': job.id, 'status_url': url_for('admin.job_status', job_id=job.id)}), 202
 
-    for match in matches:
-        _approve_single_match(match)
+    # 동기 요청은 한 트랜잭션에서 모두 승인해, 중간에 실패하면 전부 되돌립니다.
+    result = _approve_matches_job({'ids': ids}, no_progress, chunk_size=None)
+    return jsonify({'success': True, 'message': result['message'], 'claimed': result['claimed']})
 
-    db.session.commit()
-    update_player_orders_by_match()
-    update_player_orders_by_point()
-    return jsonify({'success': True, 'message': f'{len(matches)}개의 경기가 승인되었습니다.'})
+
+# 백그라운드 승인 시 한 트랜잭션에서 처리할 경기 수
+APPROVAL_CHUNK_SIZE = 200
+
+
+@job_handler('approve_matches')
+def _approve_matches_job(params, report_progress, chunk_size=APPROVAL_CHUNK_SIZE):
+    """선택한 경기들을 시간순으로 나누어 승인하고, 묶음마다 커밋하며 진행률을 보고합니다.
+
+    묶음마다 claim_pending_rows 로 경기를 잡으므로 여러 요청/워커가 동시에 돌아도 같은 경기를 두 번 승인하지 않습니다.
+    chunk_size 가 None 이면 나누지 않고 한 트랜잭션에서 승인합니다.
+    """
+    pending_ids = [
+        match_id for match_id, in db.session.query(Match.id).filter(
+            Match.id.in_(params.get('ids', [])), Match.approved == False
+        ).order_by(Match.timestamp, Match.id).all()
+    ]
+
+    approved_count = claimed_count = 0
+    step = chunk_size or max(len(pending_ids), 1)
+    for start in range(0, len(pending_ids), step):
+        chunk_ids = pending_ids[start:start + step]
+        matches = claim_pending_rows(Match, chunk_ids, Match.approved)
+        claimed_count += len(matches)
+        approved_count += _approve_matches_bulk(matches)
+        db.session.commit()
+        report_progress((start + len(chunk_ids)) * 100 // len(pending_ids), f'{approved_count}개 승인')
+
+    mark_player_orders_dirty('match', 'point')
+    return {'approved': approved_count, 'claimed': claimed_count, 'message': f'{approved_count}개의 경기가 승인되었습니다.'}
 
 
 @match_bp.route('/approve_selected_matches', methods=['POST'])
@@ -602,15 +576,13 @@ def approve_selected_matches():
         flash(_('승인할 경기를 선택해주세요.'), 'warning')
         return redirect(url_for('admin.approval'))
 
-    matches = Match.query.filter(Match.id.in_(ids), Match.approved == False).all()
-    for match in matches:
-        _approve_single_match(match)
+    matches = claim_pending_rows(Match, ids, Match.approved)
+    approved_count = _approve_matches_bulk(matches)
 
     db.session.commit()
-    update_player_orders_by_match()
-    update_player_orders_by_point()
+    mark_player_orders_dirty('match', 'point')
 
-    flash(f'{len(matches)}개의 경기가 승인되었습니다.', 'success')
+    flash(f'{approved_count}개의 경기가 승인되었습니다.', 'success')
     return redirect(url_for('admin.approval'))
 
 
@@ -621,7 +593,8 @@ def approve_match(match_id):
         flash(_('권한이 없습니다.'), 'error')
         return redirect(url_for('admin.approval'))
 
-    match = Match.query.filter_by(id=match_id, approved=False).first()
+    claimed = claim_pending_rows(Match, [match_id], Match.approved)
+    match = claimed[0] if claimed else None
     if match:
          _approve_single_match(match)
          db.session.commit()
@@ -629,8 +602,7 @@ def approve_match(match_id):
     else:
          flash('해당 경기를 찾을 수 없거나 이미 승인되었습니다.', 'error')
 
-    update_player_orders_by_match()
-    update_player_orders_by_point()
+    mark_player_orders_dirty('match', 'point')
     return redirect(url_for('admin.approval'))
 
 
@@ -641,21 +613,11 @@ def delete_matches():
         return jsonify({'error': '삭제할 경기가 선택되지 않았습니다.'}), 400
 
     matches_to_delete = Match.query.filter(Match.id.in_(ids)).all()
-
-    approved_matches_count = 0
-    pending_matches_count = 0
-
-    for match in matches_to_delete:
-        result = _delete_single_match(match)
-        if result == 'approved':
-            approved_matches_count += 1
-        elif result == 'pending':
-            pending_matches_count += 1
+    approved_matches_count, pending_matches_count = _delete_matches_bulk(matches_to_delete)
 
     db.session.commit()
 
-    update_player_orders_by_match()
-    update_player_orders_by_point()
+    mark_player_orders_dirty('match', 'point')
 
     return jsonify({'success': True, 'message': f'{approved_matches_count}개의 승인된 경기와 {pending_matches_count}개의 미승인된 경기가 삭제되었습니다.'})
 
@@ -671,8 +633,7 @@ def delete_match_by_admin(match_id):
     if match:
          _delete_single_match(match)
          db.session.commit()
-         update_player_orders_by_match()
-         update_player_orders_by_point()
+         mark_player_orders_dirty('match', 'point')
          flash('경기가 삭제되었습니다.', 'success')
     else:
          flash('해당 경기를 찾을 수 없습니다.', 'error')
@@ -747,7 +708,7 @@ def revert_log():
             player.rank = rank_map[player.name]['rank']
             player.rank_change = rank_map[player.name]['rank_change']
 
-        db.session.commit()
+        refresh_leaderboards()
 
         table_rows = [
             f"""
@@ -96,11 +96,23 @@ function approveMatches() {
         alert('승인할 경기를 선택하세요.');
         return;
     }
+    submitApproval(selectedIds);
+}
+
+// 승인은 백그라운드 작업으로 실행하고 완료될 때까지 기다립니다.
+function submitApproval(ids) {
     fetch('/approve_matches', {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify({ ids: selectedIds })
-    }).then(() => location.reload());
+        body: JSON.stringify({ ids: ids, async: true })
+    })
+    .then(response => response.json())
+    .then(data => {
+        if (!data.job_id) return;
+        return waitForJob(data.job_id).then(job => alert(job.result.message));
+    })
+    .catch(error => alert(`승인 중 오류가 발생했습니다: ${error.message}`))
+    .finally(() => location.reload());
 }
 
 function deleteMatches() {
@@ -127,11 +139,7 @@ function approveAllMatches() {
                 return;
             }
              if (confirm(`승인 대기 중인 ${data.ids.length}개의 모든 경기를 승인하시겠습니까?`)) {
-                fetch('/approve_matches', {
-                    method: 'POST',
-                    headers: { 'Content-Type': 'application/json' },
-                    body: JSON.stringify({ ids: data.ids })
-                }).then(() => location.reload());
+                submitApproval(data.ids);
             }
         });
 }
@@ -1,6 +1,6 @@
 // static/js/betting_approval.js
 
-let currentOffset = 0;
+let lastCursor = null;  // 마지막으로 받은 베팅의 (approved, id)
 const limit = 30;
 let currentTab = 'all';
 
@@ -12,12 +12,17 @@ function selectTab(tabElement, tabName) {
     document.querySelectorAll('.tab').forEach(tab => tab.classList.remove('active'));
     tabElement.classList.add('active');
     currentTab = tabName;
-    currentOffset = 0;
+    lastCursor = null;
     loadBettings(false);
 }
 
 function loadBettings(append = false) {
-    fetch(`/get_bettings?offset=${currentOffset}&limit=${limit}&tab=${currentTab}`)
+    const params = new URLSearchParams({ limit: limit, tab: currentTab });
+    if (append && lastCursor) {
+        params.set('after_approved', lastCursor.approved);
+        params.set('after_id', lastCursor.id);
+    }
+    fetch(`/get_bettings?${params}`)
         .then(response => response.json())
         .then(data => {
             const tableBody = document.getElementById('betting-table-body');
@@ -27,20 +32,24 @@ function loadBettings(append = false) {
             data.forEach(betting => {
                 const row = document.createElement('tr');
                 const approvedText = betting.approved ? '✔️' : '❌';
+                const match = betting.match || { winner_name: '-', score: '-', loser_name: '-' };  // 결과 경기가 없는 베팅
                 // ▼▼▼ 모든 td 태그에 whitespace-nowrap 클래스를 추가했습니다. ▼▼▼
                 row.innerHTML = `
                     <td class="whitespace-nowrap"><input type="checkbox" class="betting-checkbox" value="${betting.id}"></td>
                     <td class="whitespace-nowrap">${approvedText}</td>
-                    <td class="whitespace-nowrap">${betting.match.winner_name}</td>
-                    <td class="whitespace-nowrap">${betting.match.score}</td>
-                    <td class="whitespace-nowrap">${betting.match.loser_name}</td>
+                    <td class="whitespace-nowrap">${match.winner_name}</td>
+                    <td class="whitespace-nowrap">${match.score}</td>
+                    <td class="whitespace-nowrap">${match.loser_name}</td>
                     <td class="whitespace-nowrap">${betting.win_participants.join(', ') || '없음'}</td>
                     <td class="whitespace-nowrap">${betting.lose_participants.join(', ') || '없음'}</td>
                     <td class="whitespace-nowrap">${betting.point}</td>
                 `;
                 tableBody.appendChild(row);
             });
-            currentOffset += data.length;
+            if (data.length > 0) {
+                const last = data[data.length - 1];
+                lastCursor = { approved: last.approved, id: last.id };
+            }
         });
 }
 
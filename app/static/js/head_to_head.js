@@ -0,0 +1,30 @@
+// static/js/head_to_head.js
+
+// 베팅 상세 화면의 상대 전적 경기를 한 페이지씩 더 불러옵니다.
+function loadMoreHeadToHead(button) {
+    const tableBody = document.getElementById('head-to-head-body');
+    const rows = tableBody.querySelectorAll('tr[data-match-id]');
+    const lastId = rows.length ? rows[rows.length - 1].dataset.matchId : '';
+    const { url, p1Id, p2Id, winLabel, loseLabel } = button.dataset;
+
+    button.disabled = true;
+    fetch(`${url}?before_id=${lastId}`)
+        .then(response => response.json())
+        .then(data => {
+            const mark = (winnerId, playerId) => winnerId === parseInt(playerId)
+                ? `<span class="font-bold text-green-600">${winLabel}</span>` : loseLabel;
+            data.matches.forEach(match => {
+                const row = document.createElement('tr');
+                row.dataset.matchId = match.id;
+                row.innerHTML = `
+                    <td class="text-left">${mark(match.winner_id, p1Id)}</td>
+                    <td class="text-center">${match.score}</td>
+                    <td class="text-right">${mark(match.winner_id, p2Id)}</td>
+                `;
+                tableBody.appendChild(row);
+            });
+            button.disabled = false;
+            if (!data.has_more) button.remove();
+        })
+        .catch(() => { button.disabled = false; });
+}
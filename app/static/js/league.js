@@ -1,7 +1,9 @@
 function createLeague() {
-    const playerNames = prompt("선수 5명을 입력하세요.").trim().split(" ");
-    if (playerNames.length !== 5) {
-        alert("정확히 5명을 입력하세요.");
+    const input = prompt("참가 선수 이름을 공백으로 구분해 입력하세요.");
+    if (!input) return;
+    const playerNames = input.trim().split(/\s+/);
+    if (playerNames.length < 2) {
+        alert("2명 이상 입력하세요.");
         return;
     }
 
@@ -16,6 +16,11 @@ document.addEventListener('input', function (event) {
     }
 });
 
+// 점수 입력칸의 data-row 로 리그 인원을 구합니다.
+function leagueSize(inputs) {
+    return Math.max(0, ...Array.from(inputs, input => parseInt(input.getAttribute('data-row'), 10) + 1));
+}
+
 function saveLeague(leagueId) {
     const inputs = document.querySelectorAll('.league-input');
     const scores = {};
@@ -29,8 +34,9 @@ function saveLeague(leagueId) {
         scores[key] = value === '' ? null : parseInt(value, 10);
     });
 
-    for (let i = 0; i < 4; i++) {
-        for (let j = 0; j < 4 - i; j++) {
+    const size = leagueSize(inputs);
+    for (let i = 0; i < size - 1; i++) {
+        for (let j = 0; j < size - 1 - i; j++) {
             const key1 = `p${i + 1}p${i + j + 2}`;
             const key2 = `p${i + j + 2}p${i + 1}`;
 
@@ -140,8 +146,9 @@ async function submitLeague(leagueId) {
     });
 
     const matches = [];
-    for (let i = 0; i < 4; i++) {
-        for (let j = 0; j < 4 - i; j++) {
+    const size = leagueSize(inputs);
+    for (let i = 0; i < size - 1; i++) {
+        for (let j = 0; j < size - 1 - i; j++) {
             const key1 = `p${i + 1}p${i + j + 2}`;
             const key2 = `p${i + j + 2}p${i + 1}`;
             let value1 = scores[key1];
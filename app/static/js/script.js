@@ -12,6 +12,26 @@ function confirmNavigation() {
     }
 }
 
+// 백그라운드 작업이 끝날 때까지 상태를 조회합니다. (onProgress(job)로 진행률 전달)
+function waitForJob(jobId, onProgress, intervalMs = 1000) {
+    return new Promise((resolve, reject) => {
+        const poll = () => {
+            fetch(`/admin/jobs/${jobId}`)
+                .then(response => response.json())
+                .then(data => {
+                    if (!data.success) return reject(new Error(data.error));
+                    const job = data.job;
+                    if (onProgress) onProgress(job);
+                    if (job.status === 'done') return resolve(job);
+                    if (job.status === 'failed') return reject(new Error(job.error));
+                    setTimeout(poll, intervalMs);
+                })
+                .catch(reject);
+        };
+        poll();
+    });
+}
+
 // --- DOMContentLoaded: 페이지 로드가 완료된 후 실행 ---
 
 document.addEventListener('DOMContentLoaded', function() {
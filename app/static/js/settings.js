@@ -95,17 +95,20 @@ document.addEventListener('DOMContentLoaded', () => {
             fetch('/admin/delete_players', {
                 method: 'POST',
                 headers: { 'Content-Type': 'application/json' },
-                body: JSON.stringify({ player_ids: selectedIds })
+                body: JSON.stringify({ player_ids: selectedIds, async: true })
             })
             .then(response => response.json())
             .then(data => {
-                alert(data.message);
-                if (data.success && data.redirect_url) {
-                    window.location.href = data.redirect_url;
-                } else if (data.success) {
-                    window.location.reload();
+                if (!data.success) {
+                    alert(data.error);
+                    return;
                 }
-            });
+                return waitForJob(data.job_id).then(job => {
+                    alert(job.result.message);
+                    window.location.reload();
+                });
+            })
+            .catch(error => alert(`삭제 중 오류가 발생했습니다: ${error.message}`));
         }
     });
 
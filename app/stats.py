@@ -0,0 +1,374 @@
+from sqlalchemy import func, insert, select, update
+from .extensions import db
+from .models import Match, MatchJournal, Player, PlayerOpponent, PlayerPointLog, PointLedger, GenderEnum, FreshmanEnum
+from .utils import LEDGER_OPENING_REASON, POINT_CURRENCIES, add_ledger_movement, rebuild_head_to_head
+
+# 신규 선수의 기본 베팅 포인트 (Player.betting_count 기본값)
+INITIAL_BETTING_COUNT = 100
+
+# 경기 승인 시 지급되는 업적 보상: (달성 기준, 베팅 포인트, 업적 포인트, 사유)
+MATCH_COUNT_MILESTONES = (
+    (30, 10, 5, '30경기 달성!'),
+    (50, 20, 10, '50경기 달성!'),
+    (70, 40, 20, '70경기 달성!'),
+    (100, 60, 30, '100경기 달성!'),
+)
+WIN_COUNT_MILESTONES = (
+    (20, 20, 10, '누적 20승 달성!'),
+    (35, 40, 20, '누적 35승 달성!'),
+    (50, 60, 30, '누적 50승 달성!'),
+)
+LOSS_COUNT_MILESTONES = (
+    (20, 10, 10, '누적 20패 달성!'),
+    (35, 20, 20, '누적 35패 달성!'),
+    (50, 30, 30, '누적 50패 달성!'),
+)
+OPPONENT_COUNT_MILESTONES = (
+    (10, 10, 5, '누적 상대 수 10명 달성!'),
+    (25, 40, 20, '누적 상대 수 25명 달성!'),
+    (40, 60, 30, '누적 상대 수 40명 달성!'),
+)
+MATCH_SUBMIT_REASON = '경기 결과 제출'
+PARTNER_REASON = '오늘의 상대 경기 결과 제출!'
+SUNDAY_REASON = '안 쉬세요??'
+
+# 경기 삭제 시 되돌리는 포인트 로그의 사유 (기존 로그와 같은 문구를 유지합니다)
+CANCEL_REASONS = {
+    MATCH_SUBMIT_REASON: '경기 결과 제출 취소',
+    PARTNER_REASON: '오늘의 상대 제출 취소',
+    SUNDAY_REASON: '안 쉬세요?? 취소',
+    **{reason: f'누적 {count}경기 달성 취소' for count, _, _, reason in MATCH_COUNT_MILESTONES},
+    **{reason: f'누적 {count}승 달성 취소' for count, _, _, reason in WIN_COUNT_MILESTONES},
+    **{reason: f'누적 {count}패 달성 취소' for count, _, _, reason in LOSS_COUNT_MILESTONES},
+    **{reason: f'누적 상대 {count}명 달성 취소' for count, _, _, reason in OPPONENT_COUNT_MILESTONES},
+}
+
+# 통계 재계산으로 바뀐 포인트 잔액의 원장 보정 사유
+LEDGER_REBUILD_REASON = '통계 재계산 보정'
+
+# 경기 기록만으로 다시 계산할 수 있는 포인트 로그 사유 (승인 + 취소).
+# 오늘의 상대 보너스는 배정 이력이 남지 않으므로 여기에 포함하지 않고 로그 값을 그대로 사용합니다.
+REPLAYABLE_REASONS = frozenset(
+    [MATCH_SUBMIT_REASON, SUNDAY_REASON, '경기 결과 제출 취소', '안 쉬세요?? 취소']
+    + [reason for milestones in (MATCH_COUNT_MILESTONES, WIN_COUNT_MILESTONES, LOSS_COUNT_MILESTONES, OPPONENT_COUNT_MILESTONES)
+       for _, _, _, reason in milestones]
+    + [f'누적 {count}경기 달성 취소' for count, _, _, _ in MATCH_COUNT_MILESTONES]
+    + [f'누적 {count}승 달성 취소' for count, _, _, _ in WIN_COUNT_MILESTONES]
+    + [f'누적 {count}패 달성 취소' for count, _, _, _ in LOSS_COUNT_MILESTONES]
+    + [f'누적 상대 {count}명 달성 취소' for count, _, _, _ in OPPONENT_COUNT_MILESTONES]
+    + [f'누적 상대수 {count}명 달성 취소' for count, _, _, _ in OPPONENT_COUNT_MILESTONES]
+)
+
+# 스탯 엔진이 다루는 Player 카운터 컬럼
+STAT_FIELDS = (
+    'match_count', 'win_count', 'loss_count', 'rate_count',
+    'opponent_count', 'achieve_count', 'betting_count',
+)
+# 경기 저널(MatchJournal)에 변화량으로 기록하는 카운터. rate/opponent 는 삭제 시 다시 계산합니다.
+JOURNAL_FIELDS = ('match_count', 'win_count', 'loss_count', 'achieve_count', 'betting_count')
+
+
+def apply_match_result(winner, loser, pair_counts, timestamp, is_partner_match=False, log=None):
+    """승인된 경기 한 건의 스탯/업적/보너스 규칙을 두 선수의 상태(dict)에 적용합니다.
+
+    winner/loser 는 'id' 와 STAT_FIELDS 를 담은 dict, pair_counts 는 (선수, 상대) -> 승인 경기 수이며
+    모두 제자리에서 갱신됩니다. log 가 주어지면 포인트 변동마다
+    log(player_id, achieve_change=..., betting_change=..., reason=...) 를 호출합니다.
+    """
+    def change(state, betting_change=0, achieve_change=0, reason=''):
+        state['betting_count'] += betting_change
+        state['achieve_count'] += achieve_change
+        if log:
+            log(state['id'], achieve_change=achieve_change, betting_change=betting_change, reason=reason)
+
+    def reward(state, betting, achieve, reason):
+        change(state, betting_change=betting, reason=reason)
+        change(state, achieve_change=achieve, reason=reason)
+
+    def record_result(state, opponent_id, is_winner):
+        state['match_count'] += 1
+        if is_winner:
+            state['win_count'] += 1
+        else:
+            state['loss_count'] += 1
+        state['rate_count'] = round((state['win_count'] / state['match_count']) * 100, 2)
+        previous_opponent = state['opponent_count']
+        pair = (state['id'], opponent_id)
+        if not pair_counts.get(pair):
+            state['opponent_count'] += 1
+        pair_counts[pair] = pair_counts.get(pair, 0) + 1
+        return previous_opponent
+
+    def apply_milestones(state, previous_opponent, is_winner):
+        for count, betting, achieve, reason in MATCH_COUNT_MILESTONES:
+            if state['match_count'] == count:
+                reward(state, betting, achieve, reason)
+        if is_winner:
+            for count, betting, achieve, reason in WIN_COUNT_MILESTONES:
+                if state['win_count'] == count:
+                    reward(state, betting, achieve, reason)
+        else:
+            for count, betting, achieve, reason in LOSS_COUNT_MILESTONES:
+                if state['loss_count'] == count:
+                    reward(state, betting, achieve, reason)
+        for count, betting, achieve, reason in OPPONENT_COUNT_MILESTONES:
+            if previous_opponent == count - 1 and state['opponent_count'] == count:
+                reward(state, betting, achieve, reason)
+
+    winner_previous_opponent = record_result(winner, loser['id'], is_winner=True)
+    change(winner, betting_change=1, reason=MATCH_SUBMIT_REASON)
+    loser_previous_opponent = record_result(loser, winner['id'], is_winner=False)
+    change(loser, betting_change=1, reason=MATCH_SUBMIT_REASON)
+
+    apply_milestones(winner, winner_previous_opponent, is_winner=True)
+    apply_milestones(loser, loser_previous_opponent, is_winner=False)
+
+    if is_partner_match:
+        reward(winner, 5, 1, PARTNER_REASON)
+        reward(loser, 5, 1, PARTNER_REASON)
+
+    if timestamp.weekday() == 6:
+        reward(winner, 3, 1, SUNDAY_REASON)
+        reward(loser, 3, 1, SUNDAY_REASON)
+
+
+def promote_freshman(state):
+    """16경기를 채운 신입 부원의 부수를 조정합니다."""
+    if state['is_she_or_he_freshman'] == FreshmanEnum.YES and state['match_count'] == 16:
+        if state['gender'] == GenderEnum.MALE:
+            state['rank'] = 5
+        elif state['gender'] == GenderEnum.FEMALE:
+            state['rank'] = 7
+
+
+def cancel_reason(reason):
+    """승인 시 기록한 포인트 사유에 대응하는 취소 사유를 반환합니다."""
+    return CANCEL_REASONS.get(reason, f'{reason} 취소')
+
+
+def record_match_result(winner, loser, pair_counts, timestamp, is_partner_match=False, log=None, promote=True):
+    """apply_match_result(와 신입 부수 조정)를 적용하고, 두 선수에게 실제로 적용된 변화량을 반환합니다.
+
+    반환값은 MatchJournal 행으로 그대로 저장할 수 있는 dict 두 개(승자, 패자)의 리스트입니다.
+    """
+    before = {state['id']: dict(state) for state in (winner, loser)}
+    points = {winner['id']: [], loser['id']: []}
+
+    def journal_log(player_id, achieve_change=0, betting_change=0, reason=''):
+        entries = points[player_id]
+        if entries and entries[-1][0] == reason:
+            entries[-1][1] += achieve_change
+            entries[-1][2] += betting_change
+        else:
+            entries.append([reason, achieve_change, betting_change])
+        if log:
+            log(player_id, achieve_change=achieve_change, betting_change=betting_change, reason=reason)
+
+    apply_match_result(winner, loser, pair_counts, timestamp, is_partner_match=is_partner_match, log=journal_log)
+    if promote:
+        promote_freshman(winner)
+        promote_freshman(loser)
+
+    entries = []
+    for state, opponent in ((winner, loser), (loser, winner)):
+        previous = before[state['id']]
+        rank_changed = state.get('rank') != previous.get('rank')
+        entries.append({
+            'player_id': state['id'],
+            'opponent_id': opponent['id'],
+            **{field: state[field] - previous[field] for field in JOURNAL_FIELDS},
+            'rank_before': previous.get('rank') if rank_changed else None,
+            'rank_after': state.get('rank') if rank_changed else None,
+            'points': points[state['id']],
+        })
+    return entries
+
+
+def _replay_approved_matches(states, journal_match_ids=None):
+    """승인된 경기를 시간순으로 states 에 적용합니다.
+
+    (선수, 상대) 쌍별 경기 수와, journal_match_ids 에 속한 경기의 저널 행 목록을 반환합니다.
+    """
+    pair_counts = {}
+    journal_rows = []
+    approved_matches = db.session.query(Match.id, Match.winner, Match.loser, Match.timestamp).filter(
+        Match.approved == True
+    ).order_by(Match.timestamp, Match.id).yield_per(1000)
+    for match_id, winner_id, loser_id, timestamp in approved_matches:
+        winner = states.get(winner_id)
+        loser = states.get(loser_id)
+        if not winner or not loser:
+            continue
+        entries = record_match_result(winner, loser, pair_counts, timestamp, promote=False)
+        if journal_match_ids is not None and match_id in journal_match_ids:
+            journal_rows.extend({'match_id': match_id, **entry} for entry in entries)
+    return pair_counts, journal_rows
+
+
+def _opening_balances():
+    """선수별로 포인트 로그로 설명되지 않는 시작 잔액을 원장의 기초 포인트에서 구합니다.
+
+    원장 도입 전부터 있던 선수의 기초 포인트는 도입 시점의 잔액이라 그때까지의 로그가 이미 들어 있으므로,
+    기초 포인트 시점까지의 로그 합계를 빼서 로그 이전의 수동 변경분만 남깁니다.
+    """
+    opened = select(PointLedger.player_id, func.max(PointLedger.timestamp).label('opened_at')).where(
+        PointLedger.reason == LEDGER_OPENING_REASON, PointLedger.player_id.isnot(None)
+    ).group_by(PointLedger.player_id).subquery('opened')
+
+    balances = {}
+    for player_id, currency, amount in db.session.query(
+        PointLedger.player_id, PointLedger.currency, func.sum(PointLedger.amount)
+    ).join(opened, (opened.c.player_id == PointLedger.player_id) & (opened.c.opened_at == PointLedger.timestamp)).filter(
+        PointLedger.reason == LEDGER_OPENING_REASON
+    ).group_by(PointLedger.player_id, PointLedger.currency):
+        balances.setdefault(player_id, dict.fromkeys(POINT_CURRENCIES, 0))[currency] = amount
+
+    for player_id, achieve_sum, betting_sum in db.session.query(
+        PlayerPointLog.player_id,
+        func.coalesce(func.sum(PlayerPointLog.achieve_change), 0),
+        func.coalesce(func.sum(PlayerPointLog.betting_change), 0)
+    ).join(opened, opened.c.player_id == PlayerPointLog.player_id).filter(
+        PlayerPointLog.timestamp <= opened.c.opened_at
+    ).group_by(PlayerPointLog.player_id):
+        if player_id in balances:
+            balances[player_id]['achieve'] -= achieve_sum
+            balances[player_id]['betting'] -= betting_sum
+    return balances
+
+
+def _initial_states(player_ids):
+    # 원장에 기초 포인트가 없는 선수(잔액 0 으로 이관된 경우 등)는 가입 기본값에서 시작합니다.
+    opening = _opening_balances()
+    default = {'achieve': 0, 'betting': INITIAL_BETTING_COUNT}
+    return {
+        player_id: {
+            'id': player_id, 'match_count': 0, 'win_count': 0, 'loss_count': 0, 'rate_count': 0,
+            'opponent_count': 0, 'achieve_count': opening.get(player_id, default)['achieve'],
+            'betting_count': opening.get(player_id, default)['betting'],
+        }
+        for player_id in player_ids
+    }
+
+
+def _unjournaled_match_ids():
+    journaled = db.session.query(MatchJournal.match_id).distinct()
+    return {
+        match_id for match_id, in db.session.query(Match.id).filter(
+            Match.approved == True, Match.id.notin_(journaled)
+        ).all()
+    }
+
+
+def estimate_match_journal(winner, loser, pair_counts, timestamp, is_partner_match=False):
+    """저널 없이 승인된 경기(저널 도입 이전 승인분)가 적용한 변화량을 기존 삭제 규칙으로 추정합니다.
+
+    winner/loser 는 이 경기가 반영된 현재 상태(dict), pair_counts 는 (선수, 상대) -> 승인 경기 수이며
+    경기를 되돌린 값으로 제자리에서 갱신됩니다. 업적은 되돌린 뒤 값이 기준 바로 아래로 내려가면 취소하고,
+    오늘의 상대 보너스는 베팅 포인트 5만, 신입 부수는 15경기로 내려가면 8부로 되돌립니다.
+    반환값은 record_match_result 와 같은 형식의 저널 행 dict 두 개(승자, 패자)입니다.
+    """
+    def reverse(state, opponent, is_winner):
+        points = [[MATCH_SUBMIT_REASON, 0, 1]]
+        state['match_count'] -= 1
+        state['win_count' if is_winner else 'loss_count'] -= 1
+        previous_opponent = state['opponent_count']
+        pair = (state['id'], opponent['id'])
+        pair_counts[pair] = pair_counts.get(pair, 0) - 1
+        if pair_counts[pair] <= 0:
+            state['opponent_count'] -= 1
+
+        milestones = [(MATCH_COUNT_MILESTONES, 'match_count')]
+        milestones.append((WIN_COUNT_MILESTONES, 'win_count') if is_winner else (LOSS_COUNT_MILESTONES, 'loss_count'))
+        for table, field in milestones:
+            points += [[reason, achieve, betting] for count, betting, achieve, reason in table if state[field] == count - 1]
+        points += [
+            [reason, achieve, betting] for count, betting, achieve, reason in OPPONENT_COUNT_MILESTONES
+            if previous_opponent == count and state['opponent_count'] == count - 1
+        ]
+        if is_partner_match:
+            points.append([PARTNER_REASON, 0, 5])
+        if timestamp.weekday() == 6:
+            points.append([SUNDAY_REASON, 1, 3])
+
+        achieve_change = sum(achieve for _, achieve, _ in points)
+        betting_change = sum(betting for _, _, betting in points)
+        state['achieve_count'] -= achieve_change
+        state['betting_count'] -= betting_change
+
+        rank_before = None
+        if (state.get('is_she_or_he_freshman') == FreshmanEnum.YES and state['match_count'] == 15
+                and state.get('gender') in (GenderEnum.MALE, GenderEnum.FEMALE) and state.get('rank') != 8):
+            rank_before = 8
+        rank_after = state.get('rank') if rank_before is not None else None
+        if rank_before is not None:
+            state['rank'] = rank_before
+        return {
+            'player_id': state['id'], 'opponent_id': opponent['id'], 'match_count': 1,
+            'win_count': 1 if is_winner else 0, 'loss_count': 0 if is_winner else 1,
+            'achieve_count': achieve_change, 'betting_count': betting_change,
+            'rank_before': rank_before, 'rank_after': rank_after, 'points': points,
+        }
+
+    return [reverse(winner, loser, is_winner=True), reverse(loser, winner, is_winner=False)]
+
+
+def rebuild_player_stats(dry_run=False):
+    """승인된 경기 기록을 시간순으로 한 번 훑어 모든 선수의 카운터와 상대 인덱스, 상대 전적을 다시 계산합니다.
+
+    포인트는 원장의 기초 잔액에서 시작해, 경기에서 나오지 않는 포인트(베팅, 수동 조정, 오늘의 상대 등)의
+    포인트 로그 합계를 그대로 더하고,
+    저널이 없는 승인 경기의 저널도 함께 채웁니다.
+    변경이 필요한 선수 목록을 반환하며, dry_run 이면 DB 에 쓰지 않습니다.
+    """
+    current = {
+        row.id: dict(row._mapping)
+        for row in db.session.query(Player.id, Player.name, *[getattr(Player, field) for field in STAT_FIELDS]).all()
+    }
+    states = _initial_states(current)
+
+    external_points = db.session.query(
+        PlayerPointLog.player_id,
+        func.coalesce(func.sum(PlayerPointLog.achieve_change), 0),
+        func.coalesce(func.sum(PlayerPointLog.betting_change), 0)
+    ).filter(PlayerPointLog.reason.notin_(REPLAYABLE_REASONS)).group_by(PlayerPointLog.player_id)
+    for player_id, achieve_sum, betting_sum in external_points:
+        if player_id in states:
+            states[player_id]['achieve_count'] += achieve_sum
+            states[player_id]['betting_count'] += betting_sum
+
+    missing_journal_ids = None if dry_run else _unjournaled_match_ids()
+    pair_counts, journal_rows = _replay_approved_matches(states, journal_match_ids=missing_journal_ids)
+
+    differences = []
+    for player_id, state in states.items():
+        changes = {
+            field: (current[player_id][field], state[field])
+            for field in STAT_FIELDS if current[player_id][field] != state[field]
+        }
+        if changes:
+            differences.append({'id': player_id, 'name': current[player_id]['name'], 'changes': changes})
+
+    if dry_run:
+        return differences
+
+    if differences:
+        db.session.execute(update(Player), [
+            {'id': diff['id'], **{field: states[diff['id']][field] for field in STAT_FIELDS}}
+            for diff in differences
+        ])
+        # 포인트 잔액을 바꾼 만큼 원장에도 보정 이동을 남깁니다.
+        for diff in differences:
+            add_ledger_movement(diff['id'], reason=LEDGER_REBUILD_REASON, **{
+                f"{field.removesuffix('_count')}_change": new - (old or 0) for field, (old, new) in diff['changes'].items()
+                if field in ('achieve_count', 'betting_count')
+            })
+    PlayerOpponent.query.delete(synchronize_session=False)
+    if pair_counts:
+        db.session.execute(insert(PlayerOpponent), [
+            {'player_id': player_id, 'opponent_id': opponent_id, 'match_count': count}
+            for (player_id, opponent_id), count in pair_counts.items()
+        ])
+    if journal_rows:
+        db.session.execute(insert(MatchJournal), journal_rows)
+    rebuild_head_to_head()
+    return differences
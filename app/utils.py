@@ -1,37 +1,390 @@
-from sqlalchemy import distinct, case, func
-from .extensions import db
-from .models import Match, Player, PlayerPointLog, User
+import csv
+import io
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from flask import current_app, g, has_request_context, request, session as flask_session
+from sqlalchemy import and_, bindparam, case, event, func, insert, inspect, or_, select, update
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import aliased, load_only, object_session
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.orm.util import identity_key
+from . import bracket as bracket_engine
+from .extensions import READ_BIND_KEY, db
+from .models import (
+    Betting, BettingParticipant, CacheVersion, HeadToHead, Leaderboard, League, LeagueMember, LeagueResult, Match, Player, PlayerOpponent, PlayerPointLog, PointLedger,
+    TodayPartner, TournamentMatch, User, get_seoul_time
+)
+
+
+def load_players(player_ids, *options):
+    """선수 id 목록을 IN 쿼리 한 번으로 읽어 {id: Player} 로 반환합니다.
+
+    None 과 중복 id 는 무시하며, 없는 id 는 결과에 빠집니다. options 는 query.options() 에 그대로 넘깁니다.
+    """
+    ids = {player_id for player_id in player_ids if player_id is not None}
+    if not ids:
+        return {}
+    query = Player.query.filter(Player.id.in_(ids))
+    if options:
+        query = query.options(*options)
+    return {player.id: player for player in query.all()}
+
+
+# 선수 이름 -> (id, 유효 여부) 프로세스 캐시. 이름/유효 상태 변경, 삭제 시 버전 키를 올려 모든 프로세스에서 비웁니다.
+PLAYER_NAMES_KEY = 'player_names'
+_player_name_cache = {'version': None, 'players': OrderedDict()}
+_player_name_cache_lock = threading.Lock()
+
+
+def invalidate_player_names(session=None):
+    """선수 이름 캐시를 무효화합니다. 버전은 현재 트랜잭션이 커밋될 때 함께 올라갑니다."""
+    (session or db.session).info.setdefault(_CACHE_INVALIDATION_KEY, set()).add(PLAYER_NAMES_KEY)
+
+
+def resolve_player_ids(names, valid_only=False):
+    """선수 이름 목록을 {이름: 선수 id} 로 반환합니다. 없는 이름(valid_only 면 무효 선수도)은 결과에 빠집니다.
+
+    캐시 버전 확인 한 번과, 캐시에 없는 이름만 IN 쿼리 한 번으로 읽습니다.
+    """
+    names = {name for name in names if name}
+    if not names:
+        return {}
+
+    version = db.session.query(CacheVersion.version).filter_by(key=PLAYER_NAMES_KEY).scalar() or 0
+    with _player_name_cache_lock:
+        cached = _player_name_cache['players']
+        if _player_name_cache['version'] != version:
+            cached.clear()
+            _player_name_cache['version'] = version
+        found = {name: cached[name] for name in names if name in cached}
+
+    missing = names - found.keys()
+    if missing:
+        rows = db.session.query(Player.name, Player.id, Player.is_valid).filter(Player.name.in_(missing)).all()
+        loaded = {name: (player_id, bool(is_valid)) for name, player_id, is_valid in rows}
+        found.update(loaded)
+        with _player_name_cache_lock:
+            if _player_name_cache['version'] == version:
+                cached.update(loaded)
+                while len(cached) > current_app.config.get('PLAYER_NAME_CACHE_SIZE', 2000):
+                    cached.popitem(last=False)
+
+    return {name: player_id for name, (player_id, is_valid) in found.items() if is_valid or not valid_only}
+
+
+@event.listens_for(db.session, 'before_flush')
+def _invalidate_player_names_on_change(session, flush_context, instances):
+    # 선수 이름/유효 상태가 바뀌거나 선수가 삭제되면 이름 캐시를 무효화합니다. (벌크 DELETE 는 호출하는 쪽에서 표시)
+    for player in session.deleted:
+        if isinstance(player, Player):
+            return invalidate_player_names(session)
+    for player in session.dirty:
+        if isinstance(player, Player):
+            state = inspect(player)
+            if state.attrs.name.history.has_changes() or state.attrs.is_valid.history.has_changes():
+                return invalidate_player_names(session)
+
+
+def get_league_standings(league_id):
+    """저장된 리그 순위표를 순위 순서대로 반환합니다. (승/패가 같으면 같은 순위)"""
+    rows = db.session.query(
+        LeagueMember.player_id, Player.name, LeagueMember.position, LeagueMember.rank,
+        LeagueMember.wins, LeagueMember.losses, LeagueMember.score_diff
+    ).join(Player, Player.id == LeagueMember.player_id).filter(
+        LeagueMember.league_id == league_id
+    ).order_by(LeagueMember.rank, LeagueMember.position).all()
+
+    return [{
+        'player_id': row.player_id, 'name': row.name, 'position': row.position, 'rank': row.rank,
+        'wins': row.wins, 'losses': row.losses, 'score_diff': row.score_diff,
+        'win_rate': (row.wins / (row.wins + row.losses)) * 100 if row.wins + row.losses > 0 else 0.0
+    } for row in rows]
+
+
+def apply_league_result(league_id, winner_id, loser_id, winner_score=None, loser_score=None, sign=1):
+    """리그 결과 한 건을 순위표에 더하거나(sign=1) 뺍니다(sign=-1). 호출 후 rerank_league 로 순위를 맞춥니다."""
+    diff = sign * ((winner_score or 0) - (loser_score or 0))
+    member = LeagueMember.__table__
+    for player_id, values in (
+        (winner_id, {'wins': member.c.wins + sign, 'score_diff': member.c.score_diff + diff}),
+        (loser_id, {'losses': member.c.losses + sign, 'score_diff': member.c.score_diff - diff}),
+    ):
+        db.session.execute(update(member).where(
+            member.c.league_id == league_id, member.c.player_id == player_id
+        ).values(values))
+    league = League.__table__
+    db.session.execute(update(league).where(league.c.id == league_id).values(result_count=league.c.result_count + sign))
+
+
+def rerank_league(league_id):
+    """리그 참가자의 순위를 승수 내림차순, 패수 오름차순(= 승률 내림차순) RANK() 로 다시 매깁니다."""
+    member = LeagueMember.__table__
+    ranked = select(
+        member.c.player_id,
+        func.rank().over(order_by=(member.c.wins.desc(), member.c.losses)).label('rank')
+    ).where(member.c.league_id == league_id).subquery('ranked')
+
+    if _supports_update_from(db.session):
+        stmt = update(member).where(
+            member.c.league_id == league_id, member.c.player_id == ranked.c.player_id
+        ).values(rank=ranked.c.rank)
+    else:
+        stmt = update(member).where(member.c.league_id == league_id).values(
+            rank=select(ranked.c.rank).where(ranked.c.player_id == member.c.player_id).scalar_subquery()
+        )
+    db.session.execute(stmt)
+
+
+def rebuild_league_standings(league_id):
+    """결과 행 전체로 리그 순위표를 처음부터 다시 계산합니다. (증분 값이 어긋났을 때 복구용)"""
+    member = LeagueMember.__table__
+    result = LeagueResult.__table__
+    in_league = result.c.league_id == member.c.league_id
+
+    def count(condition):
+        return select(func.count()).select_from(result).where(in_league, condition).scalar_subquery()
+
+    def total(expr, condition):
+        return select(func.coalesce(func.sum(expr), 0)).where(in_league, condition).scalar_subquery()
+
+    won = result.c.winner_id == member.c.player_id
+    lost = result.c.loser_id == member.c.player_id
+    set_diff = func.coalesce(result.c.winner_score, 0) - func.coalesce(result.c.loser_score, 0)
+    db.session.execute(update(member).where(member.c.league_id == league_id).values(
+        wins=count(won), losses=count(lost), score_diff=total(set_diff, won) - total(set_diff, lost)
+    ))
+    league = League.__table__
+    db.session.execute(update(league).where(league.c.id == league_id).values(
+        member_count=select(func.count()).select_from(member).where(member.c.league_id == league_id).scalar_subquery(),
+        result_count=select(func.count()).select_from(result).where(result.c.league_id == league_id).scalar_subquery()
+    ))
+    rerank_league(league_id)
+
+
+def load_tournament_bracket(tournament):
+    """토너먼트 대진표(요약 + 경기 노드 행)를 엔진 형식으로 읽습니다.
+
+    옛 형식({'rounds': [...]})이면 선수 이름을 한 번에 조회해 변환합니다. 저장은 save_tournament_bracket 에서 합니다.
+    """
+    data = tournament.bracket_data or {}
+    if bracket_engine.is_legacy(data):
+        return bracket_engine.from_legacy(data, resolve_player_ids(bracket_engine.legacy_names(data)))
+
+    nodes = dict(db.session.query(TournamentMatch.node_id, TournamentMatch.node).filter_by(tournament_id=tournament.id).all())
+    return dict(data, nodes=nodes)
+
+
+def save_tournament_bracket(tournament, bracket, changed=None):
+    """대진표를 저장합니다. changed(바뀐 노드 id)가 주어지면 그 경기 행만 UPDATE 합니다.
+
+    새 대진표나 옛 형식에서 변환한 대진표는 노드 전체를 INSERT 합니다. tournament 는 flush 되어 id 가 있어야 합니다.
+    """
+    if changed is None or bracket_engine.is_legacy(tournament.bracket_data):
+        db.session.execute(insert(TournamentMatch), [
+            {'tournament_id': tournament.id, 'node_id': node_id, 'node': node} for node_id, node in bracket['nodes'].items()
+        ])
+    elif changed:
+        db.session.execute(update(TournamentMatch), [
+            {'tournament_id': tournament.id, 'node_id': node_id, 'node': bracket['nodes'][node_id]} for node_id in changed
+        ])
+
+    header = bracket_engine.header(bracket)
+    if tournament.bracket_data != header:
+        tournament.bracket_data = header
+
+
+def head_to_head_key(p1_id, p2_id):
+    """두 선수 쌍의 HeadToHead 기본키 (작은 id, 큰 id)."""
+    return (p1_id, p2_id) if p1_id < p2_id else (p2_id, p1_id)
+
+
+def _pair_filter(p1_id, p2_id):
+    return ((Match.winner == p1_id) & (Match.loser == p2_id)) | ((Match.winner == p2_id) & (Match.loser == p1_id))
+
+
+def get_head_to_head(p1_id, p2_id):
+    """p1 기준 상대 전적을 기본키 조회 한 번으로 읽습니다.
+
+    {'p1_wins', 'p2_wins', 'last_match_id', 'last_match_at'} 을 반환하며, 승인된 경기가 없으면 0 / None 입니다.
+    """
+    row = db.session.get(HeadToHead, head_to_head_key(p1_id, p2_id))
+    if row is None:
+        return {'p1_wins': 0, 'p2_wins': 0, 'last_match_id': None, 'last_match_at': None}
+    p1_wins, p2_wins = (row.low_wins, row.high_wins) if p1_id < p2_id else (row.high_wins, row.low_wins)
+    return {'p1_wins': p1_wins, 'p2_wins': p2_wins, 'last_match_id': row.last_match_id, 'last_match_at': row.last_match_at}
+
+
+def head_to_head_matches(p1_id, p2_id, limit=5, before_id=None):
+    """두 선수의 승인된 경기를 최신순으로 limit 개 읽습니다. before_id 를 주면 그 경기 다음(더 오래된 경기)부터 읽습니다."""
+    query = Match.query.filter(_pair_filter(p1_id, p2_id), Match.approved == True)
+    if before_id is not None:
+        before = select(Match.timestamp).where(Match.id == before_id).scalar_subquery()
+        query = query.filter(or_(Match.timestamp < before, and_(Match.timestamp == before, Match.id < before_id)))
+    return query.order_by(Match.timestamp.desc(), Match.id.desc()).limit(limit).all()
+
+
+def _head_to_head_tallies(matches, sign):
+    tallies = {}
+    for match in sorted(matches, key=lambda m: (m.timestamp, m.id)):
+        key = head_to_head_key(match.winner, match.loser)
+        tally = tallies.setdefault(key, {'low': key[0], 'high': key[1], 'low_inc': 0, 'high_inc': 0})
+        tally['low_inc' if match.winner == key[0] else 'high_inc'] += sign
+        tally['match_id'], tally['at'] = match.id, match.timestamp
+    return tallies
+
+
+def record_head_to_head(matches):
+    """새로 승인된 경기들을 상대 전적에 더합니다. 쌍별로 합산해 한 번의 UPSERT(또는 INSERT / UPDATE)로 저장합니다."""
+    tallies = _head_to_head_tallies(matches, 1)
+    if not tallies:
+        return
+    table = HeadToHead.__table__
+    rows = {
+        key: {'player_low_id': t['low'], 'player_high_id': t['high'], 'low_wins': t['low_inc'], 'high_wins': t['high_inc'],
+              'last_match_id': t['match_id'], 'last_match_at': t['at']}
+        for key, t in tallies.items()
+    }
+
+    dialect_insert = _upsert_insert(db.session)
+    if dialect_insert is not None:
+        stmt = dialect_insert(table).values([rows[key] for key in sorted(rows)])
+        excluded = stmt.excluded
+        # 동시에 같은 쌍의 첫 경기가 승인돼도 충돌 없이 승수를 더하고, 마지막 경기는 더 최근 경기로 둡니다.
+        newer = or_(
+            table.c.last_match_at.is_(None), table.c.last_match_at < excluded.last_match_at,
+            and_(table.c.last_match_at == excluded.last_match_at, table.c.last_match_id < excluded.last_match_id)
+        )
+        db.session.execute(stmt.on_conflict_do_update(
+            index_elements=[table.c.player_low_id, table.c.player_high_id],
+            set_={
+                'low_wins': table.c.low_wins + excluded.low_wins,
+                'high_wins': table.c.high_wins + excluded.high_wins,
+                'last_match_id': case((newer, excluded.last_match_id), else_=table.c.last_match_id),
+                'last_match_at': case((newer, excluded.last_match_at), else_=table.c.last_match_at),
+            }
+        ))
+        return
+
+    ids = {player_id for key in tallies for player_id in key}
+    existing = {
+        (low, high) for low, high in db.session.query(HeadToHead.player_low_id, HeadToHead.player_high_id).filter(
+            HeadToHead.player_low_id.in_(ids), HeadToHead.player_high_id.in_(ids)
+        ).all()
+    }
+
+    new_rows = [row for key, row in rows.items() if key not in existing]
+    if new_rows:
+        db.session.execute(insert(table), new_rows)
+
+    updated_rows = [tally for key, tally in tallies.items() if key in existing]
+    if updated_rows:
+        at = bindparam('at', type_=table.c.last_match_at.type)
+        # 이미 더 최근 경기가 기록돼 있으면(늦게 승인된 옛 경기) 마지막 경기는 그대로 둡니다.
+        newer = or_(
+            table.c.last_match_at.is_(None), table.c.last_match_at < at,
+            and_(table.c.last_match_at == at, table.c.last_match_id < bindparam('match_id'))
+        )
+        db.session.execute(
+            update(table).where(
+                table.c.player_low_id == bindparam('low'), table.c.player_high_id == bindparam('high')
+            ).values(
+                low_wins=table.c.low_wins + bindparam('low_inc'), high_wins=table.c.high_wins + bindparam('high_inc'),
+                last_match_id=case((newer, bindparam('match_id')), else_=table.c.last_match_id),
+                last_match_at=case((newer, at), else_=table.c.last_match_at),
+            ),
+            updated_rows
+        )
+
+
+def retract_head_to_head(matches):
+    """삭제되는 승인 경기들을 상대 전적에서 뺍니다. 마지막 경기가 삭제된 쌍만 그 직전 경기를 다시 찾습니다.
+
+    경기 행을 지우기 전에 호출해야 합니다. 승수가 0이 된 쌍은 행을 지웁니다.
+    """
+    tallies = _head_to_head_tallies(matches, -1)
+    if not tallies:
+        return
+    table = HeadToHead.__table__
+    pair_where = and_(table.c.player_low_id == bindparam('low'), table.c.player_high_id == bindparam('high'))
+    db.session.execute(
+        update(table).where(pair_where).values(
+            low_wins=table.c.low_wins + bindparam('low_inc'), high_wins=table.c.high_wins + bindparam('high_inc')
+        ),
+        list(tallies.values())
+    )
+
+    match_ids = [match.id for match in matches]
+    stale = db.session.query(HeadToHead.player_low_id, HeadToHead.player_high_id).filter(
+        HeadToHead.last_match_id.in_(match_ids)
+    ).all()
+    if stale:
+        latest = []
+        for low, high in stale:
+            previous = db.session.query(Match.id, Match.timestamp).filter(
+                _pair_filter(low, high), Match.approved == True, Match.id.notin_(match_ids)
+            ).order_by(Match.timestamp.desc(), Match.id.desc()).first()
+            latest.append({'low': low, 'high': high, 'match_id': previous[0] if previous else None,
+                           'at': previous[1] if previous else None})
+        db.session.execute(
+            update(table).where(pair_where).values(
+                last_match_id=bindparam('match_id'), last_match_at=bindparam('at', type_=table.c.last_match_at.type)
+            ),
+            latest
+        )
+
+    ids = {player_id for key in tallies for player_id in key}
+    HeadToHead.query.filter(
+        HeadToHead.player_low_id.in_(ids), HeadToHead.player_high_id.in_(ids),
+        HeadToHead.low_wins + HeadToHead.high_wins <= 0
+    ).delete(synchronize_session=False)
+
+
+def delete_head_to_head(player_ids):
+    """선수 삭제 전에 그 선수가 들어간 상대 전적 행을 지웁니다."""
+    HeadToHead.query.filter(
+        HeadToHead.player_low_id.in_(player_ids) | HeadToHead.player_high_id.in_(player_ids)
+    ).delete(synchronize_session=False)
+
+
+def rebuild_head_to_head():
+    """승인된 경기 전체로 상대 전적을 INSERT ... SELECT 한 번에 다시 만듭니다."""
+    HeadToHead.query.delete(synchronize_session=False)
+    low = case((Match.winner < Match.loser, Match.winner), else_=Match.loser)
+    high = case((Match.winner < Match.loser, Match.loser), else_=Match.winner)
+    pairs = select(
+        low.label('low'), high.label('high'),
+        func.sum(case((Match.winner == low, 1), else_=0)).label('low_wins'),
+        func.sum(case((Match.winner == high, 1), else_=0)).label('high_wins'),
+        func.max(Match.timestamp).label('last_match_at'),
+    ).where(Match.approved == True).group_by(low, high).subquery()
+    last = aliased(Match)
+    last_match_id = select(last.id).where(
+        last.approved == True, last.timestamp == pairs.c.last_match_at,
+        ((last.winner == pairs.c.low) & (last.loser == pairs.c.high)) | ((last.winner == pairs.c.high) & (last.loser == pairs.c.low))
+    ).order_by(last.id.desc()).limit(1).scalar_subquery()
+    db.session.execute(insert(HeadToHead).from_select(
+        ['player_low_id', 'player_high_id', 'low_wins', 'high_wins', 'last_match_id', 'last_match_at'],
+        select(pairs.c.low, pairs.c.high, pairs.c.low_wins, pairs.c.high_wins, last_match_id, pairs.c.last_match_at)
+    ))
 
 
 def _get_summary_rankings_data(current_player):
     """ranking_page 전용: 카테고리별 상위 5명 + 현재 유저 정보를 반환합니다."""
     categories = [
-        ('승리', Player.win_order.asc(), 'win_count', 'win_order'),
-        ('승률', Player.rate_order.asc(), 'rate_count', 'rate_order'),
-        ('경기', Player.match_order.asc(), 'match_count', 'match_order'),
-        ('베팅', Player.betting_order.asc(), 'betting_count', 'betting_order'),
+        ('승리', 'win', 'win_count', 'win_order'),
+        ('승률', 'rate', 'rate_count', 'rate_order'),
+        ('경기', 'match', 'match_count', 'match_order'),
+        ('베팅', 'betting', 'betting_count', 'betting_order'),
     ]
     rankings_data = {}
 
-    for title, order_criteria, value_attr, rank_attr in categories:
-        top_5_players = Player.query.join(Player.user).filter(
-            Player.is_valid == True,
-            User.is_admin == False
-        ).order_by(order_criteria, Player.name).limit(5).all()
-
-        final_player_list = []
-        is_user_in_top_5 = False
-
-        for p in top_5_players:
-            final_player_list.append({
-                'id': p.id,
-                'name': p.name,
-                'rank': p.rank,
-                'value': getattr(p, value_attr),
-                'actual_rank': getattr(p, rank_attr)
-            })
-            if current_player and p.id == current_player.id:
-                is_user_in_top_5 = True
+    for title, category, value_attr, rank_attr in categories:
+        final_player_list = [dict(entry) for entry in get_leaderboard(category)[:5]]
+        is_user_in_top_5 = bool(current_player) and any(entry['id'] == current_player.id for entry in final_player_list)
 
         if current_player and not is_user_in_top_5:
             if len(final_player_list) >= 5:
@@ -50,88 +403,826 @@ def _get_summary_rankings_data(current_player):
     return rankings_data
 
 
+# 요청(세션) 단위로 모아 두었다가 커밋 직전에 한 번에 INSERT 합니다.
+_POINT_LOG_BUFFER_KEY = 'point_log_buffer'
+# 이 개수 이상이면 PostgreSQL에서는 COPY로 적재합니다.
+POINT_LOG_COPY_THRESHOLD = 500
+
+
+def _get_point_log_buffer(session):
+    return session.info.setdefault(_POINT_LOG_BUFFER_KEY, {'rows': [], 'last': None})
+
+
 def add_point_log(player_id, achieve_change=0, betting_change=0, reason=""):
-    """플레이어 포인트 변동 로그 기록"""
+    """플레이어 포인트 변동 로그를 버퍼에 기록합니다. (커밋 시 일괄 저장)
+
+    같은 보상에서 나온 업적 로그와 베팅 로그가 바로 이어서 들어오면(같은 선수/사유, 한쪽만 0) 한 행으로 합칩니다.
+    사이에 다른 로그가 끼었거나 이미 합친 행이면 새 행으로 남깁니다.
+    """
     if achieve_change == 0 and betting_change == 0:
         return
 
-    log = PlayerPointLog(
-        player_id=player_id,
-        achieve_change=achieve_change,
-        betting_change=betting_change,
-        reason=reason
-    )
-    db.session.add(log)
-
-
-def calculate_opponent_count(player_id):
-    """해당 선수의 고유 상대 수를 계산합니다."""
-    count = (
-        db.session.query(
-            func.count(distinct(
-                case(
-                    (Match.winner == player_id, Match.loser),
-                    (Match.loser == player_id, Match.winner)
-                )
-            ))
-        )
-        .filter(
-            ((Match.winner == player_id) | (Match.loser == player_id)) & (Match.approved == True)
+    buffer = _get_point_log_buffer(db.session)
+    last = buffer['last']
+    if last is not None and last['player_id'] == player_id and last['reason'] == reason:
+        if achieve_change == 0 and last['betting_change'] == 0:
+            last['betting_change'] = betting_change
+            buffer['last'] = None
+            return
+        if betting_change == 0 and last['achieve_change'] == 0:
+            last['achieve_change'] = achieve_change
+            buffer['last'] = None
+            return
+
+    row = {
+        'player_id': player_id,
+        'achieve_change': achieve_change,
+        'betting_change': betting_change,
+        'reason': reason,
+        'timestamp': get_seoul_time()
+    }
+    buffer['rows'].append(row)
+    buffer['last'] = row
+
+
+def flush_point_logs(session=None):
+    """버퍼에 쌓인 포인트 로그를 한 번의 INSERT(대량이면 PostgreSQL COPY)로 저장합니다."""
+    session = session or db.session
+    buffer = session.info.pop(_POINT_LOG_BUFFER_KEY, None)
+    if not buffer or not buffer['rows']:
+        return 0
+
+    rows = buffer['rows']
+    if len(rows) >= POINT_LOG_COPY_THRESHOLD and session.get_bind().dialect.name == 'postgresql':
+        _copy_point_logs(session, rows)
+    else:
+        session.execute(insert(PlayerPointLog), rows)
+    return len(rows)
+
+
+def _copy_point_logs(session, rows):
+    data = io.StringIO()
+    writer = csv.writer(data)
+    for row in rows:
+        writer.writerow([row['player_id'], row['achieve_change'], row['betting_change'],
+                         row['reason'], row['timestamp'].isoformat()])
+    data.seek(0)
+
+    cursor = session.connection().connection.cursor()
+    try:
+        cursor.copy_expert(
+            'COPY player_point_log (player_id, achieve_change, betting_change, reason, "timestamp") '
+            'FROM STDIN WITH (FORMAT csv)',
+            data
         )
-        .scalar()
+    finally:
+        cursor.close()
+
+
+# 선수별 포인트 증감량. 커밋 직전에 UPDATE player SET x = x + :d 로 한 번에 반영합니다.
+_POINT_DELTA_BUFFER_KEY = 'point_delta_buffer'
+
+
+def add_points(player_id, achieve_change=0, betting_change=0, reason=None):
+    """선수의 업적/베팅 포인트를 증감합니다. reason 이 주어지면 포인트 로그도 남깁니다.
+
+    값을 읽어 다시 쓰지 않고 증감량만 모아 두었다가 커밋 직전에 선수별로 한 번씩 원자적으로 더하므로
+    동시에 처리되는 요청끼리 서로의 변경을 덮어쓰지 않습니다. 세션에 올라온 Player 객체의 값도 함께 맞춥니다.
+    """
+    if achieve_change == 0 and betting_change == 0:
+        return
+
+    if reason is not None:
+        add_point_log(player_id, achieve_change=achieve_change, betting_change=betting_change, reason=reason)
+
+    deltas = db.session.info.setdefault(_POINT_DELTA_BUFFER_KEY, {})
+    delta = deltas.setdefault(player_id, [0, 0])
+    delta[0] += achieve_change
+    delta[1] += betting_change
+
+    player = db.session.identity_map.get(identity_key(Player, player_id))
+    if player is not None:
+        _shift_loaded_points(player, achieve_change, betting_change)
+
+
+def _shift_loaded_points(player, achieve_change, betting_change):
+    # 변경 이력 없이 값만 바꿔 ORM flush 가 절대값을 다시 쓰지 않게 합니다.
+    for field, change in (('achieve_count', achieve_change), ('betting_count', betting_change)):
+        if change and field in player.__dict__:
+            set_committed_value(player, field, (player.__dict__[field] or 0) + change)
+
+
+def flush_point_deltas(session=None):
+    """모아 둔 포인트 증감량을 한 번의 executemany UPDATE 로 반영합니다.
+
+    포인트가 바뀐 선수의 홈 화면 스냅샷도 함께 무효화합니다. (호출한 쪽에서 따로 표시하지 않아도 됩니다)
+    """
+    session = session or db.session
+    deltas = session.info.pop(_POINT_DELTA_BUFFER_KEY, None)
+    if not deltas:
+        return 0
+
+    player_table = Player.__table__
+    session.execute(
+        update(player_table).where(player_table.c.id == bindparam('delta_player_id')).values(
+            achieve_count=func.coalesce(player_table.c.achieve_count, 0) + bindparam('achieve_delta'),
+            betting_count=func.coalesce(player_table.c.betting_count, 0) + bindparam('betting_delta')
+        ),
+        [
+            {'delta_player_id': player_id, 'achieve_delta': achieve_delta, 'betting_delta': betting_delta}
+            for player_id, (achieve_delta, betting_delta) in deltas.items()
+        ]
     )
+    invalidate_dashboards(deltas, session=session)
+    return len(deltas)
 
-    return count
 
+# 원장 전용 이동(가입 시 기본 포인트, 통계 재계산 보정, 선수 삭제 등 포인트 로그에 남기지 않는 이동)
+_POINT_LEDGER_BUFFER_KEY = 'point_ledger_buffer'
+POINT_CURRENCIES = ('achieve', 'betting')
+LEDGER_SYSTEM_REASON = "시스템 계정"
+LEDGER_OPENING_REASON = "기초 포인트"
+LEDGER_CLOSING_REASON = "선수 삭제"
 
-def update_player_orders_by_match():
-    """승리/패배/경기 수 기반 순위를 재계산합니다."""
-    categories = [
-        ('win_order', Player.win_count.desc()),
-        ('loss_order', Player.loss_count.desc()),
-        ('match_order', Player.match_count.desc()),
-        ('rate_order', Player.rate_count.desc()),
-        ('opponent_order', Player.opponent_count.desc()),
-    ]
 
-    for order_field, primary_criteria in categories:
-        players = Player.query.filter(Player.is_valid == True).order_by(primary_criteria).all()
+def add_ledger_movement(player_id, achieve_change=0, betting_change=0, reason="", session=None):
+    """포인트 로그 없이 원장에만 남길 이동을 버퍼에 기록합니다. (선수 잔액은 바꾸지 않습니다)"""
+    legs = (session or db.session).info.setdefault(_POINT_LEDGER_BUFFER_KEY, [])
+    for currency, amount in (('achieve', achieve_change), ('betting', betting_change)):
+        if amount:
+            legs.append((player_id, currency, amount, reason))
 
-        current_rank = 0
-        previous_primary_value = None
-        primary_field_name = primary_criteria.element.name
 
-        for i, player in enumerate(players, start=1):
-            primary_value = getattr(player, primary_field_name)
-            if primary_value != previous_primary_value:
-                current_rank = i
-                previous_primary_value = primary_value
+def flush_point_ledger(session=None):
+    """이번 트랜잭션의 포인트 이동을 원장 항목 하나로 기록합니다. 기록한 선수 id 집합을 반환합니다.
 
-            setattr(player, order_field, current_rank)
+    포인트 로그 버퍼(아직 INSERT 전)와 원장 전용 이동을 선수 계정 행으로 옮기고,
+    통화별 합계를 상쇄하는 시스템 계정 행을 더해 항목의 합이 0이 되게 합니다.
+    """
+    session = session or db.session
+    legs = session.info.pop(_POINT_LEDGER_BUFFER_KEY, [])
+    log_buffer = session.info.get(_POINT_LOG_BUFFER_KEY)
+    for row in (log_buffer['rows'] if log_buffer else ()):
+        for currency in POINT_CURRENCIES:
+            if row[f'{currency}_change']:
+                legs.append((row['player_id'], currency, row[f'{currency}_change'], row['reason']))
+    if not legs:
+        return set()
 
-    db.session.commit()
+    entry_id, now = uuid.uuid4().hex, get_seoul_time()
+    totals = dict.fromkeys(POINT_CURRENCIES, 0)
+    rows = []
+    for player_id, currency, amount, reason in legs:
+        totals[currency] += amount
+        rows.append({'entry_id': entry_id, 'player_id': player_id, 'currency': currency,
+                     'amount': amount, 'reason': reason, 'timestamp': now})
+    rows += [{'entry_id': entry_id, 'player_id': None, 'currency': currency,
+              'amount': -total, 'reason': LEDGER_SYSTEM_REASON, 'timestamp': now}
+             for currency, total in totals.items() if total]
+    session.execute(insert(PointLedger), rows)
 
+    player_ids = {player_id for player_id, _, _, _ in legs}
+    if has_request_context():
+        g.setdefault('point_ledger_players', set()).update(player_ids)
+    return player_ids
 
-def update_player_orders_by_point():
-    """업적/베팅 포인트 기반 순위를 재계산합니다."""
-    categories = [
-        ('achieve_order', Player.achieve_count.desc()),
-        ('betting_order', Player.betting_count.desc()),
+
+def close_point_accounts(player_ids):
+    """삭제할 선수들의 원장 잔액을 0으로 닫습니다. (같은 id 가 다시 쓰여도 잔액이 이어지지 않게)"""
+    if not player_ids:
+        return
+    balances = db.session.query(PointLedger.player_id, PointLedger.currency, func.sum(PointLedger.amount)).filter(
+        PointLedger.player_id.in_(player_ids)
+    ).group_by(PointLedger.player_id, PointLedger.currency).all()
+    for player_id, currency, balance in balances:
+        if balance:
+            add_ledger_movement(player_id, reason=LEDGER_CLOSING_REASON, **{f'{currency}_change': -balance})
+
+
+def reconcile_point_balances(repair=False):
+    """선수 잔액(achieve_count/betting_count)을 원장 합계와 한 번의 집계 쿼리로 비교합니다.
+
+    (잔액이 다른 선수 목록, 합이 0이 아닌 원장 항목 목록) 을 반환합니다.
+    repair 이면 다른 선수의 잔액을 원장 합계로 맞춥니다. (커밋은 호출한 쪽에서)
+    """
+    sums = select(
+        PointLedger.player_id,
+        *[func.sum(case((PointLedger.currency == currency, PointLedger.amount), else_=0)).label(currency)
+          for currency in POINT_CURRENCIES]
+    ).where(PointLedger.player_id.isnot(None)).group_by(PointLedger.player_id).subquery('ledger_sums')
+    ledger_achieve, ledger_betting = func.coalesce(sums.c.achieve, 0), func.coalesce(sums.c.betting, 0)
+    drifted = db.session.query(
+        Player.id, Player.name, Player.achieve_count, Player.betting_count,
+        ledger_achieve.label('ledger_achieve'), ledger_betting.label('ledger_betting')
+    ).outerjoin(sums, sums.c.player_id == Player.id).filter(or_(
+        func.coalesce(Player.achieve_count, 0) != ledger_achieve,
+        func.coalesce(Player.betting_count, 0) != ledger_betting
+    )).order_by(Player.id).all()
+
+    unbalanced = db.session.query(
+        PointLedger.entry_id, PointLedger.currency, func.sum(PointLedger.amount)
+    ).group_by(PointLedger.entry_id, PointLedger.currency).having(func.sum(PointLedger.amount) != 0).all()
+
+    if repair and drifted:
+        db.session.execute(update(Player), [
+            {'id': row.id, 'achieve_count': row.ledger_achieve, 'betting_count': row.ledger_betting} for row in drifted
+        ])
+    return drifted, unbalanced
+
+
+@event.listens_for(Player, 'after_insert')
+def _open_point_account(mapper, connection, player):
+    # 새 선수의 기본 포인트(betting_count 기본값 등)를 원장에 기초 잔액으로 남깁니다.
+    add_ledger_movement(player.id, achieve_change=player.achieve_count or 0, betting_change=player.betting_count or 0,
+                        reason=LEDGER_OPENING_REASON, session=object_session(player))
+
+
+def _pending_points(player):
+    session = object_session(player)
+    return session.info.get(_POINT_DELTA_BUFFER_KEY, {}).get(player.id) if session is not None else None
+
+
+@event.listens_for(Player, 'load')
+def _apply_pending_points_on_load(player, context):
+    # 커밋 전에 DB 에서 새로 읽은 선수에도 아직 반영되지 않은 증감량을 더해 둡니다.
+    delta = _pending_points(player)
+    if delta:
+        _shift_loaded_points(player, *delta)
+
+
+@event.listens_for(Player, 'refresh')
+def _apply_pending_points_on_refresh(player, context, attrs):
+    delta = _pending_points(player)
+    if delta and (attrs is None or {'achieve_count', 'betting_count'} & set(attrs)):
+        _shift_loaded_points(player, *delta)
+
+
+@event.listens_for(db.session, 'before_commit')
+def _flush_point_logs_before_commit(session):
+    # 남은 변경을 먼저 flush 해서 flush 중에 표시되는 캐시 무효화도 이번 커밋에 함께 반영합니다.
+    session.flush()
+    flush_point_deltas(session)
+    flush_point_ledger(session)
+    flush_point_logs(session)
+    flush_cache_invalidations(session)
+
+
+@event.listens_for(db.session, 'after_soft_rollback')
+def _discard_point_logs_after_rollback(session, previous_transaction):
+    session.info.pop(_POINT_LOG_BUFFER_KEY, None)
+    session.info.pop(_POINT_DELTA_BUFFER_KEY, None)
+    session.info.pop(_POINT_LEDGER_BUFFER_KEY, None)
+    session.info.pop(_CACHE_INVALIDATION_KEY, None)
+
+
+def _supports_skip_locked(session):
+    return session.get_bind().dialect.name in ('postgresql', 'mysql', 'mariadb', 'oracle')
+
+
+def _upsert_insert(session):
+    """INSERT ... ON CONFLICT DO UPDATE 를 지원하는 DB 면 그 방언의 insert 를, 아니면 None 을 반환합니다."""
+    return {'postgresql': postgresql_insert, 'sqlite': sqlite_insert}.get(session.get_bind().dialect.name)
+
+
+def add_opponent_counts(increments):
+    """{(player_id, opponent_id): 증가량} 만큼 상대 인덱스(PlayerOpponent)의 경기 수를 더합니다.
+
+    없는 쌍은 새로 만듭니다. 읽은 값 대신 증가량을 더하므로 동시에 승인/삭제된 경기의 변화도 잃지 않습니다.
+    """
+    rows = [
+        {'player_id': player_id, 'opponent_id': opponent_id, 'match_count': count}
+        for (player_id, opponent_id), count in sorted(increments.items()) if count
+    ]
+    if not rows:
+        return
+    table = PlayerOpponent.__table__
+    dialect_insert = _upsert_insert(db.session)
+    if dialect_insert is not None:
+        stmt = dialect_insert(table).values(rows)
+        db.session.execute(stmt.on_conflict_do_update(
+            index_elements=[table.c.player_id, table.c.opponent_id],
+            set_={'match_count': table.c.match_count + stmt.excluded.match_count}
+        ))
+        return
+
+    pairs = {(row['player_id'], row['opponent_id']) for row in rows}
+    ids = {player_id for pair in pairs for player_id in pair}
+    existing = {
+        (player_id, opponent_id) for player_id, opponent_id in db.session.query(
+            PlayerOpponent.player_id, PlayerOpponent.opponent_id
+        ).filter(PlayerOpponent.player_id.in_(ids), PlayerOpponent.opponent_id.in_(ids))
+    }
+    new_rows = [row for row in rows if (row['player_id'], row['opponent_id']) not in existing]
+    if new_rows:
+        db.session.execute(insert(table), new_rows)
+    updated_rows = [
+        {'pid': row['player_id'], 'oid': row['opponent_id'], 'inc': row['match_count']}
+        for row in rows if (row['player_id'], row['opponent_id']) in existing
     ]
+    if updated_rows:
+        db.session.execute(
+            update(table).where(
+                table.c.player_id == bindparam('pid'), table.c.opponent_id == bindparam('oid')
+            ).values(match_count=table.c.match_count + bindparam('inc')),
+            updated_rows
+        )
+
+
+def claim_pending_rows(model, ids, flag_column, order_by=None):
+    """ids 중 아직 처리되지 않은(flag_column 이 False 인) 행을 현재 트랜잭션이 독점하도록 잡아 반환합니다.
+
+    행 잠금을 지원하는 DB 에서는 SELECT ... FOR UPDATE SKIP LOCKED 로 다른 승인 요청이 잡은 행을 건너뛰므로
+    여러 요청/워커가 같은 대기열을 나눠 처리할 수 있습니다. 잡은 행은 커밋/롤백 시 풀립니다.
+    """
+    query = model.query.filter(model.id.in_(ids), flag_column == False)
+    if order_by is not None:
+        query = query.order_by(*order_by)
+
+    if _supports_skip_locked(db.session):
+        return query.with_for_update(skip_locked=True).all()
+
+    # 행 잠금이 없는 SQLite 는 대상 행에 값이 그대로인 UPDATE 를 먼저 실행해 DB 쓰기 잠금을 잡습니다.
+    # 동시에 들어온 다른 승인 요청은 이 트랜잭션이 끝날 때까지 기다렸다가 갱신된 상태를 읽습니다.
+    model.query.filter(model.id.in_(ids), flag_column == False).update(
+        {flag_column: flag_column}, synchronize_session=False
+    )
+    return query.all()
+
+
+def adjust_betting_pool(betting, removed=(), added=()):
+    """참가자 행이 바뀐 만큼 베팅 현황 요약값을 UPDATE 한 번으로 증감합니다.
+
+    removed / added 는 빠지거나 새로 들어온 참가자 행의 winner_id 목록입니다. 예측을 바꾼 경우는
+    이전 값을 removed 로, 새 값을 added 로 넘깁니다. 증감은 DB 에서 계산하므로 동시 요청에도 어긋나지 않습니다.
+    """
+    def picks(winner_ids, player_id):
+        return sum(1 for winner_id in winner_ids if winner_id is not None and winner_id == player_id)
+
+    deltas = {
+        Betting.participant_count: len(added) - len(removed),
+        Betting.p1_bettors: picks(added, betting.p1_id) - picks(removed, betting.p1_id),
+        Betting.p2_bettors: picks(added, betting.p2_id) - picks(removed, betting.p2_id),
+    }
+    changes = {column: column + delta for column, delta in deltas.items() if delta}
+    if changes:
+        Betting.query.filter(Betting.id == betting.id).update(changes, synchronize_session='evaluate')
+
+
+def refresh_betting_pools(betting_ids):
+    """참가자 행을 다시 세어 베팅 현황 요약값을 맞춥니다. (선수 삭제처럼 여러 베팅의 참가자가 한꺼번에 바뀔 때)"""
+    if not betting_ids:
+        return
+
+    def count(*criteria):
+        return select(func.count()).select_from(BettingParticipant).where(
+            BettingParticipant.betting_id == Betting.id, *criteria
+        ).scalar_subquery()
+
+    Betting.query.filter(Betting.id.in_(betting_ids)).update({
+        Betting.participant_count: count(),
+        Betting.p1_bettors: count(BettingParticipant.winner_id == Betting.p1_id),
+        Betting.p2_bettors: count(BettingParticipant.winner_id == Betting.p2_id),
+    }, synchronize_session='fetch')
+
+
+# 금요일(베팅 데이)에 베팅에 처음 참여한 선수에게 하루 한 번 주는 보너스
+BETTING_DAY_REASON = "베팅 데이"
+BETTING_DAY_BONUS = 10
+
+
+def _load_betting_settlements(bettings):
+    """베팅들의 경기, 참가자, 관련 선수를 베팅 수와 상관없이 쿼리 세 번으로 읽습니다."""
+    match_ids = {betting.result for betting in bettings if betting.result is not None}
+    matches = {match.id: match for match in Match.query.options(load_only(Match.id, Match.winner, Match.loser))
+               .filter(Match.id.in_(match_ids)).all()} if match_ids else {}
+
+    participants = {betting.id: [] for betting in bettings}
+    if participants:
+        for participant in BettingParticipant.query.filter(
+            BettingParticipant.betting_id.in_(participants.keys())
+        ).order_by(BettingParticipant.id).all():
+            participants[participant.betting_id].append(participant)
+
+    player_ids = {match.winner for match in matches.values()} | {match.loser for match in matches.values()}
+    player_ids.update(participant.participant_id for rows in participants.values() for participant in rows)
+    return matches, participants, load_players(player_ids, load_only(Player.id, Player.name))
+
+
+def settle_bettings(bettings, today=None):
+    """승인할 베팅들을 한 번에 정산합니다. 정산한 베팅 수를 반환합니다.
+
+    경기/참가자/선수와 오늘의 베팅 데이 보너스 지급 여부를 먼저 한꺼번에 읽고, 판돈과 배당은 메모리에서 계산해
+    add_points 로 모읍니다. (포인트 UPDATE 와 로그 INSERT 는 커밋 직전에 한 번에 실행됩니다)
+    경기나 선수가 없는 베팅은 건너뜁니다.
+    """
+    today = today or get_seoul_time().date()
+    matches, participants_by_betting, players = _load_betting_settlements(bettings)
+
+    # 포인트 로그는 커밋 시점에 저장되므로, 이번 정산에서 지급한 베팅 데이 보너스는 따로 기억합니다.
+    betting_day_rewarded = set()
+    if today.weekday() == 4 and players:
+        betting_day_rewarded.update(player_id for player_id, in db.session.query(PlayerPointLog.player_id).filter(
+            PlayerPointLog.player_id.in_(players.keys()), PlayerPointLog.reason == BETTING_DAY_REASON,
+            func.date(PlayerPointLog.timestamp) == today
+        ).distinct())
+
+    settled = 0
+    for betting in bettings:
+        match = matches.get(betting.result)
+        if not match: continue
+        winner_player, loser_player = players.get(match.winner), players.get(match.loser)
+        if not winner_player or not loser_player: continue
+        betting_reason = f"{winner_player.name} vs {loser_player.name} 베팅"
+        add_points(winner_player.id, betting_change=-1 * betting.point, reason=f"{betting_reason} 주최")
+        add_points(loser_player.id, betting_change=-1 * betting.point, reason=f"{betting_reason} 주최")
+        participants = participants_by_betting[betting.id]
+        for p in participants:
+            if p.participant_id in players: add_points(p.participant_id, betting_change=-1 * betting.point, reason=f"{betting_reason} 참여")
+        correct_bettors = [p for p in participants if p.winner_id == match.winner]
+        total_pot = betting.point * (2 + len(participants))
+        share = total_pot // (1 + len(correct_bettors))
+        for p in correct_bettors:
+            if p.participant_id in players: add_points(p.participant_id, betting_change=share, reason=f"{betting_reason} 성공")
+        add_points(winner_player.id, betting_change=share, reason=f"{betting_reason} 경기 승리")
+        betting.approved = True
+        settled += 1
+        if today.weekday() == 4:
+            for player_id in [winner_player.id, loser_player.id] + [p.participant_id for p in participants]:
+                if player_id not in players or player_id in betting_day_rewarded: continue
+                add_points(player_id, betting_change=BETTING_DAY_BONUS, reason=BETTING_DAY_REASON)
+                betting_day_rewarded.add(player_id)
+    return settled
+
+
+def refund_bettings(bettings):
+    """승인된 베팅들의 정산을 되돌립니다. (배당 회수 후 참가비 환불) 되돌린 베팅 수를 반환합니다."""
+    matches, participants_by_betting, players = _load_betting_settlements(bettings)
+    refunded = 0
+    for betting in bettings:
+        match = matches.get(betting.result)
+        if not match or match.winner not in players or match.loser not in players: continue
+        participants = participants_by_betting[betting.id]
+        correct_bettors = [p for p in participants if p.winner_id == match.winner]
+        share = betting.point * (2 + len(participants)) // (1 + len(correct_bettors))
+        add_points(match.winner, betting_change=-share, reason=f"베팅({betting.id}) 삭제 (상금 회수)")
+        for p in correct_bettors:
+            if p.participant_id in players: add_points(p.participant_id, betting_change=-share, reason=f"베팅({betting.id}) 삭제 (상금 회수)")
+        add_points(match.winner, betting_change=betting.point, reason=f"베팅({betting.id}) 삭제 (참가비 환불)")
+        add_points(match.loser, betting_change=betting.point, reason=f"베팅({betting.id}) 삭제 (참가비 환불)")
+        for p in participants:
+            if p.participant_id in players: add_points(p.participant_id, betting_change=betting.point, reason=f"베팅({betting.id}) 삭제 (참가비 환불)")
+        refunded += 1
+    return refunded
+
+
+# (순위 컬럼, 기준 컬럼) - 기준 컬럼 내림차순의 공동 순위(1, 1, 3 ...)
+MATCH_ORDER_CATEGORIES = (
+    ('win_order', 'win_count'),
+    ('loss_order', 'loss_count'),
+    ('match_order', 'match_count'),
+    ('rate_order', 'rate_count'),
+    ('opponent_order', 'opponent_count'),
+)
+POINT_ORDER_CATEGORIES = (
+    ('achieve_order', 'achieve_count'),
+    ('betting_order', 'betting_count'),
+)
+
+
+def _supports_update_from(session):
+    dialect = session.get_bind().dialect
+    if dialect.name == 'sqlite':
+        return sqlite3.sqlite_version_info >= (3, 33, 0)
+    return dialect.name in ('postgresql', 'mysql', 'mariadb')
+
+
+def update_player_orders(categories=MATCH_ORDER_CATEGORIES + POINT_ORDER_CATEGORIES, touched_ids=None):
+    """유효한 선수들의 순위 컬럼을 RANK() 윈도 함수로 한 번의 UPDATE 문에서 재계산합니다. (순위가 바뀐 행만 씁니다)
+
+    touched_ids(이번에 값이 바뀐 선수)가 주어지고 순위가 하나도 바뀌지 않았으며 그 선수들이 해당 리더보드에 없으면
+    리더보드 재생성(과 그에 따른 홈 화면 스냅샷 무효화)을 건너뜁니다.
+    """
+    player = Player.__table__
+    ranked = select(
+        player.c.id,
+        *[func.rank().over(order_by=player.c[value_field].desc()).label(order_field)
+          for order_field, value_field in categories]
+    ).where(player.c.is_valid == True).subquery('ranked')
+
+    if _supports_update_from(db.session):
+        stmt = update(player).where(player.c.id == ranked.c.id, or_(*[
+            player.c[order_field].is_distinct_from(ranked.c[order_field]) for order_field, _ in categories
+        ])).values({order_field: ranked.c[order_field] for order_field, _ in categories})
+    else:
+        # UPDATE ... FROM 을 지원하지 않는 구버전 SQLite용 상관 서브쿼리 경로
+        new_orders = {
+            order_field: select(ranked.c[order_field]).where(ranked.c.id == player.c.id).scalar_subquery()
+            for order_field, _ in categories
+        }
+        stmt = update(player).where(player.c.is_valid == True, or_(*[
+            player.c[order_field].is_distinct_from(new_order) for order_field, new_order in new_orders.items()
+        ])).values(new_orders)
+
+    changed_rows = db.session.execute(stmt).rowcount
+    if touched_ids and changed_rows == 0 and not _on_leaderboards(touched_ids, categories):
+        db.session.commit()
+        return
+    refresh_leaderboards()
+
+
+# 리더보드 카테고리: (순위 컬럼, 기준 컬럼). 순위 컬럼 오름차순 + 이름순으로 상위 LEADERBOARD_SIZE 명을 담습니다.
+LEADERBOARD_CATEGORIES = {
+    'win': ('win_order', 'win_count'),
+    'rate': ('rate_order', 'rate_count'),
+    'match': ('match_order', 'match_count'),
+    'betting': ('betting_order', 'betting_count'),
+    'opponent': ('opponent_order', 'opponent_count'),
+    'achieve': ('achieve_order', 'achieve_count'),
+    'loss': ('loss_order', 'loss_count'),
+}
+# 시즌 종료 화면의 종합 순위 (승리 > 승률 > 경기 수)
+LEADERBOARD_OVERALL = 'overall'
+LEADERBOARD_SIZE = 5
+
+_leaderboard_cache = {'boards': None, 'generation': None, 'loaded_at': 0.0}
+
+
+def _compute_leaderboards():
+    """카테고리마다 ORDER BY ... LIMIT 쿼리 한 번으로 상위 LEADERBOARD_SIZE 명을 읽습니다."""
+    candidates = db.session.query(Player).join(User, User.player_id == Player.id).filter(
+        Player.is_valid == True, User.is_admin == False
+    )
+
+    def top(order_field, value_field, *order_by):
+        columns = [Player.id, Player.name, Player.rank, getattr(Player, value_field)]
+        if order_field:
+            columns.append(getattr(Player, order_field))
+        rows = candidates.with_entities(*columns).order_by(*order_by, Player.name).limit(LEADERBOARD_SIZE).all()
+        return [
+            {'id': row.id, 'name': row.name, 'rank': row.rank, 'value': getattr(row, value_field),
+             'actual_rank': getattr(row, order_field) if order_field else None}
+            for row in rows
+        ]
+
+    boards = {}
+    for category, (order_field, value_field) in LEADERBOARD_CATEGORIES.items():
+        order_column = getattr(Player, order_field)
+        boards[category] = top(order_field, value_field, order_column.is_(None), order_column)
+
+    boards[LEADERBOARD_OVERALL] = top(None, 'win_count', *[
+        func.coalesce(getattr(Player, field), 0).desc() for field in ('win_count', 'rate_count', 'match_count')
+    ])
+    return boards
+
 
-    for order_field, primary_criteria in categories:
-        players = Player.query.filter(Player.is_valid == True).order_by(primary_criteria).all()
+def _on_leaderboards(player_ids, categories):
+    """순위 카테고리에 해당하는 저장된 리더보드에 player_ids 중 한 명이라도 있는지 확인합니다."""
+    order_fields = {order_field for order_field, _ in categories}
+    board_categories = [category for category, (order_field, _) in LEADERBOARD_CATEGORIES.items() if order_field in order_fields]
+    if order_fields & {'win_order', 'rate_order', 'match_order'}:
+        board_categories.append(LEADERBOARD_OVERALL)
+    boards = Leaderboard.query.filter(Leaderboard.category.in_(board_categories)).all()
+    if len(boards) < len(board_categories):
+        return True
+    return any(entry['id'] in player_ids for board in boards for entry in board.entries)
 
-        current_rank = 0
-        previous_primary_value = None
-        primary_field_name = primary_criteria.element.name
 
-        for i, player in enumerate(players, start=1):
-            primary_value = getattr(player, primary_field_name)
-            if primary_value != previous_primary_value:
-                current_rank = i
-                previous_primary_value = primary_value
+def rebuild_leaderboards():
+    """순위 컬럼이 바뀐 직후 카테고리별 리더보드를 다시 만들어 leaderboard 테이블에 저장합니다. (커밋은 호출한 쪽에서)
 
-            setattr(player, order_field, current_rank)
+    (리더보드, 세대 값) 을 반환합니다. 세대 값은 재계산 시각으로, 순위가 다시 계산될 때마다 바뀝니다.
+    """
+    boards = _compute_leaderboards()
+    now = get_seoul_time()
+    existing = {category for category, in db.session.query(Leaderboard.category).all()}
+    rows = [{'category': category, 'entries': entries, 'updated_at': now} for category, entries in boards.items()]
+    if existing:
+        db.session.execute(update(Leaderboard), [row for row in rows if row['category'] in existing])
+    new_rows = [row for row in rows if row['category'] not in existing]
+    if new_rows:
+        db.session.execute(insert(Leaderboard), new_rows)
+    return boards, str(now)
 
+
+def refresh_leaderboards():
+    """리더보드를 다시 만들어 현재 트랜잭션과 함께 커밋하고 이 프로세스의 캐시도 바꿉니다.
+
+    항목에는 이름과 부수도 담기므로, 순위 컬럼이 그대로여도 부수를 바꾼 뒤에는 이 함수로 새 세대를 만듭니다.
+    """
+    boards, generation = rebuild_leaderboards()
     db.session.commit()
+    _set_leaderboard_cache(boards, generation)
+
+
+def _set_leaderboard_cache(boards, generation):
+    _leaderboard_cache['boards'] = boards
+    _leaderboard_cache['generation'] = generation
+    _leaderboard_cache['loaded_at'] = time.monotonic()
+
+
+def _load_leaderboards():
+    boards = _leaderboard_cache['boards']
+    max_age = current_app.config.get('LEADERBOARD_CACHE_SECONDS', 60)
+    if boards is None or time.monotonic() - _leaderboard_cache['loaded_at'] > max_age:
+        stored = Leaderboard.query.all()
+        boards = {board.category: board.entries for board in stored}
+        generation = str(max(board.updated_at for board in stored)) if stored else None
+        if set(boards) != set(LEADERBOARD_CATEGORIES) | {LEADERBOARD_OVERALL}:
+            # 아직 한 번도 만들어지지 않았으면 (배포 직후 등) 저장 없이 계산만 합니다.
+            boards, generation = _compute_leaderboards(), None
+        _set_leaderboard_cache(boards, generation)
+    return boards
+
+
+def get_leaderboard(category):
+    """카테고리의 상위 선수 목록(dict 리스트)을 프로세스 캐시에서 반환합니다.
+
+    다른 프로세스에서 재계산한 결과는 LEADERBOARD_CACHE_SECONDS 가 지나면 테이블에서 다시 읽어 반영합니다.
+    """
+    return _load_leaderboards().get(category, [])
+
+
+def leaderboard_generation():
+    """현재 프로세스가 보고 있는 리더보드의 세대 값 (순위 재계산마다 바뀜)"""
+    _load_leaderboards()
+    return _leaderboard_cache['generation']
+
+
+# 캐시 범위별로 커밋 직전에 올릴 버전 키
+_CACHE_INVALIDATION_KEY = 'cache_invalidations'
+DASHBOARD_ALL_KEY = 'all'
+DASHBOARD_BETTINGS_KEY = 'bettings'
+
+_dashboard_cache = OrderedDict()
+_dashboard_cache_lock = threading.Lock()
+
+
+def _dashboard_player_key(player_id):
+    return f'player:{player_id}'
+
+
+def invalidate_dashboards(player_ids=(), player_names=(), bettings=False, everyone=False, session=None):
+    """홈 화면 스냅샷을 무효화할 범위를 표시합니다. 버전은 현재 트랜잭션이 커밋될 때 함께 올라갑니다.
+
+    player_ids/player_names 는 해당 선수들의 스냅샷, bettings 는 진행 중 베팅 목록(모든 선수 공통),
+    everyone 은 전체 스냅샷을 무효화합니다.
+    """
+    keys = (session or db.session).info.setdefault(_CACHE_INVALIDATION_KEY, set())
+    player_ids = set(player_ids)
+    if player_names:
+        player_ids.update(resolve_player_ids(player_names).values())
+    keys.update(_dashboard_player_key(player_id) for player_id in player_ids if player_id is not None)
+    if bettings:
+        keys.add(DASHBOARD_BETTINGS_KEY)
+    if everyone:
+        keys.add(DASHBOARD_ALL_KEY)
+
+
+def flush_cache_invalidations(session=None):
+    """표시된 캐시 범위의 버전을 1씩 올립니다. (없는 키는 1로 생성)"""
+    session = session or db.session
+    keys = session.info.pop(_CACHE_INVALIDATION_KEY, None)
+    if not keys:
+        return 0
+
+    table = CacheVersion.__table__
+    dialect_insert = _upsert_insert(session)
+    if dialect_insert is not None:
+        stmt = dialect_insert(table).values([{'key': key, 'version': 1} for key in sorted(keys)])
+        session.execute(stmt.on_conflict_do_update(index_elements=[table.c.key], set_={'version': table.c.version + 1}))
+        return len(keys)
+
+    existing = {key for key, in session.execute(select(table.c.key).where(table.c.key.in_(keys)))}
+    if existing:
+        session.execute(update(table).where(table.c.key.in_(existing)).values(version=table.c.version + 1))
+    if keys - existing:
+        session.execute(insert(table), [{'key': key, 'version': 1} for key in keys - existing])
+    return len(keys)
+
+
+def get_dashboard_snapshot(player_id, builder):
+    """선수의 홈 화면 스냅샷을 반환합니다.
+
+    버전 키(선수/베팅/전체 버전 + 리더보드 세대)를 한 번의 쿼리로 읽어 프로세스 캐시와 같으면 그대로 쓰고,
+    다르면 builder() 로 다시 만들어 저장합니다.
+    """
+    keys = (_dashboard_player_key(player_id), DASHBOARD_BETTINGS_KEY, DASHBOARD_ALL_KEY)
+    versions = dict(db.session.query(CacheVersion.key, CacheVersion.version).filter(CacheVersion.key.in_(keys)).all())
+    version_key = tuple(versions.get(key, 0) for key in keys) + (leaderboard_generation(),)
+
+    with _dashboard_cache_lock:
+        cached = _dashboard_cache.get(player_id)
+        if cached and cached[0] == version_key:
+            _dashboard_cache.move_to_end(player_id)
+            return cached[1]
+
+    snapshot = builder()
+    with _dashboard_cache_lock:
+        _dashboard_cache[player_id] = (version_key, snapshot)
+        _dashboard_cache.move_to_end(player_id)
+        while len(_dashboard_cache) > current_app.config.get('DASHBOARD_CACHE_SIZE', 500):
+            _dashboard_cache.popitem(last=False)
+    return snapshot
+
+
+def expire_today_partners(now=None):
+    """오늘(서울 기준) 두 선수 사이 경기가 없는 '제출됨' 오늘의 상대를 미제출로 되돌립니다.
+
+    승인 대기 중인 경기가 남은 쌍은 표시를 그대로 둡니다. 오늘의 상대 보너스는 경기를 제출한 날 붙은 이 표시로
+    승인 시 판단하므로, 전날 경기를 다음 날 승인해도 보너스가 빠지지 않습니다.
+    화면은 읽을 때 같은 기준으로 판단하므로, 이 함수는 예약 작업(expire-partners 명령)에서 DB를 정리하는 용도입니다.
+    """
+    now = now or get_seoul_time()
+    start_of_today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    still_needed = select(Match.id).where(
+        or_(Match.timestamp >= start_of_today, Match.approved == False),
+        or_(
+            and_(Match.winner == TodayPartner.p1_id, Match.loser == TodayPartner.p2_id),
+            and_(Match.winner == TodayPartner.p2_id, Match.loser == TodayPartner.p1_id)
+        )
+    ).exists()
+    return TodayPartner.query.filter(TodayPartner.submitted == True, ~still_needed).update(
+        {'submitted': False}, synchronize_session=False
+    )
+
+
+_PLAYER_ORDER_GROUPS = {
+    'match': MATCH_ORDER_CATEGORIES,
+    'point': POINT_ORDER_CATEGORIES,
+}
+
+
+def _player_order_categories(groups):
+    return tuple(category for group in ('match', 'point') if group in groups for category in _PLAYER_ORDER_GROUPS[group])
+
+
+def mark_player_orders_dirty(*groups):
+    """순위 재계산이 필요한 그룹('match', 'point')을 표시합니다.
+
+    요청 중에는 표시만 해 두고 요청이 끝날 때 한 번만 재계산합니다.
+    요청 밖(CLI 등)에서는 즉시 재계산합니다.
+    """
+    unknown = set(groups) - set(_PLAYER_ORDER_GROUPS)
+    if unknown:
+        raise ValueError(f"알 수 없는 순위 그룹입니다: {', '.join(sorted(unknown))}")
+
+    if not has_request_context():
+        update_player_orders(_player_order_categories(groups))
+        return
+
+    g.setdefault('dirty_player_orders', set()).update(groups)
+
+
+def flush_player_orders():
+    """표시된 순위 그룹을 한 번의 UPDATE로 재계산합니다."""
+    dirty = g.pop('dirty_player_orders', None)
+    # 포인트만 바뀐 요청이면 원장에 기록된 선수만으로 리더보드 재생성 여부를 판단합니다.
+    touched_ids = g.pop('point_ledger_players', None)
+    if dirty:
+        update_player_orders(_player_order_categories(dirty), touched_ids=touched_ids if dirty == {'point'} else None)
+
+
+def flush_player_orders_after_request(response):
+    try:
+        flush_player_orders()
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.error(f"Player order recalculation error : {e}")
+    return response
+
+
+READ_ONLY_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+def use_read_replica(view):
+    """DB 에 쓰지 않는 조회 전용 뷰를 표시합니다. 표시한 GET 뷰만 복제본을 사용합니다. (route 바로 아래에 붙입니다)
+
+    관리자 화면이나 작업 상태 조회처럼 표시하지 않은 뷰는 모두 주 DB 를 씁니다.
+    """
+    view.use_read_replica = True
+    return view
+
+
+def _read_replica_enabled():
+    return READ_BIND_KEY in (current_app.config.get('SQLALCHEMY_BINDS') or {})
+
+
+def route_reads_to_replica():
+    """@use_read_replica 로 표시한 뷰의 GET 요청이면 이번 요청의 SELECT 를 복제본으로 보내도록 표시합니다.
+
+    방금 쓰기를 한 사용자는 복제 지연 동안 자기 변경이 안 보이지 않도록 잠시 주 DB 를 계속 씁니다.
+    """
+    if not _read_replica_enabled() or request.method not in READ_ONLY_METHODS:
+        return
+    view = current_app.view_functions.get(request.endpoint)
+    if view is None or not getattr(view, 'use_read_replica', False):
+        return
+    if flask_session.get('primary_db_until', 0) > time.time():
+        return
+    g.use_read_replica = True
+
+
+def pin_primary_after_write(response):
+    if _read_replica_enabled() and (request.method not in READ_ONLY_METHODS or db.session.info.get('pinned_primary')):
+        flask_session['primary_db_until'] = time.time() + current_app.config.get('READ_REPLICA_STICKY_SECONDS', 10)
+    return response
@@ -11,9 +11,31 @@ class Config:
     
 
     SQLALCHEMY_DATABASE_URI = db_url
+
+    # 읽기 전용 복제본 (선택). 설정하면 조회 전용으로 표시한(@use_read_replica) GET 뷰의 조회가 이 DB 로 갑니다.
+    read_db_url = os.environ.get('DATABASE_READ_URL')
+    if read_db_url and read_db_url.startswith("postgres://"):
+        read_db_url = read_db_url.replace("postgres://", "postgresql://", 1)
+    SQLALCHEMY_BINDS = {'read': read_db_url} if read_db_url else {}
+    # 쓰기 요청 뒤 같은 사용자의 조회를 주 DB 로 보내는 시간(초). 복제 지연보다 길게 잡습니다.
+    READ_REPLICA_STICKY_SECONDS = int(os.environ.get('READ_REPLICA_STICKY_SECONDS', 10))
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     SECRET_KEY = os.environ.get('SECRET_KEY', 'a-very-secret-key')
 
+    # 백그라운드 작업 워커 (DB 작업 테이블 기반, 프로세스 내 스레드)
+    JOB_WORKER_ENABLED = os.environ.get('JOB_WORKER_ENABLED', 'true').lower() == 'true'
+    JOB_POLL_SECONDS = int(os.environ.get('JOB_POLL_SECONDS', 5))
+    JOB_STALE_SECONDS = int(os.environ.get('JOB_STALE_SECONDS', 600))
+
+    # 리더보드 프로세스 캐시 유지 시간 (다른 프로세스의 재계산 결과를 반영하는 주기)
+    LEADERBOARD_CACHE_SECONDS = int(os.environ.get('LEADERBOARD_CACHE_SECONDS', 60))
+    # 홈 화면 스냅샷을 프로세스에 보관할 최대 선수 수
+    DASHBOARD_CACHE_SIZE = int(os.environ.get('DASHBOARD_CACHE_SIZE', 500))
+    # 선수 이름 -> id 프로세스 캐시에 보관할 최대 이름 수
+    PLAYER_NAME_CACHE_SIZE = int(os.environ.get('PLAYER_NAME_CACHE_SIZE', 2000))
+    # 리그 목록 한 페이지에 보여줄 리그 수
+    LEAGUE_PAGE_SIZE = int(os.environ.get('LEAGUE_PAGE_SIZE', 12))
+
     # 현재 환경이 Render인지 확인 
     is_render_env = 'IS_PULL_REQUEST' in os.environ
 
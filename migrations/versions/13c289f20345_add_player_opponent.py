@@ -0,0 +1,53 @@
+"""add player_opponent index
+
+Revision ID: 13c289f20345
+Revises: 00bd16465ddb
+Create Date: 2026-10-17 10:12:41.201733
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '13c289f20345'
+down_revision = '00bd16465ddb'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('player_opponent',
+    sa.Column('player_id', sa.Integer(), nullable=False),
+    sa.Column('opponent_id', sa.Integer(), nullable=False),
+    sa.Column('match_count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['opponent_id'], ['player.id'], ),
+    sa.ForeignKeyConstraint(['player_id'], ['player.id'], ),
+    sa.PrimaryKeyConstraint('player_id', 'opponent_id')
+    )
+
+    # 기존 승인 경기로 상대 인덱스를 채우고 opponent_count를 인덱스 기준으로 맞춥니다.
+    match = sa.table('match',
+        sa.column('winner', sa.Integer), sa.column('loser', sa.Integer), sa.column('approved', sa.Boolean))
+    player = sa.table('player', sa.column('id', sa.Integer), sa.column('opponent_count', sa.Integer))
+    player_opponent = sa.table('player_opponent',
+        sa.column('player_id', sa.Integer), sa.column('opponent_id', sa.Integer), sa.column('match_count', sa.Integer))
+
+    directed = sa.union_all(
+        sa.select(match.c.winner.label('player_id'), match.c.loser.label('opponent_id')).where(match.c.approved == sa.true()),
+        sa.select(match.c.loser.label('player_id'), match.c.winner.label('opponent_id')).where(match.c.approved == sa.true()),
+    ).subquery()
+    op.execute(player_opponent.insert().from_select(
+        ['player_id', 'opponent_id', 'match_count'],
+        sa.select(directed.c.player_id, directed.c.opponent_id, sa.func.count())
+        .group_by(directed.c.player_id, directed.c.opponent_id)
+    ))
+    op.execute(player.update().values(opponent_count=(
+        sa.select(sa.func.count()).select_from(player_opponent)
+        .where(player_opponent.c.player_id == player.c.id)
+        .scalar_subquery()
+    )))
+
+
+def downgrade():
+    op.drop_table('player_opponent')
@@ -0,0 +1,40 @@
+"""add match_journal table
+
+Revision ID: 4b8e2d6f91c3
+Revises: 1057ae30b878
+Create Date: 2026-10-17 13:20:44.318209
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4b8e2d6f91c3'
+down_revision = '1057ae30b878'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # 기존 승인 경기의 저널은 첫 삭제 시(또는 flask rebuild-stats 실행 시) 경기 기록을 재생해 채웁니다.
+    op.create_table('match_journal',
+    sa.Column('match_id', sa.Integer(), nullable=False),
+    sa.Column('player_id', sa.Integer(), nullable=False),
+    sa.Column('opponent_id', sa.Integer(), nullable=False),
+    sa.Column('match_count', sa.Integer(), nullable=False),
+    sa.Column('win_count', sa.Integer(), nullable=False),
+    sa.Column('loss_count', sa.Integer(), nullable=False),
+    sa.Column('achieve_count', sa.Integer(), nullable=False),
+    sa.Column('betting_count', sa.Integer(), nullable=False),
+    sa.Column('rank_before', sa.Integer(), nullable=True),
+    sa.Column('rank_after', sa.Integer(), nullable=True),
+    sa.Column('points', sa.JSON(), nullable=False),
+    sa.ForeignKeyConstraint(['match_id'], ['match.id'], ),
+    sa.ForeignKeyConstraint(['player_id'], ['player.id'], ),
+    sa.PrimaryKeyConstraint('match_id', 'player_id')
+    )
+
+
+def downgrade():
+    op.drop_table('match_journal')
@@ -0,0 +1,30 @@
+"""add leaderboard table
+
+Revision ID: 7d31a9c4e2b5
+Revises: 4b8e2d6f91c3
+Create Date: 2026-10-17 14:05:12.904417
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7d31a9c4e2b5'
+down_revision = '4b8e2d6f91c3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # 내용은 다음 순위 재계산 때 채워지며, 그 전까지는 화면에서 직접 계산해 사용합니다.
+    op.create_table('leaderboard',
+    sa.Column('category', sa.String(length=20), nullable=False),
+    sa.Column('entries', sa.JSON(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('category')
+    )
+
+
+def downgrade():
+    op.drop_table('leaderboard')
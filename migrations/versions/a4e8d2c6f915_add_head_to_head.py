@@ -0,0 +1,67 @@
+"""add head-to-head pair statistics
+
+Revision ID: a4e8d2c6f915
+Revises: f1c9a7e3b20d
+Create Date: 2026-10-17 23:02:17.645390
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a4e8d2c6f915'
+down_revision = 'f1c9a7e3b20d'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('head_to_head',
+    sa.Column('player_low_id', sa.Integer(), nullable=False),
+    sa.Column('player_high_id', sa.Integer(), nullable=False),
+    sa.Column('low_wins', sa.Integer(), nullable=False),
+    sa.Column('high_wins', sa.Integer(), nullable=False),
+    sa.Column('last_match_id', sa.Integer(), nullable=True),
+    sa.Column('last_match_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['last_match_id'], ['match.id'], ),
+    sa.ForeignKeyConstraint(['player_high_id'], ['player.id'], ),
+    sa.ForeignKeyConstraint(['player_low_id'], ['player.id'], ),
+    sa.PrimaryKeyConstraint('player_low_id', 'player_high_id')
+    )
+    with op.batch_alter_table('match', schema=None) as batch_op:
+        batch_op.create_index('ix_match_winner_loser_timestamp', ['winner', 'loser', 'timestamp'], unique=False)
+
+    # 기존 승인 경기로 쌍별 승수와 마지막 경기를 채웁니다.
+    match = sa.table('match', sa.column('id', sa.Integer), sa.column('winner', sa.Integer), sa.column('loser', sa.Integer),
+        sa.column('timestamp', sa.DateTime(timezone=True)), sa.column('approved', sa.Boolean))
+    head_to_head = sa.table('head_to_head',
+        sa.column('player_low_id', sa.Integer), sa.column('player_high_id', sa.Integer),
+        sa.column('low_wins', sa.Integer), sa.column('high_wins', sa.Integer),
+        sa.column('last_match_id', sa.Integer), sa.column('last_match_at', sa.DateTime(timezone=True)))
+
+    low = sa.case((match.c.winner < match.c.loser, match.c.winner), else_=match.c.loser)
+    high = sa.case((match.c.winner < match.c.loser, match.c.loser), else_=match.c.winner)
+    pairs = sa.select(
+        low.label('low'), high.label('high'),
+        sa.func.sum(sa.case((match.c.winner == low, 1), else_=0)).label('low_wins'),
+        sa.func.sum(sa.case((match.c.winner == high, 1), else_=0)).label('high_wins'),
+        sa.func.max(match.c.timestamp).label('last_match_at'),
+    ).where(match.c.approved == sa.true()).group_by(low, high).subquery()
+    last = match.alias('last')
+    last_match_id = sa.select(last.c.id).where(
+        last.c.approved == sa.true(), last.c.timestamp == pairs.c.last_match_at,
+        ((last.c.winner == pairs.c.low) & (last.c.loser == pairs.c.high))
+        | ((last.c.winner == pairs.c.high) & (last.c.loser == pairs.c.low))
+    ).order_by(last.c.id.desc()).limit(1).scalar_subquery()
+    op.execute(head_to_head.insert().from_select(
+        ['player_low_id', 'player_high_id', 'low_wins', 'high_wins', 'last_match_id', 'last_match_at'],
+        sa.select(pairs.c.low, pairs.c.high, pairs.c.low_wins, pairs.c.high_wins, last_match_id, pairs.c.last_match_at)
+    ))
+
+
+def downgrade():
+    with op.batch_alter_table('match', schema=None) as batch_op:
+        batch_op.drop_index('ix_match_winner_loser_timestamp')
+
+    op.drop_table('head_to_head')
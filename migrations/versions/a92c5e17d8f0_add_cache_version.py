@@ -0,0 +1,28 @@
+"""add cache_version table
+
+Revision ID: a92c5e17d8f0
+Revises: 7d31a9c4e2b5
+Create Date: 2026-10-17 14:48:37.120964
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a92c5e17d8f0'
+down_revision = '7d31a9c4e2b5'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('cache_version',
+    sa.Column('key', sa.String(length=50), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('key')
+    )
+
+
+def downgrade():
+    op.drop_table('cache_version')
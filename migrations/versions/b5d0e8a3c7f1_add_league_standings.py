@@ -0,0 +1,76 @@
+"""add stored league standings
+
+Revision ID: b5d0e8a3c7f1
+Revises: e4b7c1d95a26
+Create Date: 2026-10-17 17:21:46.902315
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b5d0e8a3c7f1'
+down_revision = 'e4b7c1d95a26'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('league', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('member_count', sa.Integer(), nullable=False, server_default='0'))
+        batch_op.add_column(sa.Column('result_count', sa.Integer(), nullable=False, server_default='0'))
+
+    with op.batch_alter_table('league_member', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('wins', sa.Integer(), nullable=False, server_default='0'))
+        batch_op.add_column(sa.Column('losses', sa.Integer(), nullable=False, server_default='0'))
+        batch_op.add_column(sa.Column('score_diff', sa.Integer(), nullable=False, server_default='0'))
+        batch_op.add_column(sa.Column('rank', sa.Integer(), nullable=False, server_default='1'))
+
+    # 기존 결과로 순위표를 채웁니다. 순위는 승수 내림차순, 패수 오름차순이며 같으면 같은 순위입니다.
+    league = sa.table('league', sa.column('id', sa.Integer),
+        sa.column('member_count', sa.Integer), sa.column('result_count', sa.Integer))
+    member = sa.table('league_member', sa.column('league_id', sa.Integer), sa.column('player_id', sa.Integer),
+        sa.column('wins', sa.Integer), sa.column('losses', sa.Integer),
+        sa.column('score_diff', sa.Integer), sa.column('rank', sa.Integer))
+    result = sa.table('league_result', sa.column('league_id', sa.Integer),
+        sa.column('winner_id', sa.Integer), sa.column('loser_id', sa.Integer),
+        sa.column('winner_score', sa.Integer), sa.column('loser_score', sa.Integer))
+
+    in_league = result.c.league_id == member.c.league_id
+    won = result.c.winner_id == member.c.player_id
+    lost = result.c.loser_id == member.c.player_id
+    set_diff = sa.func.coalesce(result.c.winner_score, 0) - sa.func.coalesce(result.c.loser_score, 0)
+
+    def count(condition):
+        return sa.select(sa.func.count()).select_from(result).where(in_league, condition).scalar_subquery()
+
+    def total(condition):
+        return sa.select(sa.func.coalesce(sa.func.sum(set_diff), 0)).where(in_league, condition).scalar_subquery()
+
+    op.execute(member.update().values(
+        wins=count(won), losses=count(lost), score_diff=total(won) - total(lost)
+    ))
+
+    other = member.alias('other')
+    op.execute(member.update().values(rank=sa.select(sa.func.count() + 1).select_from(other).where(
+        other.c.league_id == member.c.league_id,
+        (other.c.wins > member.c.wins) | ((other.c.wins == member.c.wins) & (other.c.losses < member.c.losses))
+    ).scalar_subquery()))
+
+    op.execute(league.update().values(
+        member_count=sa.select(sa.func.count()).select_from(member).where(member.c.league_id == league.c.id).scalar_subquery(),
+        result_count=sa.select(sa.func.count()).select_from(result).where(result.c.league_id == league.c.id).scalar_subquery()
+    ))
+
+
+def downgrade():
+    with op.batch_alter_table('league_member', schema=None) as batch_op:
+        batch_op.drop_column('rank')
+        batch_op.drop_column('score_diff')
+        batch_op.drop_column('losses')
+        batch_op.drop_column('wins')
+
+    with op.batch_alter_table('league', schema=None) as batch_op:
+        batch_op.drop_column('result_count')
+        batch_op.drop_column('member_count')
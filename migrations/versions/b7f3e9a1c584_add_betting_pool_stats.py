@@ -0,0 +1,46 @@
+"""add cached betting pool statistics
+
+Revision ID: b7f3e9a1c584
+Revises: a4e8d2c6f915
+Create Date: 2026-10-17 23:48:05.217164
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7f3e9a1c584'
+down_revision = 'a4e8d2c6f915'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('betting', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('participant_count', sa.Integer(), nullable=False, server_default='0'))
+        batch_op.add_column(sa.Column('p1_bettors', sa.Integer(), nullable=False, server_default='0'))
+        batch_op.add_column(sa.Column('p2_bettors', sa.Integer(), nullable=False, server_default='0'))
+
+    # 기존 참가자 행으로 참가자 수와 선수별 예측 수를 채웁니다.
+    betting = sa.table('betting', sa.column('id', sa.Integer), sa.column('p1_id', sa.Integer), sa.column('p2_id', sa.Integer),
+        sa.column('participant_count', sa.Integer), sa.column('p1_bettors', sa.Integer), sa.column('p2_bettors', sa.Integer))
+    participant = sa.table('betting_participant', sa.column('betting_id', sa.Integer), sa.column('winner_id', sa.Integer))
+
+    def count(*criteria):
+        return sa.select(sa.func.count()).select_from(participant).where(
+            participant.c.betting_id == betting.c.id, *criteria
+        ).scalar_subquery()
+
+    op.execute(betting.update().values(
+        participant_count=count(),
+        p1_bettors=count(participant.c.winner_id == betting.c.p1_id),
+        p2_bettors=count(participant.c.winner_id == betting.c.p2_id),
+    ))
+
+
+def downgrade():
+    with op.batch_alter_table('betting', schema=None) as batch_op:
+        batch_op.drop_column('p2_bettors')
+        batch_op.drop_column('p1_bettors')
+        batch_op.drop_column('participant_count')
@@ -0,0 +1,57 @@
+"""store tournament match nodes in their own table
+
+Revision ID: c3f6a1d8e042
+Revises: b5d0e8a3c7f1
+Create Date: 2026-10-17 19:42:08.517233
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c3f6a1d8e042'
+down_revision = 'b5d0e8a3c7f1'
+branch_labels = None
+depends_on = None
+
+tournament = sa.table('tournament', sa.column('id', sa.Integer), sa.column('bracket_data', sa.JSON))
+tournament_match = sa.table('tournament_match',
+    sa.column('tournament_id', sa.Integer), sa.column('node_id', sa.String), sa.column('node', sa.JSON))
+
+
+def upgrade():
+    op.create_table('tournament_match',
+    sa.Column('tournament_id', sa.Integer(), nullable=False),
+    sa.Column('node_id', sa.String(length=10), nullable=False),
+    sa.Column('node', sa.JSON(), nullable=False),
+    sa.ForeignKeyConstraint(['tournament_id'], ['tournament.id'], ),
+    sa.PrimaryKeyConstraint('tournament_id', 'node_id')
+    )
+
+    # bracket_data 안의 nodes 를 행으로 옮기고 요약만 남깁니다. 옛 형식({'rounds': [...]})은 읽을 때 변환합니다.
+    bind = op.get_bind()
+    for tournament_id, data in bind.execute(sa.select(tournament.c.id, tournament.c.bracket_data)).all():
+        if not data or 'nodes' not in data:
+            continue
+        rows = [{'tournament_id': tournament_id, 'node_id': node_id, 'node': node} for node_id, node in data['nodes'].items()]
+        if rows:
+            op.bulk_insert(tournament_match, rows)
+        header = {key: value for key, value in data.items() if key != 'nodes'}
+        op.execute(tournament.update().where(tournament.c.id == tournament_id).values(bracket_data=header))
+
+
+def downgrade():
+    bind = op.get_bind()
+    nodes = {}
+    for tournament_id, node_id, node in bind.execute(
+        sa.select(tournament_match.c.tournament_id, tournament_match.c.node_id, tournament_match.c.node)
+    ).all():
+        nodes.setdefault(tournament_id, {})[node_id] = node
+    for tournament_id, data in bind.execute(sa.select(tournament.c.id, tournament.c.bracket_data)).all():
+        if tournament_id in nodes:
+            op.execute(tournament.update().where(tournament.c.id == tournament_id).values(
+                bracket_data=dict(data or {}, nodes=nodes[tournament_id])
+            ))
+
+    op.drop_table('tournament_match')
@@ -0,0 +1,68 @@
+"""add double-entry point ledger
+
+Revision ID: d8a2f4b61e93
+Revises: c3f6a1d8e042
+Create Date: 2026-10-17 21:08:33.164028
+
+"""
+import uuid
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd8a2f4b61e93'
+down_revision = 'c3f6a1d8e042'
+branch_labels = None
+depends_on = None
+
+player = sa.table('player', sa.column('id', sa.Integer),
+    sa.column('achieve_count', sa.Integer), sa.column('betting_count', sa.Integer))
+point_ledger = sa.table('point_ledger', sa.column('entry_id', sa.String), sa.column('player_id', sa.Integer),
+    sa.column('currency', sa.String), sa.column('amount', sa.Integer), sa.column('reason', sa.String),
+    sa.column('timestamp', sa.DateTime(timezone=True)))
+
+
+def upgrade():
+    op.create_table('point_ledger',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('entry_id', sa.String(length=32), nullable=False),
+    sa.Column('player_id', sa.Integer(), nullable=True),
+    sa.Column('currency', sa.String(length=10), nullable=False),
+    sa.Column('amount', sa.Integer(), nullable=False),
+    sa.Column('reason', sa.String(length=100), nullable=False),
+    sa.Column('timestamp', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('point_ledger', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_point_ledger_entry_id'), ['entry_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_point_ledger_player_id'), ['player_id'], unique=False)
+
+    # 현재 잔액을 기초 잔액 항목 하나로 옮깁니다. (시스템 계정 행이 통화별 합계를 상쇄)
+    bind = op.get_bind()
+    entry_id, now = uuid.uuid4().hex, datetime.now(ZoneInfo("Asia/Seoul"))
+    rows, totals = [], {'achieve': 0, 'betting': 0}
+    for player_id, achieve_count, betting_count in bind.execute(
+        sa.select(player.c.id, player.c.achieve_count, player.c.betting_count)
+    ).all():
+        for currency, amount in (('achieve', achieve_count or 0), ('betting', betting_count or 0)):
+            if amount:
+                totals[currency] += amount
+                rows.append({'entry_id': entry_id, 'player_id': player_id, 'currency': currency,
+                             'amount': amount, 'reason': '기초 포인트', 'timestamp': now})
+    rows += [{'entry_id': entry_id, 'player_id': None, 'currency': currency,
+              'amount': -total, 'reason': '시스템 계정', 'timestamp': now}
+             for currency, total in totals.items() if total]
+    if rows:
+        op.bulk_insert(point_ledger, rows)
+
+
+def downgrade():
+    with op.batch_alter_table('point_ledger', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_point_ledger_player_id'))
+        batch_op.drop_index(batch_op.f('ix_point_ledger_entry_id'))
+
+    op.drop_table('point_ledger')
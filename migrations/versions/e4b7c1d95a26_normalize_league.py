@@ -0,0 +1,149 @@
+"""normalize league members and results
+
+Revision ID: e4b7c1d95a26
+Revises: a92c5e17d8f0
+Create Date: 2026-10-17 16:05:12.384511
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e4b7c1d95a26'
+down_revision = 'a92c5e17d8f0'
+branch_labels = None
+depends_on = None
+
+LEGACY_SIZE = 5
+LEGACY_NAME_COLUMNS = [f'p{i}' for i in range(1, LEGACY_SIZE + 1)]
+LEGACY_SCORE_COLUMNS = [f'p{i}p{j}' for i in range(1, LEGACY_SIZE + 1) for j in range(1, LEGACY_SIZE + 1) if i != j]
+
+league = sa.table('league', sa.column('id', sa.Integer),
+    *[sa.column(name, sa.String) for name in LEGACY_NAME_COLUMNS],
+    *[sa.column(name, sa.Integer) for name in LEGACY_SCORE_COLUMNS])
+player = sa.table('player', sa.column('id', sa.Integer), sa.column('name', sa.String))
+league_member = sa.table('league_member',
+    sa.column('league_id', sa.Integer), sa.column('player_id', sa.Integer), sa.column('position', sa.Integer))
+league_result = sa.table('league_result',
+    sa.column('league_id', sa.Integer), sa.column('winner_id', sa.Integer), sa.column('loser_id', sa.Integer),
+    sa.column('winner_score', sa.Integer), sa.column('loser_score', sa.Integer))
+
+
+def upgrade():
+    op.create_table('league_member',
+    sa.Column('league_id', sa.Integer(), nullable=False),
+    sa.Column('player_id', sa.Integer(), nullable=False),
+    sa.Column('position', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['league_id'], ['league.id'], ),
+    sa.ForeignKeyConstraint(['player_id'], ['player.id'], ),
+    sa.PrimaryKeyConstraint('league_id', 'player_id')
+    )
+    with op.batch_alter_table('league_member', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_league_member_player_id'), ['player_id'], unique=False)
+
+    op.create_table('league_result',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('league_id', sa.Integer(), nullable=False),
+    sa.Column('winner_id', sa.Integer(), nullable=False),
+    sa.Column('loser_id', sa.Integer(), nullable=False),
+    sa.Column('winner_score', sa.Integer(), nullable=True),
+    sa.Column('loser_score', sa.Integer(), nullable=True),
+    sa.Column('timestamp', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['league_id'], ['league.id'], ),
+    sa.ForeignKeyConstraint(['loser_id'], ['player.id'], ),
+    sa.ForeignKeyConstraint(['winner_id'], ['player.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('league_result', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_league_result_league_id'), ['league_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_league_result_loser_id'), ['loser_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_league_result_winner_id'), ['winner_id'], unique=False)
+
+    with op.batch_alter_table('league', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('created_at', sa.DateTime(timezone=True), nullable=True))
+    # 기존 리그의 생성일은 알 수 없으므로 비워 둡니다. (화면에서는 '-' 로 표시)
+
+    # 기존 p1..p5 / pNpM 칸을 참가자/결과 행으로 옮깁니다.
+    # pNpM 만 있으면 N 의 승리(점수 없음), 둘 다 있으면 세트 스코어로 보고 높은 쪽을 승자로 봅니다.
+    bind = op.get_bind()
+    player_ids = dict(bind.execute(sa.select(player.c.name, player.c.id)).all())
+    members, results = [], []
+    for row in bind.execute(sa.select(league)).mappings().all():
+        seats = [player_ids.get(row[name]) for name in LEGACY_NAME_COLUMNS]
+        for position, player_id in enumerate(seats, start=1):
+            if player_id is not None and player_id not in seats[:position - 1]:
+                members.append({'league_id': row['id'], 'player_id': player_id, 'position': position})
+
+        for i in range(1, LEGACY_SIZE + 1):
+            for j in range(i + 1, LEGACY_SIZE + 1):
+                p_i, p_j = seats[i - 1], seats[j - 1]
+                score_ij, score_ji = row[f'p{i}p{j}'], row[f'p{j}p{i}']
+                if p_i is None or p_j is None or p_i == p_j or (score_ij is None and score_ji is None):
+                    continue
+                if score_ij is not None and score_ji is not None:
+                    if score_ij == score_ji:
+                        continue
+                    winner, loser, scores = (p_i, p_j, (score_ij, score_ji)) if score_ij > score_ji else (p_j, p_i, (score_ji, score_ij))
+                else:
+                    winner, loser, scores = (p_i, p_j, (None, None)) if score_ij is not None else (p_j, p_i, (None, None))
+                results.append({'league_id': row['id'], 'winner_id': winner, 'loser_id': loser,
+                                'winner_score': scores[0], 'loser_score': scores[1]})
+
+    if members:
+        op.bulk_insert(league_member, members)
+    if results:
+        op.bulk_insert(league_result, results)
+
+    with op.batch_alter_table('league', schema=None) as batch_op:
+        for name in LEGACY_SCORE_COLUMNS + LEGACY_NAME_COLUMNS:
+            batch_op.drop_column(name)
+
+
+def downgrade():
+    with op.batch_alter_table('league', schema=None) as batch_op:
+        for name in LEGACY_NAME_COLUMNS:
+            batch_op.add_column(sa.Column(name, sa.String(length=100), nullable=True))
+        for name in LEGACY_SCORE_COLUMNS:
+            batch_op.add_column(sa.Column(name, sa.Integer(), nullable=True))
+
+    # 앞 5자리까지만 되돌릴 수 있습니다. 결과는 승자 칸에 세트 스코어(없으면 1)를 적습니다.
+    bind = op.get_bind()
+    names = dict(bind.execute(sa.select(player.c.id, player.c.name)).all())
+    seats = {}
+    for league_id, player_id, position in bind.execute(
+        sa.select(league_member.c.league_id, league_member.c.player_id, league_member.c.position)
+        .order_by(league_member.c.league_id, league_member.c.position)
+    ).all():
+        league_seats = seats.setdefault(league_id, {})
+        if len(league_seats) < LEGACY_SIZE:
+            league_seats[player_id] = len(league_seats) + 1
+
+    values = {league_id: {f'p{index}': names.get(player_id) for player_id, index in league_seats.items()}
+              for league_id, league_seats in seats.items()}
+    for league_id, winner_id, loser_id, winner_score, loser_score in bind.execute(
+        sa.select(league_result.c.league_id, league_result.c.winner_id, league_result.c.loser_id,
+                  league_result.c.winner_score, league_result.c.loser_score)
+    ).all():
+        league_seats = seats.get(league_id, {})
+        if winner_id in league_seats and loser_id in league_seats:
+            w, l = league_seats[winner_id], league_seats[loser_id]
+            values[league_id][f'p{w}p{l}'] = winner_score if winner_score is not None else 1
+            if loser_score is not None:
+                values[league_id][f'p{l}p{w}'] = loser_score
+    for league_id, row in values.items():
+        op.execute(league.update().where(league.c.id == league_id).values(**row))
+
+    with op.batch_alter_table('league', schema=None) as batch_op:
+        batch_op.drop_column('created_at')
+
+    with op.batch_alter_table('league_result', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_league_result_winner_id'))
+        batch_op.drop_index(batch_op.f('ix_league_result_loser_id'))
+        batch_op.drop_index(batch_op.f('ix_league_result_league_id'))
+
+    op.drop_table('league_result')
+    with op.batch_alter_table('league_member', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_league_member_player_id'))
+
+    op.drop_table('league_member')
@@ -0,0 +1,32 @@
+"""add indexes for the betting approval feed
+
+Revision ID: f1c9a7e3b20d
+Revises: d8a2f4b61e93
+Create Date: 2026-10-17 22:14:52.381907
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f1c9a7e3b20d'
+down_revision = 'd8a2f4b61e93'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('betting', schema=None) as batch_op:
+        batch_op.create_index('ix_betting_submitted_approved_id', ['submitted', 'approved', 'id'], unique=False)
+
+    with op.batch_alter_table('betting_participant', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_betting_participant_betting_id'), ['betting_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('betting_participant', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_betting_participant_betting_id'))
+
+    with op.batch_alter_table('betting', schema=None) as batch_op:
+        batch_op.drop_index('ix_betting_submitted_approved_id')